@@ -1,9 +1,14 @@
 import jwt
 from datetime import datetime, timedelta
-from config.db import Session
+from sqlalchemy import event
+from config.db import Session, session_scope
 from models.models import Employee
 import os
+import time
 from jwt.exceptions import ExpiredSignatureError, PyJWTError
+from token_store import (
+    IDENTITY_CACHE_FILE, invalidate_identity_cache, load_identity_cache, save_identity_cache, token_key
+)
 
 
 # Configuration
@@ -11,39 +16,138 @@ SECRET_KEY = os.getenv('JWT_SECRET_KEY')  # Récupère la clé du .env
 ALGORITHM = "HS256"  # Algorithme de hashage pour JWT
 ACCESS_TOKEN_EXPIRE_MINUTES = 30  # Durée de validité du token
 
-def create_access_token(username: str):
+
+# Clé de Session.info où sont accumulés, jusqu'au commit, les collaborateurs modifiés ou supprimés
+STALE_IDENTITIES = "stale_identities"
+
+
+def invalidate_identity_on_commit(session, employee_id):
+    """
+    Retire du cache les identités du collaborateur une fois la transaction de session validée :
+    avant, une autre commande relirait l'ancienne ligne ; en cas d'annulation, rien n'a changé.
+    """
+    session.info.setdefault(STALE_IDENTITIES, set()).add(employee_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_identities(session):
+    for employee_id in session.info.pop(STALE_IDENTITIES, ()):
+        invalidate_identity_cache(employee_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_identities(session):
+    session.info.pop(STALE_IDENTITIES, None)
+
+
+class AuthenticatedEmployee:
+    """Identité vérifiée d'un collaborateur, utilisable sans session ouverte"""
+
+    __slots__ = ("id", "username", "departement", "permission_codes")
+
+    def __init__(self, id, username, departement, permission_codes=()):
+        self.id = id
+        self.username = username
+        self.departement = departement
+        self.permission_codes = frozenset(permission_codes)
+
+    @classmethod
+    def from_employee(cls, employee):
+        """Construit l'identité à partir d'un Employee chargé avec ses permissions"""
+        return cls(
+            employee.id,
+            employee.username,
+            employee.departement,
+            [permission.code for permission in employee.permissions]
+        )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "username": self.username,
+            "departement": self.departement,
+            "permissions": sorted(self.permission_codes)
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["id"], data["username"], data["departement"], data["permissions"])
+
+    def __repr__(self):
+        return f"{self.username} ({self.departement})"
+
+
+def create_access_token(username: str, employee=None, session=None):
+    """
+    Crée un token autoportant : département, permissions et version des droits
+    sont embarqués pour que les vérifications n'aient pas besoin de la base.
+    """
+    if employee is None:
+        with session_scope(session) as session:
+            employee = session.query(Employee).filter_by(username=username).first()
+            if not employee:
+                raise ValueError(f"Collaborateur '{username}' introuvable")
+            identity = AuthenticatedEmployee.from_employee(employee)
+            permission_version = employee.permission_version or 0
+    else:
+        identity = AuthenticatedEmployee.from_employee(employee)
+        permission_version = employee.permission_version or 0
 
     expires = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode = {"sub": username, "exp": expires}
+    to_encode = {
+        "sub": username,
+        "exp": expires,
+        "uid": identity.id,
+        "dept": identity.departement,
+        "perms": sorted(identity.permission_codes),
+        "pv": permission_version
+    }
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def verify_token(token: str):
+def verify_token(token: str, session=None):
     """
     1. Décode le token avec la clé secrète
     2. Vérifie que le token n'est pas expiré
-    3. Retourne le user si valide, None sinon
+    3. Vérifie que la version des droits embarquée est toujours la bonne
+    4. Retourne l'identité (depuis le cache si possible) si valide, None sinon
+
+    La session de la commande en cours peut être fournie pour éviter d'en ouvrir une autre.
     """
     try:
         # Décoder le token en utilisant la clé secrète et l'algorithme spécifié
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        
-        # Récupérer le username à partir du payload
-        username = payload.get("sub")
-        
-        # Vérifier que le username existe dans la base de données
-        session = Session()
-        try:
-            # Rechercher l'utilisateur pour s'assurer qu'il existe
-            employee = session.query(Employee).filter_by(username=username).first()
-            
-            # Retourner le username uniquement si l'utilisateur existe
-            return employee
-        finally:
-            # Toujours fermer la session
-            session.close()
-    
     except (jwt.ExpiredSignatureError, jwt.PyJWTError) as e:
         # Gérer les erreurs d'expiration ou de décodage du token
         # Retourner None en cas d'erreur
-        return None
\ No newline at end of file
+        return None
+
+    # Identité déjà vérifiée par une commande précédente : aucune requête
+    cache = load_identity_cache()
+    key = token_key(token)
+    entry = cache.get(key)
+    if entry and entry.get("expires_at", 0) > time.time():
+        return AuthenticatedEmployee.from_dict(entry["identity"])
+
+    # Les tokens antérieurs aux claims embarqués doivent être renouvelés
+    if "uid" not in payload or "pv" not in payload:
+        return None
+
+    # Seule la version des droits est relue : un token obsolète est rejeté
+    # sans recharger l'employé ni ses permissions
+    with session_scope(session) as session:
+        permission_version = session.query(Employee.permission_version)\
+            .filter(Employee.id == payload["uid"])\
+            .scalar()
+
+    if permission_version is None or permission_version != payload["pv"]:
+        return None
+
+    identity = AuthenticatedEmployee(
+        payload["uid"], payload.get("sub"), payload.get("dept"), payload.get("perms", [])
+    )
+
+    # La durée de vie de l'entrée est bornée par l'expiration du token
+    cache[key] = {"identity": identity.to_dict(), "expires_at": payload["exp"]}
+    save_identity_cache(cache)
+    return identity
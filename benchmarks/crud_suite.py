@@ -0,0 +1,393 @@
+"""
+Suite de benchmarks des services crud, reproductible d'une version du code à l'autre.
+
+Pour chaque volume, la base de benchmark est recréée et remplie (graine fixe), puis sont mesurés :
+    - chaque liste de ReadService (page, parcours en flux, chargement complet) et chaque filtre
+    - chaque création et modification de CreateService / UpdateService
+    - verify_token (identité absente du cache, puis en cache) et la connexion (bcrypt + token)
+Les écritures sont annulées après chaque mesure : la base reste identique d'une répétition à l'autre.
+
+Les résultats (médiane, p95 et minimum en millisecondes) sont enregistrés en JSON ; avec --baseline,
+ils sont comparés à une exécution précédente et le script termine en erreur (code 1) si une mesure
+ralentit au-delà du seuil.
+
+Usage :
+    python -m benchmarks.crud_suite [--url URL] [--sizes 1k 100k 1m] [--repeat 7]
+                                    [--output benchmark_results.json]
+                                    [--baseline baseline.json] [--threshold 0.10]
+
+Attention : les tables de la base visée sont supprimées puis recréées.
+Par défaut, une base SQLite locale (benchmark.db) est utilisée.
+"""
+import os
+
+# Avant tout import du projet : le cache des listes masquerait le coût des requêtes,
+# et auth lit la clé de signature à l'import
+os.environ["QUERY_CACHE_ENABLED"] = "false"
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-only-secret-key-not-for-production")
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+import sqlalchemy
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import aliased
+import token_store
+from auth import create_access_token, verify_token, invalidate_identity_cache
+from config.db import Base, Session
+from models.models import Employee, Client, Contract, Event
+from models.permissions import setup_department_permissions
+from crud.create import CreateService
+from crud.update import UpdateService
+from crud.read import ReadService, ContractFilterGestion, ContractFilterCommercial, EventFilterSupport
+from crud.calendar import ensure_calendar_index
+from crud.summaries import rebuild_summaries
+from crud.synthetic import load_synthetic_data, plan_volumes
+from benchmarks.query_plans import DEFAULT_URL, SEED, COMMERCIAL_USERNAME, SUPPORT_USERNAME
+
+
+# Volumes nommés (nombre de contrats ; les autres volumes en découlent, voir crud.synthetic.plan_volumes)
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+DEFAULT_SIZES = ("1k", "100k")
+DEFAULT_OUTPUT = "benchmark_results.json"
+
+# Ralentissement relatif toléré par rapport à la référence, et écart absolu (ms) en dessous
+# duquel une différence est considérée comme du bruit de mesure
+DEFAULT_THRESHOLD = 0.10
+NOISE_FLOOR_MS = 0.5
+
+# Répétitions maximales des mesures coûteuses (hachage bcrypt, parcours de toute une table)
+SLOW_CASE_REPEAT = 3
+# Au-delà de ce volume, les chargements complets en objets ORM (get_all_*) ne sont plus mesurés
+FULL_LOAD_MAX_SIZE = 100_000
+
+BENCH_PASSWORD = "benchmark"
+GESTION_USERNAME = "gestion00001"
+
+
+def parse_size(value):
+    """Volume nommé (1k, 100k, 1m) ou nombre de contrats"""
+    return SCALES.get(value.lower()) or int(value)
+
+
+def prepare(engine, size):
+    """
+    Recrée la base et la remplit avec le jeu de données synthétique de `db seed` (graine fixe) :
+    tous les collaborateurs ont le mot de passe BENCH_PASSWORD et les permissions de leur département.
+    """
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with contextlib.redirect_stdout(io.StringIO()):
+        setup_department_permissions()
+    with Session() as session:
+        load_synthetic_data(session, size, SEED, BENCH_PASSWORD)
+        rebuild_summaries(session)
+        session.commit()
+
+    # Index des périodes : vérification des doubles réservations de support (create / update event)
+    ensure_calendar_index(engine, rebuild=True)
+    with engine.begin() as connection:
+        connection.execute(text("ANALYZE"))
+
+
+def tokens():
+    """Tokens du gestionnaire, du commercial et du support de benchmark"""
+    return {
+        username: create_access_token(username)
+        for username in (GESTION_USERNAME, COMMERCIAL_USERNAME, SUPPORT_USERNAME)
+    }
+
+
+def sample_ids(engine):
+    """
+    Un client, un contrat signé sans événement, un support existant et un événement sans support
+    auquel ce support peut être affecté (libre sur son créneau)
+    """
+    with engine.connect() as connection:
+        client_id = connection.scalar(select(Client.id).order_by(Client.id).limit(1))
+        contract_id = connection.scalar(
+            select(Contract.id)
+            .where(Contract.est_signe.is_(True), ~select(Event.id).where(Event.contrat_id == Contract.id).exists())
+            .order_by(Contract.id).limit(1)
+        )
+        employee_id = connection.scalar(
+            select(Employee.id).where(Employee.username == SUPPORT_USERNAME)
+        )
+        booked = aliased(Event)
+        event_id = connection.scalar(
+            select(Event.id)
+            .where(Event.contact_support_id.is_(None), ~select(booked.id).where(
+                booked.contact_support_id == employee_id,
+                booked.date_debut < Event.date_fin,
+                booked.date_fin > Event.date_debut
+            ).exists())
+            .order_by(Event.id).limit(1)
+        )
+    return client_id, contract_id, event_id, employee_id
+
+
+def consume(iterator):
+    """Lit un générateur jusqu'au bout (parcours en flux)"""
+    count = 0
+    for _ in iterator:
+        count += 1
+    return count
+
+
+def in_rollback(call):
+    """Exécute une écriture dans une session annulée ensuite (la base ne change pas)"""
+    def run():
+        with Session() as session:
+            call(session)
+            session.rollback()
+    return run
+
+
+def in_session(call):
+    """Exécute une lecture avec la session d'une commande"""
+    def run():
+        with Session() as session:
+            return call(session)
+    return run
+
+
+def cases(token, ids, size):
+    """(nom, fonction mesurée, répétitions maximales ou None) pour chaque cas"""
+    gestion, commercial, support = token[GESTION_USERNAME], token[COMMERCIAL_USERNAME], token[SUPPORT_USERNAME]
+    client_id, contract_id, event_id, employee_id = ids
+    start = datetime(2026, 1, 1, 18, 0)
+
+    reads = [
+        ("read clients page", lambda s: ReadService.get_clients_page(gestion, session=s)),
+        ("read employees page", lambda s: ReadService.get_employees_page(gestion, session=s)),
+    ]
+    for mode in ContractFilterGestion:
+        reads.append((f"read contracts page gestion {mode.value}",
+                      lambda s, mode=mode: ReadService.get_contracts_page(gestion, mode, session=s)))
+    for mode in ContractFilterCommercial:
+        reads.append((f"read contracts page commercial {mode.value}",
+                      lambda s, mode=mode: ReadService.get_contracts_page(commercial, mode, session=s)))
+    for mode in EventFilterSupport:
+        reads.append((f"read events page support {mode.value}",
+                      lambda s, mode=mode: ReadService.get_events_page(support, mode, session=s)))
+    reads += [
+        ("read events page date_debut",
+         lambda s: ReadService.get_events_page(gestion, order_by="date_debut", session=s)),
+        ("read events page with_notes",
+         lambda s: ReadService.get_events_page(gestion, with_notes=True, session=s)),
+    ]
+
+    result = [(name, in_session(call), None) for name, call in reads]
+
+    # Parcours complets : en flux à tous les volumes, en objets ORM jusqu'à FULL_LOAD_MAX_SIZE
+    scans = [
+        ("scan clients", lambda s: consume(ReadService.iter_clients(gestion, session=s))),
+        ("scan contracts", lambda s: consume(ReadService.iter_contracts(gestion, session=s))),
+        ("scan events", lambda s: consume(ReadService.iter_events(gestion, session=s))),
+        ("scan employees", lambda s: consume(ReadService.iter_employees(gestion, session=s))),
+    ]
+    if size <= FULL_LOAD_MAX_SIZE:
+        scans += [
+            ("get_all clients", lambda s: ReadService.get_all_clients(gestion, session=s)),
+            ("get_all contracts", lambda s: ReadService.get_all_contracts(gestion, session=s)),
+            ("get_all events", lambda s: ReadService.get_all_events(gestion, session=s)),
+            ("get_all employees", lambda s: ReadService.get_all_employees(gestion, session=s)),
+        ]
+    result += [(name, in_session(call), SLOW_CASE_REPEAT) for name, call in scans]
+
+    writes = [
+        ("create client", lambda s: CreateService.create_client(commercial, {
+            "nom_complet": "Client Bench", "email": "nouveau@bench", "entreprise": "Bench"
+        }, session=s)),
+        ("create contract", lambda s: CreateService.create_contract(gestion, {
+            "client_id": client_id, "montant_total": Decimal("1000.00"),
+            "montant_restant": Decimal("1000.00"), "est_signe": False
+        }, session=s)),
+        ("create event", lambda s: CreateService.create_event(gestion, {
+            "nom": "Événement Bench", "contrat_id": contract_id, "date_debut": start,
+            "date_fin": start + timedelta(hours=4), "lieu": "Bench"
+        }, session=s)),
+        ("update client", lambda s: UpdateService.update_client(gestion, client_id, {
+            "entreprise": "Bench modifiée"
+        }, session=s)),
+        ("update contract", lambda s: UpdateService.update_contract(gestion, contract_id, {
+            "montant_restant": Decimal("100.00")
+        }, session=s)),
+        ("update event", lambda s: UpdateService.update_event(gestion, event_id, {
+            "lieu": "Bench modifiée"
+        }, session=s)),
+        ("update event support", lambda s: UpdateService.update_event(gestion, event_id, {
+            "contact_support_id": employee_id
+        }, session=s)),
+        ("update employee", lambda s: UpdateService.update_employee(gestion, employee_id, {
+            "telephone": "0600000000"
+        }, session=s)),
+    ]
+    result += [(name, in_rollback(call), None) for name, call in writes]
+
+    # La création d'un collaborateur hache son mot de passe
+    result.append(("create employee", in_rollback(lambda s: CreateService.create_employee(gestion, {
+        "username": "nouveau", "password": BENCH_PASSWORD, "email": "nouveau@bench",
+        "nom": "Bench", "prenom": "Bench", "departement": Employee.SUPPORT
+    }, session=s)), SLOW_CASE_REPEAT))
+
+    def verify_cold():
+        invalidate_identity_cache()
+        verify_token(gestion)
+
+    def login():
+        # Même chemin que `auth login` : lecture du collaborateur, bcrypt, émission du token
+        with Session() as session:
+            employee = session.query(Employee).filter_by(username=GESTION_USERNAME).first()
+            if not employee.check_password(BENCH_PASSWORD):
+                raise RuntimeError("Mot de passe de benchmark refusé")
+            create_access_token(GESTION_USERNAME, employee)
+
+    result += [
+        ("verify_token cold", verify_cold, None),
+        ("verify_token cached", lambda: verify_token(gestion), None),
+        ("login", login, SLOW_CASE_REPEAT),
+    ]
+    return result
+
+
+def measure(function, repeat):
+    """Exécute une fois à blanc, puis repeat fois ; statistiques en millisecondes"""
+    function()
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        durations.append((time.perf_counter() - start) * 1000)
+    durations.sort()
+    return {
+        "median_ms": round(statistics.median(durations), 3),
+        "p95_ms": round(durations[max(0, math.ceil(0.95 * len(durations)) - 1)], 3),
+        "min_ms": round(durations[0], 3),
+        "runs": len(durations),
+    }
+
+
+def metadata(engine, repeat):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "dialect": engine.dialect.name,
+        "python": platform.python_version(),
+        "sqlalchemy": sqlalchemy.__version__,
+        "machine": platform.machine(),
+        "repeat": repeat,
+    }
+
+
+def compare(results, baseline, threshold, noise_floor=NOISE_FLOOR_MS):
+    """
+    Mesures dont la médiane dépasse celle de la référence de plus de threshold (relatif)
+    et de plus de noise_floor millisecondes : [(volume, cas, référence, actuelle)]
+    """
+    regressions = []
+    for size, measures in results["results"].items():
+        reference = baseline.get("results", {}).get(size, {})
+        for name, current in measures.items():
+            before = reference.get(name)
+            if before is None:
+                continue
+            delta = current["median_ms"] - before["median_ms"]
+            if delta > noise_floor and delta > before["median_ms"] * threshold:
+                regressions.append((size, name, before["median_ms"], current["median_ms"]))
+    return regressions
+
+
+@contextlib.contextmanager
+def isolated_token_files():
+    """
+    Token et cache des identités du benchmark dans un répertoire temporaire : verify_token cold
+    vide ce cache, celui de la session CLI du développeur (répertoire courant) n'est pas touché.
+    """
+    saved = token_store.TOKEN_FILE, token_store.IDENTITY_CACHE_FILE
+    with tempfile.TemporaryDirectory() as directory:
+        token_store.TOKEN_FILE = os.path.join(directory, os.path.basename(saved[0]))
+        token_store.IDENTITY_CACHE_FILE = os.path.join(directory, os.path.basename(saved[1]))
+        try:
+            yield
+        finally:
+            token_store.TOKEN_FILE, token_store.IDENTITY_CACHE_FILE = saved
+
+
+def run(url, sizes, repeat):
+    engine = create_engine(url)
+    # Les services ouvrent leurs sessions (et setup_department_permissions la sienne) sur la base de benchmark
+    Session.configure(bind=engine)
+    results = {"meta": metadata(engine, repeat), "results": {}}
+
+    try:
+        with isolated_token_files():
+            for size in sizes:
+                volumes = plan_volumes(size)
+                print(f"\n=== {size} contrats, {volumes.clients} clients, "
+                      f"{volumes.commerciaux + volumes.supports + volumes.gestion} collaborateurs "
+                      f"({engine.dialect.name}) ===")
+                prepare(engine, size)
+                measures = results["results"][str(size)] = {}
+                for name, function, max_repeat in cases(tokens(), sample_ids(engine), size):
+                    # Les services affichent certains messages (permissions attribuées...)
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        measures[name] = measure(function, min(repeat, max_repeat or repeat))
+                    stats = measures[name]
+                    print(f"{name:<46} {stats['median_ms']:>10.2f} ms  p95 {stats['p95_ms']:>10.2f} ms  "
+                          f"min {stats['min_ms']:>10.2f} ms")
+    finally:
+        engine.dispose()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks des services crud")
+    parser.add_argument("--url", default=DEFAULT_URL, help="Base de benchmark (tables recréées)")
+    parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES,
+                        help="Volumes : 1k, 100k, 1m ou un nombre de contrats")
+    parser.add_argument("--repeat", type=int, default=7, help="Exécutions par mesure")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Fichier JSON des résultats")
+    parser.add_argument("--baseline", help="Résultats de référence à comparer")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Ralentissement toléré (0.10 : +10 %% sur la médiane)")
+    args = parser.parse_args(argv)
+
+    results = run(args.url, [parse_size(size) for size in args.sizes], args.repeat)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"\nRésultats enregistrés dans {args.output}")
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    reference = baseline.get("meta", {})
+    print(f"Référence : {args.baseline} (commit {reference.get('commit')}, {reference.get('date')})")
+    for size, name, before, after in regressions:
+        print(f"RÉGRESSION {size} contrats, {name} : {before:.2f} ms -> {after:.2f} ms "
+              f"(+{(after - before) / before:.0%})")
+    if regressions:
+        return 1
+    print(f"Aucune régression au-delà de {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
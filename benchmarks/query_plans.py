@@ -0,0 +1,152 @@
+"""
+Latence des filtres de liste avant et après les index déclarés dans models/models.py.
+
+Pour chaque volume de contrats, la base de benchmark est recréée et remplie, puis chaque
+filtre (ContractFilterGestion, ContractFilterCommercial, EventFilterSupport, tri chronologique)
+est mesuré sans les index, puis avec. Deux mesures par filtre :
+    - page  : première page de la CLI (DEFAULT_PAGE_SIZE lignes, pagination par clé)
+    - total : comptage de toutes les lignes du filtre (coût du parcours complet)
+
+Usage :
+    python -m benchmarks.query_plans [--url URL] [--sizes 10000 100000 1000000] [--explain]
+
+Attention : les tables de la base visée sont supprimées puis recréées.
+Par défaut, une base SQLite locale (benchmark.db) est utilisée.
+"""
+import argparse
+import os
+import statistics
+import time
+from sqlalchemy import create_engine, select, func, text
+from sqlalchemy.orm import Session
+from auth import AuthenticatedEmployee
+from config.db import Base
+from models.models import Employee, Contract
+from crud.synthetic import load_synthetic_data
+from crud.projections import contracts_select, events_select
+from crud.read import (
+    ReadService, ContractFilterGestion, ContractFilterCommercial, EventFilterSupport,
+    EVENT_ORDERINGS, DEFAULT_PAGE_SIZE
+)
+
+
+DEFAULT_URL = os.getenv("BENCHMARK_DATABASE_URL", "sqlite:///benchmark.db")
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+SEED = 42
+
+# Comptes du jeu de données synthétique dont les listes sont mesurées
+COMMERCIAL_USERNAME = "commercial00001"
+SUPPORT_USERNAME = "support00001"
+
+
+def reset_database(engine, nb_contracts):
+    """Recrée les tables et charge le jeu de données synthétique (crud.synthetic, graine fixe)"""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        load_synthetic_data(session, nb_contracts, SEED)
+        session.commit()
+
+
+def cases(connection):
+    """(nom, requête, clés de tri) pour chaque filtre de liste"""
+    def employee_id(username):
+        return connection.scalar(select(Employee.id).where(Employee.username == username))
+
+    gestion = AuthenticatedEmployee(0, "bench", Employee.GESTION)
+    commercial = AuthenticatedEmployee(employee_id(COMMERCIAL_USERNAME), "bench", Employee.COMMERCIAL)
+    support = AuthenticatedEmployee(employee_id(SUPPORT_USERNAME), "bench", Employee.SUPPORT)
+
+    def contracts(user, mode):
+        return contracts_select().where(*ReadService._contract_conditions(user, mode))
+
+    return [
+        ("contracts with_support", contracts(gestion, ContractFilterGestion.WITH_SUPPORT), (Contract.id,)),
+        ("contracts without_support", contracts(gestion, ContractFilterGestion.WITHOUT_SUPPORT), (Contract.id,)),
+        ("contracts signed", contracts(commercial, ContractFilterCommercial.SIGNED), (Contract.id,)),
+        ("contracts unsigned", contracts(commercial, ContractFilterCommercial.UNSIGNED), (Contract.id,)),
+        ("contracts fully_paid", contracts(commercial, ContractFilterCommercial.FULLY_PAID), (Contract.id,)),
+        ("contracts not_fully_paid", contracts(commercial, ContractFilterCommercial.NOT_FULLY_PAID),
+         (Contract.id,)),
+        ("events my_events",
+         events_select().where(*ReadService._event_conditions(support, EventFilterSupport.MY_EVENTS)),
+         EVENT_ORDERINGS["id"]),
+        ("events --sort date_debut", events_select(), EVENT_ORDERINGS["date_debut"]),
+    ]
+
+
+def timed(session, stmt, repeat):
+    """Médiane, en millisecondes, de repeat exécutions complètes de la requête"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        session.execute(stmt).all()
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations)
+
+
+def measure(engine, repeat):
+    results = {}
+    with Session(engine) as session:
+        for name, stmt, keys in cases(session):
+            page = stmt.order_by(*keys).limit(DEFAULT_PAGE_SIZE)
+            total = select(func.count()).select_from(stmt.subquery())
+            results[name] = (timed(session, page, repeat), timed(session, total, repeat))
+    return results
+
+
+def explain(engine):
+    prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+    with engine.connect() as connection:
+        for name, stmt, keys in cases(connection):
+            page = stmt.order_by(*keys).limit(DEFAULT_PAGE_SIZE)
+            sql = str(page.compile(engine, compile_kwargs={"literal_binds": True}))
+            print(f"\n-- {name}")
+            for row in connection.execute(text(prefix + sql)):
+                print("   ", row[-1])
+
+
+def declared_indexes():
+    return [index for table in Base.metadata.sorted_tables for index in table.indexes]
+
+
+def run(url, sizes, repeat, show_plans):
+    engine = create_engine(url)
+    print(f"{'contrats':>10} | {'filtre':<26} | {'page avant':>10} | {'page après':>10} | "
+          f"{'total avant':>11} | {'total après':>11}")
+
+    for size in sizes:
+        reset_database(engine, size)
+
+        # Avant : tables sans les index déclarés (schéma d'origine)
+        with engine.begin() as connection:
+            for index in declared_indexes():
+                index.drop(connection)
+            connection.execute(text("ANALYZE"))
+        before = measure(engine, repeat)
+
+        # Après : création des index puis mise à jour des statistiques du planificateur
+        with engine.begin() as connection:
+            for index in declared_indexes():
+                index.create(connection)
+            connection.execute(text("ANALYZE"))
+        after = measure(engine, repeat)
+
+        for name in before:
+            print(f"{size:>10} | {name:<26} | {before[name][0]:>8.1f}ms | {after[name][0]:>8.1f}ms | "
+                  f"{before[name][1]:>9.1f}ms | {after[name][1]:>9.1f}ms")
+
+        if show_plans:
+            explain(engine)
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latence des filtres de liste avant / après index")
+    parser.add_argument("--url", default=DEFAULT_URL, help="Base de benchmark (tables recréées)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Nombres de contrats")
+    parser.add_argument("--repeat", type=int, default=5, help="Exécutions par mesure (médiane)")
+    parser.add_argument("--explain", action="store_true", help="Affiche le plan de chaque requête")
+    args = parser.parse_args()
+    run(args.url, args.sizes, args.repeat, args.explain)
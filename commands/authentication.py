@@ -0,0 +1,51 @@
+import click
+from commands.common import monitored
+from token_store import write_token, invalidate_identity_cache
+
+
+# === Groupe de commandes d'authentification ===
+@click.group()
+def auth():
+    """Commandes d'authentification"""
+    pass
+
+@auth.command()
+@click.option("--username", prompt=True)
+@click.option("--password", prompt=True, hide_input=True)
+@monitored
+def login(username, password):
+    """Authentification de l'utilisateur"""
+    from auth import create_access_token
+    from config.db import Session
+    from models.models import Employee
+    from logger import log_exception
+
+    session = Session()
+    print(f"Connexion à la base de données : {session.bind.url}")
+    print(f"Username: {username}")
+
+    try:
+        employee = session.query(Employee).filter_by(username=username).first()
+        if employee and employee.check_password(password):
+            token = create_access_token(username, employee)
+            write_token(token)
+            click.echo("Connexion réussie !")
+        else:
+            click.echo("Échec de l'authentification")
+    except Exception as e:
+        log_exception(e)
+        click.echo(f"Erreur lors de l'authentification: {str(e)}")
+    finally:
+        session.close()
+
+@auth.command()
+def logout():
+    """Déconnexion de l'utilisateur"""
+    try:
+        write_token("")
+        invalidate_identity_cache()
+        click.echo("Déconnexion réussie !")
+    except Exception as e:
+        from logger import log_exception
+        log_exception(e)
+        click.echo(f"Erreur lors de la déconnexion : {str(e)}")
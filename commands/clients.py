@@ -0,0 +1,169 @@
+import time
+import click
+from commands.common import (
+    get_token, monitored, listing_options, check_stream_options, page_size,
+    echo_stream, echo_next_page, echo_import_report
+)
+
+
+# === Groupe de commandes pour les clients ===
+@click.group()
+def clients():
+    """Gestion des clients"""
+    pass
+
+def format_client(client):
+    """Ligne d'affichage d'un client (ClientRow)"""
+    return (
+        f"ID: {client.id} | "
+        f"Nom complet: {client.nom_complet} | "
+        f"Email: {client.email} | "
+        f"Entreprise: {client.entreprise} | "
+        f"Téléphone: {client.telephone or 'Non renseigné'} | "
+        f"Commercial: {client.commercial or 'Non assigné'} | "
+        f"Date création: {client.date_creation.strftime('%Y-%m-%d %H:%M')} | "
+        f"Dernière mise à jour: {client.derniere_mise_a_jour.strftime('%Y-%m-%d %H:%M')}"
+    )
+
+@clients.command(name="list")
+@listing_options
+@monitored
+def list_clients(limit, after, stream):
+    """Liste tous les clients accessibles"""
+    from crud.read import ReadService
+    from config.db import session_scope
+    from logger import log_exception
+
+    check_stream_options(stream, limit, after)
+
+    token = get_token()
+    if not token:
+        click.echo("Vous devez être connecté")
+        return
+
+    try:
+        with session_scope() as session:
+            if stream:
+                rows = ReadService.iter_clients(token, session=session)
+                echo_stream(rows, format_client, "Liste des Clients:",
+                            "Aucun client trouvé ou accès non autorisé.")
+                return
+
+            clients, next_cursor = ReadService.get_clients_page(
+                token, page_size(limit, after), after, session=session
+            )
+
+            if not clients:
+                click.echo("Aucun client trouvé ou accès non autorisé.")
+                return
+
+            click.echo("\nListe des Clients:")
+            for client in clients:
+                click.echo(format_client(client))
+            echo_next_page(next_cursor)
+    except Exception as e:
+        log_exception(e)
+        click.echo(f"Erreur lors de la récupération des clients : {str(e)}")
+
+@clients.command(name="add")
+@click.option('--nom', prompt=True, help="Nom complet du client")
+@click.option('--email', prompt=True, help="Email du client")
+@click.option('--entreprise', prompt=True, help="Nom de l'entreprise")
+@click.option('--telephone', prompt=True, help="Numéro de téléphone", default="")
+@monitored
+def add_client(nom, email, entreprise, telephone):
+    """Ajoute un nouveau client"""
+    from crud.create import CreateService
+    from config.db import session_scope
+    from logger import log_exception
+
+    token = get_token()
+    if not token:
+        click.echo("Vous devez être connecté")
+        return
+
+    try:
+        with session_scope() as session:
+            client_data = {
+                'nom_complet': nom,
+                'email': email,
+                'entreprise': entreprise,
+                'telephone': telephone
+            }
+            client = CreateService.create_client(token, client_data, session=session)
+        click.echo(f"Client {client.nom_complet} créé avec succès !")
+    except Exception as e:
+        log_exception(e)
+        click.echo(f"Erreur lors de la création du client : {str(e)}")
+
+@clients.command(name="import")
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'file_format', type=click.Choice(['csv', 'jsonl']),
+              help="Format du fichier (déduit de l'extension par défaut)")
+@click.option('--chunk-size', type=click.IntRange(min=1), default=2000, show_default=True,
+              help="Lignes insérées et validées ensemble")
+@monitored
+def import_clients(path, file_format, chunk_size):
+    """
+    Importe des clients depuis un fichier CSV ou JSONL.
+    Colonnes : nom_complet, email, entreprise, telephone (optionnel),
+    commercial_id (optionnel, gestionnaires uniquement).
+    """
+    from crud.create import CreateService
+    from crud.bulk import read_records
+    from logger import log_exception
+
+    token = get_token()
+    if not token:
+        click.echo("Vous devez être connecté")
+        return
+
+    try:
+        start = time.perf_counter()
+        report = CreateService.import_clients(token, read_records(path, file_format), chunk_size)
+        elapsed = time.perf_counter() - start
+    except Exception as e:
+        log_exception(e)
+        click.echo(f"Erreur lors de l'import : {str(e)}")
+        return
+
+    echo_import_report(report, "client(s) importé(s)", elapsed)
+
+@clients.command(name="update")
+@click.argument('client_id', type=int)
+@click.option('--nom', help="Nouveau nom complet")
+@click.option('--email', help="Nouvel email")
+@click.option('--entreprise', help="Nouvelle entreprise")
+@click.option('--telephone', help="Nouveau téléphone")
+@monitored
+def update_client(client_id, nom, email, entreprise, telephone):
+    """Met à jour un client existant"""
+    from crud.update import UpdateService
+    from config.db import session_scope
+    from logger import log_exception
+
+    token = get_token()
+    if not token:
+        click.echo("Vous devez être connecté")
+        return
+
+    try:
+        with session_scope() as session:
+            update_data = {}
+            if nom:
+                update_data['nom_complet'] = nom
+            if email:
+                update_data['email'] = email
+            if entreprise:
+                update_data['entreprise'] = entreprise
+            if telephone:
+                update_data['telephone'] = telephone
+
+            if not update_data:
+                click.echo("Aucune modification demandée")
+                return
+            UpdateService.update_client(token, client_id, update_data, session=session)
+        click.echo("Client mis à jour avec succès !")
+    except Exception as e:
+        log_exception(e)
+        click.echo(f"Erreur lors de la mise à jour : {str(e)}")
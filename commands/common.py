@@ -0,0 +1,140 @@
+import functools
+import click
+from datetime import datetime
+from token_store import read_token
+
+
+_monitoring_ready = False
+
+
+def get_token():
+    """Récupère le token stocké dans le fichier .token"""
+    return read_token()
+
+
+def validate_date(ctx, param, value):
+    """
+    Valide le format de date pour les entrées utilisateur.
+    Format attendu : YYYY-MM-DD HH:MM
+    """
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d %H:%M")
+    except ValueError:
+        raise click.BadParameter('Le format de date doit être YYYY-MM-DD HH:MM')
+
+
+def listing_options(func):
+    """Ajoute --limit/--after (pagination par curseur) et --stream à une commande de liste"""
+    func = click.option('--stream', is_flag=True,
+                        help="Affiche les lignes au fil de la lecture, en mémoire constante")(func)
+    func = click.option('--after', help="Curseur retourné par la page précédente")(func)
+    func = click.option('--limit', type=click.IntRange(min=1),
+                        help="Nombre maximum de lignes (active la pagination)")(func)
+    return func
+
+
+def page_size(limit, after):
+    """Taille de page à demander : toute la liste si ni --limit ni --after n'est donné"""
+    from crud.read import DEFAULT_PAGE_SIZE
+    return limit or (DEFAULT_PAGE_SIZE if after else None)
+
+
+def check_stream_options(stream, limit, after):
+    if stream and (limit or after):
+        raise click.UsageError("--stream ne se combine pas avec --limit/--after")
+
+
+class BufferedEcho:
+    """Regroupe les lignes affichées pour limiter le nombre d'écritures sur la sortie"""
+
+    def __init__(self, batch_size=500):
+        self.batch_size = batch_size
+        self.lines = []
+
+    def write(self, line):
+        self.lines.append(line)
+        if len(self.lines) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.lines:
+            click.echo("\n".join(self.lines))
+            self.lines = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.flush()
+
+
+def echo_stream(rows, formatter, title, empty_message):
+    """
+    Affiche les lignes à mesure qu'elles arrivent du curseur : rien n'est accumulé
+    au-delà d'un paquet, la mémoire reste stable quelle que soit la taille de la table.
+    """
+    count = 0
+    with BufferedEcho() as out:
+        for row in rows:
+            if count == 0 and title:
+                out.write(f"\n{title}")
+            out.write(formatter(row))
+            count += 1
+    if count == 0:
+        click.echo(empty_message)
+
+
+def echo_next_page(next_cursor):
+    """Indique comment obtenir la page suivante, s'il y en a une"""
+    if next_cursor:
+        click.echo(f"\nPage suivante : --after {next_cursor}")
+
+
+def echo_import_report(report, label, elapsed):
+    """Affiche les lignes rejetées puis le bilan de l'import"""
+    with BufferedEcho() as out:
+        for line, reason in sorted(report.rejects):
+            out.write(f"Ligne {line} : {reason}")
+
+    rate = report.inserted / elapsed if elapsed else 0
+    click.echo(f"\n{report.inserted} {label}, {len(report.rejects)} ligne(s) rejetée(s) "
+               f"en {elapsed:.1f} s ({rate:.0f} lignes/s)")
+
+
+def monitored(func):
+    """
+    Initialise Sentry (une fois par processus) puis exécute la commande dans une transaction Sentry
+    (mesure de performance, pas une transaction de base de données : chaque commande ouvre la sienne
+    par session_scope), en relevant ses métriques (durée, requêtes...). sentry_sdk n'est ainsi importé
+    que par les commandes qui travaillent réellement.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        global _monitoring_ready
+        if not _monitoring_ready:
+            from logger import init_sentry
+            init_sentry()
+            _monitoring_ready = True
+        import sentry_sdk
+
+        ctx = click.get_current_context(silent=True)
+        command = ctx.command_path.split(" ", 1)[-1] if ctx is not None else func.__name__
+        if ctx is not None:
+            # Nom de la commande ("contracts list") pour le rapport de --profile
+            ctx.meta["profiling.command"] = command
+        # Une transaction par commande (échantillonnée selon SENTRY_TRACES_SAMPLE_RATE) :
+        # les appels aux services y apparaissent comme des spans
+        import metrics
+
+        metrics.start_command(command)
+        status = "error"
+        try:
+            with sentry_sdk.start_transaction(op="cli.command", name=command):
+                result = func(*args, **kwargs)
+            status = "ok"
+            return result
+        finally:
+            metrics.finish_command(status)
+    return wrapper
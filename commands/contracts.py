@@ -0,0 +1,149 @@
+import click
+from commands.common import (
+    get_token, monitored, listing_options, check_stream_options, page_size,
+    echo_stream, echo_next_page
+)
+
+
+# === Groupe de commandes pour les contrats ===
+@click.group()
+def contracts():
+    """Gestion des contrats"""
+    pass
+
+def format_contract(contract):
+    """Ligne d'affichage d'un contrat (ContractRow)"""
+    return (
+        f"ID: {contract.id} | "
+        f"Client: {contract.client} | "
+        f"Commercial: {contract.commercial or 'Non assigné'} | "
+        f"Montant total: {contract.montant_total}€ | "
+        f"Montant restant: {contract.montant_restant}€ | "
+        f"Signé: {'Oui' if contract.est_signe else 'Non'} | "
+        f"Date création: {contract.date_creation.strftime('%Y-%m-%d %H:%M')} | "
+        f"Support: {contract.support or 'Non assigné'}"
+    )
+
+@contracts.command(name="list")
+@click.option('--filter', 'filter_mode',
+              type=click.Choice(['all', 'with_support', 'without_support',
+                               'signed', 'unsigned', 'fully_paid', 'not_fully_paid']),
+              default='all',
+              help="Mode de filtrage des contrats selon le rôle")
+@listing_options
+@monitored
+def list_contracts(filter_mode, limit, after, stream):
+    """Liste tous les contrats accessibles avec options de filtrage"""
+    from auth import verify_token
+    from crud.read import ReadService
+    from config.db import session_scope
+    from logger import log_exception
+
+    check_stream_options(stream, limit, after)
+
+    token = get_token()
+    if not token:
+        click.echo("Vous devez être connecté")
+        return
+
+    try:
+        with session_scope() as session:
+            # Déterminer le type de filtre selon le rôle (identité en cache, sans requête)
+            current_user = verify_token(token, session=session)
+            if not current_user:
+                click.echo("Aucun contrat trouvé ou accès non autorisé.")
+                return
+
+            filter_enum = ReadService.contract_filter(current_user, filter_mode)
+
+            if stream:
+                rows = ReadService.iter_contracts(token, filter_enum, session=session)
+                echo_stream(rows, format_contract, "Liste des Contrats:",
+                            "Aucun contrat trouvé ou accès non autorisé.")
+                return
+
+            contracts, next_cursor = ReadService.get_contracts_page(
+                token, filter_enum, page_size(limit, after), after, session=session
+            )
+
+            if not contracts:
+                click.echo("Aucun contrat trouvé ou accès non autorisé.")
+                return
+
+            click.echo("\nListe des Contrats:")
+            for contract in contracts:
+                click.echo(format_contract(contract))
+            echo_next_page(next_cursor)
+    except Exception as e:
+        log_exception(e)
+        click.echo(f"Erreur lors de la récupération des contrats : {str(e)}")
+
+
+@contracts.command(name="add")
+@click.option('--client-id', type=int, prompt=True, help="ID du client")
+@click.option('--montant-total', type=float, prompt=True, help="Montant total du contrat")
+@click.option('--montant-restant', type=float, prompt=True, help="Montant restant à payer")
+@click.option('--est-signe', is_flag=True, prompt=True, help="Le contrat est-il signé ?")
+@monitored
+def add_contract(client_id, montant_total, montant_restant, est_signe):
+    """Ajoute un nouveau contrat"""
+    from crud.create import CreateService
+    from config.db import session_scope
+    from logger import log_exception
+
+    token = get_token()
+    if not token:
+        click.echo("Vous devez être connecté")
+        return
+
+    try:
+        with session_scope() as session:
+            contract_data = {
+                'client_id': client_id,
+                'montant_total': montant_total,
+                'montant_restant': montant_restant,
+                'est_signe': est_signe
+            }
+
+            contract = CreateService.create_contract(token, contract_data, session=session)
+        click.echo(f"Contrat créé avec succès !")
+    except Exception as e:
+        log_exception(e)
+        click.echo(f"Erreur lors de la création du contrat : {str(e)}")
+
+
+@contracts.command(name="update")
+@click.argument('contract_id', type=int)
+@click.option('--montant-total', type=float, help="Nouveau montant total")
+@click.option('--montant-restant', type=float, help="Nouveau montant restant")
+@click.option('--est-signe', type=bool, help="Nouveau statut de signature")
+@monitored
+def update_contract(contract_id, montant_total, montant_restant, est_signe):
+    """Met à jour un contrat existant"""
+    from crud.update import UpdateService
+    from config.db import session_scope
+    from logger import log_exception
+
+    token = get_token()
+    if not token:
+        click.echo("Vous devez être connecté")
+        return
+
+    try:
+        with session_scope() as session:
+            update_data = {}
+            if montant_total is not None:
+                update_data['montant_total'] = montant_total
+            if montant_restant is not None:
+                update_data['montant_restant'] = montant_restant
+            if est_signe is not None:
+                update_data['est_signe'] = est_signe
+
+            if not update_data:
+                click.echo("Aucune modification demandée")
+                return
+            UpdateService.update_contract(token, contract_id, update_data, session=session)
+        click.echo("Contrat mis à jour avec succès !")
+    except Exception as e:
+        log_exception(e)
+        click.echo(f"Erreur lors de la mise à jour : {str(e)}")
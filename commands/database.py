@@ -0,0 +1,101 @@
+import click
+from commands.common import monitored
+
+
+# === Groupe de commandes d'administration de la base ===
+@click.group()
+def db():
+    """Administration de la base de données"""
+    pass
+
+@db.command(name="ping")
+@monitored
+def db_ping():
+    """Vérifie la connexion à la base de données"""
+    from config.db import ping
+    from logger import log_exception
+
+    try:
+        elapsed = ping()
+        click.echo(f"Connexion réussie à la base de données ! ({elapsed:.1f} ms)")
+    except Exception as e:
+        log_exception(e)
+        click.echo(f"Erreur de connexion : {str(e)}")
+
+
+@db.command(name="clear-cache")
+def db_clear_cache():
+    """Vide le cache local des listes"""
+    from crud.cache import invalidate_query_cache
+
+    invalidate_query_cache()
+    click.echo("Cache des listes vidé")
+
+
+@db.command(name="seed")
+@click.option('--contracts', 'nb_contracts', default="10k", show_default=True,
+              help="Nombre de contrats (1k, 10k, 100k, 1m ou un nombre), dont découlent les autres volumes")
+@click.option('--seed', default=42, show_default=True, type=int, help="Graine : même graine, mêmes données")
+@click.option('--password', default="epicevents", show_default=True,
+              help="Mot de passe des collaborateurs générés")
+@click.option('--reset', is_flag=True, help="Supprime et recrée toutes les tables avant la génération")
+@click.option('--yes', is_flag=True, help="Ne pas demander de confirmation avec --reset")
+@monitored
+def db_seed(nb_contracts, seed, password, reset, yes):
+    """Remplit la base avec un jeu de données synthétique réaliste et reproductible"""
+    import time
+    from config.db import Base, Session, get_engine
+    from crud.synthetic import SYNTHETIC_SCALES, load_synthetic_data, plan_volumes
+    from crud.search import ensure_search_indexes
+    from crud.calendar import ensure_calendar_index
+    from crud.summaries import rebuild_summaries
+    from models.permissions import setup_department_permissions
+    from logger import log_exception
+
+    try:
+        size = SYNTHETIC_SCALES.get(nb_contracts.lower()) or int(nb_contracts)
+    except ValueError:
+        raise click.BadParameter(f"volume invalide : {nb_contracts}", param_hint="--contracts")
+
+    engine = get_engine()
+    if reset:
+        if not yes:
+            click.confirm(f"Toutes les données de {engine.url.render_as_string()} seront supprimées. Continuer ?",
+                          abort=True)
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+    setup_department_permissions()
+
+    volumes = plan_volumes(size)
+    click.echo(f"Génération (graine {seed}) : {volumes.gestion} gestion, {volumes.commerciaux} commerciaux, "
+               f"{volumes.supports} supports, {volumes.clients} clients, {volumes.contracts} contrats")
+    start = time.perf_counter()
+    session = Session()
+    try:
+        load_synthetic_data(
+            session, size, seed, password,
+            progress=lambda table, count: click.echo(
+                f"  {table:<20} {count:>10} ligne(s)  ({time.perf_counter() - start:.1f} s)"
+            )
+        )
+        # Chargement hors services : synthèses du tableau de bord calculées d'un bloc
+        rebuild_summaries(session)
+        session.commit()
+    except ValueError as e:
+        session.rollback()
+        raise click.ClickException(f"{e} (utilisez --reset)")
+    except Exception as e:
+        session.rollback()
+        log_exception(e)
+        raise click.ClickException(f"Erreur lors de la génération : {e}")
+    finally:
+        session.close()
+
+    # Index de recherche et de calendrier créés ou reconstruits d'un bloc sur les données chargées
+    ensure_search_indexes(engine, rebuild=True)
+    ensure_calendar_index(engine, rebuild=True)
+    if engine.dialect.name in ("postgresql", "sqlite"):
+        # Statistiques du planificateur à jour pour les volumes chargés
+        with engine.begin() as connection:
+            connection.exec_driver_sql("ANALYZE")
+    click.echo(f"Données générées en {time.perf_counter() - start:.1f} s")
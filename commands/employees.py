@@ -0,0 +1,212 @@
+import time
+import click
+from commands.common import (
+    get_token, monitored, listing_options, check_stream_options, page_size,
+    echo_stream, echo_next_page, echo_import_report
+)
+
+
+# === Groupe de commandes pour les collaborateurs ===
+@click.group()
+def employees():
+    """Gestion des collaborateurs"""
+    pass
+
+
+def format_employee(employee):
+    """Ligne d'affichage d'un collaborateur (EmployeeRow)"""
+    return (
+        f"ID: {employee.id} | "
+        f"Username: {employee.username} | "
+        f"Nom: {employee.nom} | "
+        f"Prénom: {employee.prenom} | "
+        f"Email: {employee.email} | "
+        f"Téléphone: {employee.telephone or 'Non renseigné'} | "
+        f"Département: {employee.departement} | "
+        f"Date création: {employee.date_creation.strftime('%Y-%m-%d %H:%M')} | "
+    )
+
+
+@employees.command(name="list")
+@listing_options
+@monitored
+def list_employees(limit, after, stream):
+    """Liste tous les employés"""
+    from crud.read import ReadService
+    from config.db import session_scope
+    from logger import log_exception
+
+    check_stream_options(stream, limit, after)
+
+    token = get_token()
+    if not token:
+        click.echo("Vous devez être connecté")
+        return
+
+    try:
+        with session_scope() as session:
+            if stream:
+                rows = ReadService.iter_employees(token, session=session)
+                echo_stream(rows, format_employee, None,
+                            "Aucun employé trouvé.")
+                return
+
+            employees, next_cursor = ReadService.get_employees_page(
+                token, page_size(limit, after), after, session=session
+            )
+
+            if not employees:
+                click.echo("Aucun employé trouvé.")
+                return
+
+            for employee in employees:
+                click.echo(format_employee(employee))
+            echo_next_page(next_cursor)
+    except Exception as e:
+        log_exception(e)
+        click.echo(f"Erreur lors de la récupération des employés : {str(e)}")
+
+
+@employees.command(name="add")
+@click.option('--username', prompt=True, help="Nom d'utilisateur")
+@click.option('--email', prompt=True, help="Email")
+@click.option('--nom', prompt=True, help="Nom")
+@click.option('--prenom', prompt=True, help="Prénom")
+@click.option('--telephone', prompt=True, help="Téléphone", default="")
+@click.option('--departement', type=click.Choice(['COMMERCIAL', 'SUPPORT', 'GESTION'], case_sensitive=False), prompt=True)
+@click.option('--password', prompt=True, hide_input=True, confirmation_prompt=True)
+@monitored
+def add_employee(username, email, nom, prenom, telephone, departement, password):
+    """Ajoute un nouveau collaborateur"""
+    from crud.create import CreateService
+    from config.db import session_scope
+    from logger import log_exception
+
+    token = get_token()
+    if not token:
+        click.echo("Vous devez être connecté")
+        return
+
+    try:
+        with session_scope() as session:
+            employee_data = {
+                'username': username,
+                'email': email,
+                'nom': nom,
+                'prenom': prenom,
+                'telephone': telephone,
+                'departement': departement.upper(),
+                'password': password
+            }
+
+            employee = CreateService.create_employee(token, employee_data, session=session)
+        click.echo(f"Collaborateur {employee.prenom} {employee.nom} créé avec succès !")
+    except Exception as e:
+        log_exception(e)
+        click.echo(f"Erreur lors de la création du collaborateur : {str(e)}")
+
+
+@employees.command(name="import")
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'file_format', type=click.Choice(['csv', 'jsonl']),
+              help="Format du fichier (déduit de l'extension par défaut)")
+@click.option('--chunk-size', type=click.IntRange(min=1), default=500, show_default=True,
+              help="Lignes hachées, insérées et validées ensemble")
+@click.option('--workers', type=click.IntRange(min=1),
+              help="Processus de hachage des mots de passe (par défaut : un par cœur)")
+@monitored
+def import_employees(path, file_format, chunk_size, workers):
+    """
+    Importe des collaborateurs depuis un fichier CSV ou JSONL.
+    Colonnes : username, email, nom, prenom, departement, password, telephone (optionnel).
+    """
+    from crud.create import CreateService
+    from crud.bulk import read_records
+    from logger import log_exception
+
+    token = get_token()
+    if not token:
+        click.echo("Vous devez être connecté")
+        return
+
+    try:
+        start = time.perf_counter()
+        report = CreateService.import_employees(token, read_records(path, file_format), chunk_size, workers)
+        elapsed = time.perf_counter() - start
+    except Exception as e:
+        log_exception(e)
+        click.echo(f"Erreur lors de l'import : {str(e)}")
+        return
+
+    echo_import_report(report, "collaborateur(s) importé(s)", elapsed)
+
+@employees.command(name="update")
+@click.argument('employee_id', type=int)
+@click.option('--username', help="Nouveau nom d'utilisateur")
+@click.option('--email', help="Nouvel email")
+@click.option('--nom', help="Nouveau nom")
+@click.option('--prenom', help="Nouveau prénom")
+@click.option('--telephone', help="Nouveau téléphone")
+@click.option('--departement', type=click.Choice(['COMMERCIAL', 'SUPPORT', 'GESTION'], case_sensitive=False))
+@click.option('--password', help="Nouveau mot de passe", hide_input=True)
+@monitored
+def update_employee(employee_id, username, email, nom, prenom, telephone, departement, password):
+    """Met à jour un collaborateur existant"""
+    from crud.update import UpdateService
+    from config.db import session_scope
+    from logger import log_exception
+
+    token = get_token()
+    if not token:
+        click.echo("Vous devez être connecté")
+        return
+
+    try:
+        with session_scope() as session:
+            update_data = {}
+            if username:
+                update_data['username'] = username
+            if email:
+                update_data['email'] = email
+            if nom:
+                update_data['nom'] = nom
+            if prenom:
+                update_data['prenom'] = prenom
+            if telephone:
+                update_data['telephone'] = telephone
+            if departement:
+                update_data['departement'] = departement.upper()
+            if password:
+                update_data['password'] = password
+
+            if not update_data:
+                click.echo("Aucune modification demandée")
+                return
+            UpdateService.update_employee(token, employee_id, update_data, session=session)
+        click.echo("Collaborateur mis à jour avec succès !")
+    except Exception as e:
+        log_exception(e)
+        click.echo(f"Erreur lors de la mise à jour : {str(e)}")
+
+
+@employees.command(name="delete")
+@click.argument('employee_id', type=int)
+@monitored
+def delete_employee(employee_id):
+    """Supprime un collaborateur"""
+    from crud.delete import DeleteService
+    from config.db import session_scope
+    from logger import log_exception
+
+    token = get_token()
+    if not token:
+        click.echo("Vous devez être connecté")
+        return
+
+    try:
+        with session_scope() as session:
+            DeleteService.delete_employee(token, employee_id, session=session)
+        click.echo("Collaborateur supprimé avec succès")
+    except Exception as e:
+        log_exception(e)
+        click.echo(f"Erreur lors de la suppression : {str(e)}")
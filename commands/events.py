@@ -0,0 +1,273 @@
+import functools
+import click
+from commands.common import (
+    get_token, monitored, listing_options, check_stream_options, page_size,
+    echo_stream, echo_next_page
+)
+
+
+# === Groupe de commandes pour les événements ===
+@click.group()
+def events():
+    """Gestion des événements"""
+    pass
+
+def format_event(event, with_notes=False):
+    """Ligne d'affichage d'un événement (EventRow), notes comprises si elles ont été lues"""
+    line = (
+        f"ID: {event.id} | {event.nom} | "
+        f"Date: {event.date_debut.strftime('%Y-%m-%d %H:%M')} | "
+        f"Lieu: {event.lieu} | "
+        f"Contrat: {event.client} | "
+        f"Support: {event.support or 'Non assigné'} | "
+        f"Participants: {event.nb_participants or 'Non renseigné'}"
+    )
+    if with_notes:
+        line += f" | Notes: {event.notes or 'Aucune'}"
+    return line
+
+@events.command(name="list")
+@click.option('--filter', 'filter_mode',
+              type=click.Choice(['all', 'my_events']),
+              default='all',
+              help="Mode de filtrage des événements")
+@click.option('--sort', 'order_by',
+              type=click.Choice(['id', 'date_debut']),
+              default='id',
+              help="Ordre de tri (date_debut : chronologique)")
+@click.option('--notes', 'with_notes', is_flag=True, help="Affiche aussi les notes des événements")
+@listing_options
+@monitored
+def list_events(filter_mode, order_by, with_notes, limit, after, stream):
+    """
+    Liste les événements avec option de filtrage :
+    - Tous les événements (all)
+    - Uniquement mes événements (my_events) pour les supports
+    """
+    from crud.read import ReadService, EventFilterSupport
+    from config.db import session_scope
+    from logger import log_exception
+
+    check_stream_options(stream, limit, after)
+
+    token = get_token()
+    if not token:
+        click.echo("Vous devez être connecté")
+        return
+
+    try:
+        with session_scope() as session:
+            # Convertir le mode de filtrage en enum
+            filter_enum = EventFilterSupport(filter_mode) if filter_mode in ['all', 'my_events'] else None
+
+            if stream:
+                rows = ReadService.iter_events(token, filter_enum, order_by,
+                                               with_notes=with_notes, session=session)
+                echo_stream(rows, functools.partial(format_event, with_notes=with_notes),
+                            "Liste des Événements:", "Aucun événement trouvé ou accès non autorisé.")
+                return
+
+            events, next_cursor = ReadService.get_events_page(
+                token, filter_enum, order_by, page_size(limit, after), after,
+                with_notes=with_notes, session=session
+            )
+
+            if not events:
+                click.echo("Aucun événement trouvé ou accès non autorisé.")
+                return
+
+            click.echo("\nListe des Événements:")
+            for event in events:
+                click.echo(format_event(event, with_notes))
+            echo_next_page(next_cursor)
+    except Exception as e:
+        log_exception(e)
+        click.echo(f"Erreur lors de la récupération des événements : {str(e)}")
+
+
+@events.command(name="add")
+@click.option('--nom', prompt=True, help="Nom de l'événement")
+@click.option('--lieu', prompt=True, help="Lieu de l'événement")
+@click.option('--date-debut', type=click.DateTime(formats=["%Y-%m-%d %H:%M"]), prompt=True, help="Date de début")
+@click.option('--date-fin', type=click.DateTime(formats=["%Y-%m-%d %H:%M"]), prompt=True, help="Date de fin")
+@click.option('--contrat-id', type=int, prompt=True, help="ID du contrat associé")
+@click.option('--nb-participants', type=int, prompt=True, help="Nombre de participants", default=0)
+@click.option('--notes', help="Notes sur l'événement", default="")
+@monitored
+def add_event(nom, lieu, date_debut, date_fin, contrat_id, nb_participants, notes):
+    """Ajoute un nouvel événement"""
+    from crud.create import CreateService
+    from config.db import session_scope
+    from logger import log_exception
+
+    token = get_token()
+    if not token:
+        click.echo("Vous devez être connecté")
+        return
+
+    try:
+        with session_scope() as session:
+            event_data = {
+                'nom': nom,
+                'lieu': lieu,
+                'date_debut': date_debut,
+                'date_fin': date_fin,
+                'contrat_id': contrat_id,
+                'nb_participants': nb_participants,
+                'notes': notes
+            }
+
+            event = CreateService.create_event(token, event_data, session=session)
+        click.echo(f"Événement créé avec succès !")
+    except Exception as e:
+        log_exception(e)
+        click.echo(f"Erreur lors de la création de l'événement : {str(e)}")
+
+
+@events.command(name="update")
+@click.argument('event_id', type=int)
+@click.option('--nom', help="Nouveau nom de l'événement")
+@click.option('--lieu', help="Nouveau lieu")
+@click.option('--date-debut', type=click.DateTime(formats=["%Y-%m-%d %H:%M"]), help="Nouvelle date de début")
+@click.option('--date-fin', type=click.DateTime(formats=["%Y-%m-%d %H:%M"]), help="Nouvelle date de fin")
+@click.option('--contrat-id', type=int, help="Nouveau ID de contrat")
+@click.option('--contact-support-id', type=int, help="ID du support assigné")
+@click.option('--nb-participants', type=int, help="Nombre de participants")
+@click.option('--notes', help="Notes sur l'événement", required=False, default="")
+@monitored
+def update_event(event_id, nom, lieu, date_debut, date_fin, contrat_id, contact_support_id, nb_participants, notes):
+    """Met à jour un événement existant"""
+    from crud.update import UpdateService
+    from config.db import session_scope
+    from logger import log_exception
+
+    token = get_token()
+    if not token:
+        click.echo("Vous devez être connecté")
+        return
+
+    try:
+        with session_scope() as session:
+            update_data = {}
+            if nom:
+                update_data['nom'] = nom
+            if lieu:
+                update_data['lieu'] = lieu
+            if date_debut:
+                update_data['date_debut'] = date_debut
+            if date_fin:
+                update_data['date_fin'] = date_fin
+            if contrat_id:
+                update_data['contrat_id'] = contrat_id
+            if contact_support_id:
+                update_data['contact_support_id'] = contact_support_id
+            if nb_participants is not None:
+                update_data['nb_participants'] = nb_participants
+            if notes:
+                update_data['notes'] = notes
+
+            if not update_data:
+                click.echo("Aucune modification demandée")
+                return
+            UpdateService.update_event(token, event_id, update_data, session=session)
+        click.echo("Événement mis à jour avec succès !")
+    except Exception as e:
+        log_exception(e)
+        click.echo(f"Erreur lors de la mise à jour : {str(e)}")
+
+
+@events.command(name="calendar")
+@click.option('--from', 'start', type=click.DateTime(formats=["%Y-%m-%d", "%Y-%m-%d %H:%M"]),
+              help="Début du créneau (par défaut : aujourd'hui 00:00)")
+@click.option('--to', 'end', type=click.DateTime(formats=["%Y-%m-%d", "%Y-%m-%d %H:%M"]),
+              help="Fin du créneau, exclue (par défaut : 7 jours après le début)")
+@click.option('--support', 'support_id', type=int, help="ID du support dont afficher le planning")
+@click.option('--mine', is_flag=True, help="Mon planning (à la place de --support)")
+@monitored
+def calendar(start, end, support_id, mine):
+    """Événements qui chevauchent un créneau, dans l'ordre chronologique"""
+    from datetime import datetime, timedelta
+    from crud.read import ReadService
+    from config.db import session_scope
+    from auth import verify_token
+    from logger import log_exception
+
+    token = get_token()
+    if not token:
+        click.echo("Vous devez être connecté")
+        return
+
+    start = start or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    end = end or start + timedelta(days=7)
+    if end <= start:
+        raise click.BadParameter("la fin du créneau doit être postérieure à son début", param_hint="--to")
+
+    try:
+        with session_scope() as session:
+            if mine:
+                current_user = verify_token(token, session=session)
+                support_id = current_user.id if current_user else None
+            rows = ReadService.calendar(token, start, end, support_id, session=session)
+    except Exception as e:
+        log_exception(e)
+        click.echo(f"Erreur lors de la lecture du calendrier : {str(e)}")
+        return
+
+    if not rows:
+        click.echo(f"Aucun événement entre le {start:%Y-%m-%d %H:%M} et le {end:%Y-%m-%d %H:%M}.")
+        return
+
+    click.echo(f"\nÉvénements du {start:%Y-%m-%d %H:%M} au {end:%Y-%m-%d %H:%M} :")
+    for row in rows:
+        click.echo(
+            f"{row.date_debut:%Y-%m-%d %H:%M} → {row.date_fin:%Y-%m-%d %H:%M} | ID: {row.id} | {row.nom} | "
+            f"Lieu: {row.lieu} | Contrat: {row.client} | Support: {row.support or 'Non assigné'}"
+        )
+
+
+@events.command(name="auto-assign")
+@click.option('--dry-run', is_flag=True, help="Affiche la répartition sans l'enregistrer")
+@click.option('--include-past', is_flag=True, help="Traite aussi les événements terminés")
+@monitored
+def auto_assign(dry_run, include_past):
+    """
+    Affecte un support à chaque événement qui n'en a pas : le moins chargé des supports
+    libres sur le créneau de l'événement (Gestion uniquement)
+    """
+    from crud.update import UpdateService
+    from config.db import session_scope
+    from logger import log_exception
+
+    token = get_token()
+    if not token:
+        click.echo("Vous devez être connecté")
+        return
+
+    try:
+        with session_scope() as session:
+            plan = UpdateService.auto_assign_supports(token, include_past, dry_run, session=session)
+    except PermissionError as e:
+        click.echo(f"Erreur : {str(e)}")
+        return
+    except Exception as e:
+        log_exception(e)
+        click.echo(f"Erreur lors de l'affectation des supports : {str(e)}")
+        return
+
+    if not plan.assignments and not plan.unassigned and not plan.taken:
+        click.echo("Aucun événement sans support.")
+        return
+
+    click.echo(f"{'support':<20} {'avant':>7} {'après':>7}")
+    for load in plan.loads:
+        click.echo(f"{load.support:<20} {load.before:>7} {load.after:>7}")
+    click.echo(f"\n{len(plan.assignments)} événement(s) affecté(s)"
+               + (" (simulation, rien n'est enregistré)" if dry_run else ""))
+    if plan.unassigned:
+        shown = ", ".join(str(event_id) for event_id in plan.unassigned[:20])
+        more = "..." if len(plan.unassigned) > 20 else ""
+        click.echo(f"{len(plan.unassigned)} événement(s) sans support libre sur leur créneau : {shown}{more}")
+    if plan.taken:
+        shown = ", ".join(str(event_id) for event_id in plan.taken[:20])
+        more = "..." if len(plan.taken) > 20 else ""
+        click.echo(f"{len(plan.taken)} événement(s) affecté(s) entre-temps par un autre utilisateur : {shown}{more}")
@@ -0,0 +1,69 @@
+import time
+import click
+from commands.common import get_token, monitored
+
+
+# === Groupe de commandes d'export ===
+@click.group()
+def export():
+    """Export des données (CSV, JSONL, Parquet)"""
+    pass
+
+def export_options(func):
+    """Options communes aux exports : format, destination et compression"""
+    func = click.option('--compression', type=click.Choice(['none', 'gzip', 'zstd']), default='none',
+                        show_default=True, help="Compression (Parquet : compression interne des colonnes)")(func)
+    func = click.option('--output', '-o', default='-', show_default=True,
+                        help="Fichier de destination ('-' : sortie standard)")(func)
+    func = click.option('--format', 'file_format', type=click.Choice(['csv', 'jsonl', 'parquet']),
+                        default='csv', show_default=True, help="Format du fichier")(func)
+    return func
+
+def run_export(entity, file_format, output, compression, filter_mode=None):
+    """Lance l'export ; les messages vont sur la sortie d'erreur pour ne pas se mêler aux données"""
+    from crud.export import ExportService
+    from logger import log_exception
+
+    token = get_token()
+    if not token:
+        click.echo("Vous devez être connecté", err=True)
+        return
+
+    try:
+        start = time.perf_counter()
+        count = ExportService.export(token, entity, output, file_format, compression, filter_mode)
+        elapsed = time.perf_counter() - start
+    except Exception as e:
+        log_exception(e)
+        click.echo(f"Erreur lors de l'export : {str(e)}", err=True)
+        return
+
+    destination = "la sortie standard" if output == "-" else output
+    click.echo(f"{count} ligne(s) exportée(s) vers {destination} en {elapsed:.1f} s", err=True)
+
+@export.command(name="clients")
+@export_options
+@monitored
+def export_clients(file_format, output, compression):
+    """Exporte tous les clients"""
+    run_export("clients", file_format, output, compression)
+
+@export.command(name="contracts")
+@export_options
+@click.option('--filter', 'filter_mode',
+              type=click.Choice(['all', 'with_support', 'without_support', 'signed', 'unsigned',
+                                 'fully_paid', 'not_fully_paid']),
+              default='all', help="Filtre de la liste des contrats (selon le rôle)")
+@monitored
+def export_contracts(file_format, output, compression, filter_mode):
+    """Exporte les contrats visibles, avec les mêmes filtres que `contracts list`"""
+    run_export("contracts", file_format, output, compression, filter_mode)
+
+@export.command(name="events")
+@export_options
+@click.option('--filter', 'filter_mode', type=click.Choice(['all', 'my_events']), default='all',
+              help="Filtre de la liste des événements (support)")
+@monitored
+def export_events(file_format, output, compression, filter_mode):
+    """Exporte les événements visibles, notes comprises"""
+    run_export("events", file_format, output, compression, filter_mode)
@@ -0,0 +1,25 @@
+import click
+
+
+# === Groupe de commandes des métriques ===
+@click.group()
+def metrics():
+    """Métriques des commandes (durées, requêtes, cache)"""
+    pass
+
+@metrics.command(name="show")
+@click.option('--dir', 'directory', help="Répertoire des métriques (METRICS_DIR par défaut)")
+def show_metrics(directory):
+    """Affiche les percentiles de durée (p50/p95/p99) de chaque commande"""
+    from metrics import read_state, summary
+
+    rows = summary(read_state(directory))
+    if not rows:
+        click.echo("Aucune métrique enregistrée.")
+        return
+
+    click.echo(f"{'commande':<24} {'exécutions':>10} {'erreurs':>8} {'p50':>9} {'p95':>9} {'p99':>9} "
+               f"{'base/exéc.':>10}")
+    for command, count, errors, p50, p95, p99, db_mean in rows:
+        click.echo(f"{command:<24} {count:>10} {errors:>8} {p50 * 1000:>7.1f}ms {p95 * 1000:>7.1f}ms "
+                   f"{p99 * 1000:>7.1f}ms {db_mean * 1000:>8.1f}ms")
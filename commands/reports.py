@@ -0,0 +1,211 @@
+import click
+from commands.common import get_token, monitored
+
+
+# === Groupe de commandes des rapports ===
+@click.group()
+def reports():
+    """Rapports agrégés et tableau de bord (chiffre par commercial, encours clients)"""
+    pass
+
+def report_filter_option(func):
+    """Même filtre de contrats que `contracts list`, selon le rôle"""
+    return click.option('--filter', 'filter_mode',
+                        type=click.Choice(['all', 'with_support', 'without_support',
+                                           'signed', 'unsigned', 'fully_paid', 'not_fully_paid']),
+                        default='all',
+                        help="Mode de filtrage des contrats selon le rôle")(func)
+
+def current_filter(token, filter_mode, session):
+    """Filtre de contrats du rôle de l'utilisateur (None si le token est invalide)"""
+    from auth import verify_token
+    from crud.read import ReadService
+
+    current_user = verify_token(token, session=session)
+    if not current_user:
+        return None, None
+    return current_user, ReadService.contract_filter(current_user, filter_mode)
+
+@reports.command(name="commercials")
+@report_filter_option
+@monitored
+def commercials_report(filter_mode):
+    """Chiffre signé / non signé, restant dû et contrats sans événement par commercial"""
+    from crud.reports import ReportService
+    from config.db import session_scope
+    from logger import log_exception
+
+    token = get_token()
+    if not token:
+        click.echo("Vous devez être connecté")
+        return
+
+    try:
+        with session_scope() as session:
+            current_user, filter_enum = current_filter(token, filter_mode, session)
+            rows = ReportService.commercials_report(token, filter_enum, session=session) if current_user else []
+    except Exception as e:
+        log_exception(e)
+        click.echo(f"Erreur lors du calcul du rapport : {str(e)}")
+        return
+
+    if not rows:
+        click.echo("Aucun contrat trouvé ou accès non autorisé.")
+        return
+
+    click.echo(f"{'rang':>4} {'commercial':<20} {'contrats':>9} {'signés':>7} {'signé €':>15} "
+               f"{'non signé €':>15} {'restant dû €':>15} {'sans évt':>8} {'part':>7}")
+    for row in rows:
+        click.echo(f"{row.rank:>4} {row.commercial or 'Non assigné':<20} {row.contracts:>9} "
+                   f"{row.signed_contracts:>7} {row.signed_total:>15} {row.unsigned_total:>15} "
+                   f"{row.outstanding:>15} {row.without_event:>8} {row.signed_share:>7.1%}")
+    click.echo(f"{'':>4} {'Total':<20} {sum(row.contracts for row in rows):>9} "
+               f"{sum(row.signed_contracts for row in rows):>7} {sum(row.signed_total for row in rows):>15} "
+               f"{sum(row.unsigned_total for row in rows):>15} {sum(row.outstanding for row in rows):>15} "
+               f"{sum(row.without_event for row in rows):>8}")
+
+@reports.command(name="receivables")
+@report_filter_option
+@click.option('--limit', default=20, show_default=True, type=click.IntRange(min=1),
+              help="Nombre de clients affichés")
+@monitored
+def receivables_report(filter_mode, limit):
+    """Clients aux plus gros montants restant dus sur contrats signés"""
+    from crud.reports import ReportService
+    from config.db import session_scope
+    from logger import log_exception
+
+    token = get_token()
+    if not token:
+        click.echo("Vous devez être connecté")
+        return
+
+    try:
+        with session_scope() as session:
+            current_user, filter_enum = current_filter(token, filter_mode, session)
+            rows = ReportService.receivables_report(token, filter_enum, limit, session=session) \
+                if current_user else []
+    except Exception as e:
+        log_exception(e)
+        click.echo(f"Erreur lors du calcul du rapport : {str(e)}")
+        return
+
+    if not rows:
+        click.echo("Aucun montant restant dû.")
+        return
+
+    click.echo(f"{'rang':>4} {'client':<30} {'commercial':<20} {'contrats':>8} {'restant dû €':>15} "
+               f"{'plus ancien':>11} {'cumul':>7}")
+    for row in rows:
+        oldest = row.oldest_unpaid.strftime('%Y-%m-%d') if row.oldest_unpaid else ''
+        click.echo(f"{row.rank:>4} {row.client[:30]:<30} {row.commercial or 'Non assigné':<20} "
+                   f"{row.unpaid_contracts:>8} {row.outstanding:>15} {oldest:>11} {row.cumulative_share:>7.1%}")
+
+@reports.command(name="dashboard")
+@click.option('--limit', default=10, show_default=True, type=click.IntRange(min=1),
+              help="Nombre de clients affichés")
+@monitored
+def dashboard(limit):
+    """Tableau de bord lu dans les tables de synthèse (sans parcourir les contrats)"""
+    from crud.reports import ReportService
+    from config.db import session_scope
+    from logger import log_exception
+
+    token = get_token()
+    if not token:
+        click.echo("Vous devez être connecté")
+        return
+
+    try:
+        with session_scope() as session:
+            board = ReportService.dashboard(token, limit, session=session)
+    except Exception as e:
+        log_exception(e)
+        click.echo(f"Erreur lors de la lecture du tableau de bord : {str(e)}")
+        return
+
+    if board is None:
+        click.echo("Accès non autorisé.")
+        return
+
+    def next_event(value):
+        return value.strftime('%Y-%m-%d %H:%M') if value else ''
+
+    click.echo(f"{'commercial':<20} {'contrats':>9} {'signés':>7} {'signé €':>15} {'restant dû €':>15} "
+               f"{'prochain événement':>18}")
+    for row in board.commercials:
+        click.echo(f"{row.commercial:<20} {row.contracts:>9} {row.signed_contracts:>7} {row.signed_total:>15} "
+                   f"{row.outstanding:>15} {next_event(row.next_event):>18}")
+
+    if board.clients:
+        click.echo(f"\n{'client':<30} {'commercial':<20} {'contrats':>8} {'signé €':>15} {'restant dû €':>15} "
+                   f"{'prochain événement':>18}")
+        for row in board.clients:
+            click.echo(f"{row.client[:30]:<30} {row.commercial or 'Non assigné':<20} {row.contracts:>8} "
+                       f"{row.signed_total:>15} {row.outstanding:>15} {next_event(row.next_event):>18}")
+
+@reports.command(name="rebuild")
+@monitored
+def rebuild():
+    """Recalcule entièrement les tables de synthèse du tableau de bord"""
+    import time
+    from crud.reports import ReportService
+    from config.db import session_scope
+    from logger import log_exception
+
+    token = get_token()
+    if not token:
+        click.echo("Vous devez être connecté")
+        return
+
+    start = time.perf_counter()
+    try:
+        with session_scope() as session:
+            counts = ReportService.rebuild_summaries(token, session=session)
+    except PermissionError as e:
+        click.echo(f"Erreur : {str(e)}")
+        return
+    except Exception as e:
+        log_exception(e)
+        click.echo(f"Erreur lors du recalcul des synthèses : {str(e)}")
+        return
+
+    for table, count in counts.items():
+        click.echo(f"{table:<22} {count:>10} ligne(s)")
+    click.echo(f"Synthèses recalculées en {time.perf_counter() - start:.1f} s")
+
+@reports.command(name="check")
+@click.option('--limit', default=20, show_default=True, type=click.IntRange(min=1),
+              help="Nombre maximal d'écarts affichés")
+@monitored
+def check(limit):
+    """Compare les tables de synthèse aux contrats (code de sortie 1 en cas d'écart)"""
+    from crud.reports import ReportService
+    from config.db import session_scope
+    from logger import log_exception
+
+    token = get_token()
+    if not token:
+        click.echo("Vous devez être connecté")
+        return
+
+    try:
+        with session_scope() as session:
+            discrepancies = ReportService.check_summaries(token, session=session)
+    except PermissionError as e:
+        click.echo(f"Erreur : {str(e)}")
+        return
+    except Exception as e:
+        log_exception(e)
+        click.echo(f"Erreur lors de la vérification des synthèses : {str(e)}")
+        return
+
+    if not discrepancies:
+        click.echo("Synthèses cohérentes avec les contrats.")
+        return
+
+    for gap in discrepancies[:limit]:
+        click.echo(f"{gap.table} {gap.key} {gap.column} : attendu {gap.expected}, enregistré {gap.stored}")
+    if len(discrepancies) > limit:
+        click.echo(f"... et {len(discrepancies) - limit} autre(s) écart(s)")
+    raise click.ClickException(f"{len(discrepancies)} écart(s) : lancez `reports rebuild`")
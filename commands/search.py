@@ -0,0 +1,58 @@
+import click
+from commands.common import get_token, monitored
+
+
+SEARCH_TITLES = {"clients": "Clients", "contracts": "Contrats", "events": "Événements"}
+
+
+@click.command()
+@click.argument('query', nargs=-1, required=True)
+@click.option('--type', 'entities', multiple=True,
+              type=click.Choice(['clients', 'contracts', 'events']),
+              help="Entité recherchée (répétable ; toutes par défaut)")
+@click.option('--limit', default=20, show_default=True, type=click.IntRange(min=1),
+              help="Nombre maximal de résultats par entité")
+@monitored
+def search(query, entities, limit):
+    """
+    Recherche dans les clients (nom, email, entreprise, téléphone), leurs contrats
+    et les événements (nom, lieu, notes), du plus pertinent au moins pertinent.
+    Chaque mot peut être un début de mot : `search dup lyon`.
+    """
+    from crud.read import ReadService
+    from crud.search import SEARCH_ENTITIES
+    from config.db import session_scope
+    from commands.clients import format_client
+    from commands.contracts import format_contract
+    from commands.events import format_event
+    from logger import log_exception
+
+    token = get_token()
+    if not token:
+        click.echo("Vous devez être connecté")
+        return
+
+    formatters = {
+        "clients": format_client,
+        "contracts": format_contract,
+        "events": lambda event: format_event(event, with_notes=True),
+    }
+    try:
+        with session_scope() as session:
+            results = ReadService.search(token, " ".join(query), entities or SEARCH_ENTITIES, limit,
+                                         session=session)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="QUERY")
+    except Exception as e:
+        log_exception(e)
+        click.echo(f"Erreur lors de la recherche : {str(e)}")
+        return
+
+    if not any(results):
+        click.echo("Aucun résultat.")
+        return
+    for entity, rows in zip(results._fields, results):
+        if rows:
+            click.echo(f"\n{SEARCH_TITLES[entity]} ({len(rows)}) :")
+            for row in rows:
+                click.echo(formatters[entity](row))
@@ -1,7 +1,9 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from dotenv import load_dotenv
 from sqlalchemy.orm import sessionmaker, declarative_base
+from contextlib import contextmanager
 import os
+import time
 
 
 # Charger les variables d'environnement
@@ -15,22 +17,100 @@ DB_PASSWORD = os.getenv("DB_PASSWORD")
 DB_HOST = os.getenv("DB_HOST")
 DB_PORT = os.getenv("DB_PORT")
 
-    
-# Construire l'URL de connexion
-DATABASE_URL = f"{DB_ENGINE}://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# Réglages du pool de connexions
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "false").lower() in ("1", "true", "yes")
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "-1"))  # en secondes, -1 = jamais
+DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "10"))  # en secondes
+
+
+# Construire l'URL de connexion (DATABASE_URL, si défini, est utilisée telle quelle)
+DATABASE_URL = os.getenv("DATABASE_URL") or \
+    f"{DB_ENGINE}://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+_engine = None
+
+
+def _engine_options():
+    """Options de l'engine selon le SGBD : SQLite n'a ni pool dimensionnable ni connect_timeout"""
+    if DATABASE_URL.startswith("sqlite"):
+        return {"connect_args": {"timeout": DB_CONNECT_TIMEOUT}}
+
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "connect_args": {"connect_timeout": DB_CONNECT_TIMEOUT}
+    }
+
+
+def get_engine():
+    """Crée l'engine SQLAlchemy au premier usage seulement (aucune connexion n'est ouverte ici)"""
+    global _engine
+    if _engine is None:
+        _engine = create_engine(DATABASE_URL, **_engine_options())
+    return _engine
+
+
+def ping():
+    """
+    Teste la connexion à la base de données.
+
+    Returns:
+        Durée de l'aller-retour en millisecondes
+    """
+    start = time.perf_counter()
+    with get_engine().connect() as connection:
+        connection.execute(text("SELECT 1"))
+    return (time.perf_counter() - start) * 1000
+
+
+class LazySessionMaker(sessionmaker):
+    """Session factory qui ne lie l'engine qu'à l'ouverture de la première session"""
+
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None:
+            self.configure(bind=get_engine())
+        return super().__call__(**local_kw)
 
-# Créer l'engine SQLAlchemy
-engine = create_engine(DATABASE_URL)
 
 # Créer une Session factory - elle va nous permettre de créer des sessions
-Session = sessionmaker(bind=engine)
+# (les objets restent lisibles après le commit, sans requête de rechargement)
+Session = LazySessionMaker(expire_on_commit=False)
+
+
+@contextmanager
+def session_scope(session=None):
+    """
+    Unité de travail : une session, une connexion, une transaction.
+
+    Si une session est fournie (celle de la commande en cours), elle est réutilisée
+    telle quelle et son propriétaire décide du commit. Sinon une session est ouverte,
+    validée en fin de bloc, annulée en cas d'erreur, puis fermée.
+    """
+    if session is not None:
+        yield session
+        return
+
+    session = Session()
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
 
 # Créer la classe Base dont vont hériter tous nos modèles
 Base = declarative_base()
 
-# Tester la connexion
-try:
-    with engine.connect() as connection:
-        print("Connexion réussie à la base de données !")
-except Exception as e:
-    print("Erreur de connexion :", e)
\ No newline at end of file
+
+def __getattr__(name):
+    """`from config.db import engine` reste possible, l'engine étant créé à la demande"""
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,2 @@
+# Enregistre l'invalidation du cache des listes au commit de toute session de la couche CRUD
+from crud import cache  # noqa: F401
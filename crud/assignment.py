@@ -0,0 +1,212 @@
+import heapq
+from bisect import bisect_right
+from typing import NamedTuple
+from sqlalchemy import select, update, func, bindparam
+from models.models import Employee, Event
+from crud.calendar import overlap_condition, execute_overlap
+from crud.cache import MODIFIED_TABLES
+from crud.bulk import chunked, IMPORT_CHUNK_SIZE
+
+
+# Affectation automatique des supports aux événements qui n'en ont pas :
+#   - les événements sont traités dans l'ordre chronologique ;
+#   - un tas ordonné par charge (nombre d'événements à venir, puis id) donne le support le
+#     moins chargé ; s'il est déjà pris sur le créneau, le suivant est essayé ;
+#   - un support occupé au début de l'événement l'est pour tous les événements suivants qui
+#     commencent avant la fin de ce créneau : il passe dans un second tas, ordonné par fin de
+#     créneau, et ne revient dans le premier qu'une fois cette heure atteinte ;
+#   - le planning de chaque support est une liste triée d'intervalles disjoints, interrogée
+#     par bisection : vérifier un créneau coûte O(log n) ;
+#   - comme dans crud.calendar, un événement de durée nulle n'occupe aucun créneau.
+# Le plan est calculé en mémoire puis appliqué en une seule requête UPDATE (executemany) ; les
+# événements affectés entre-temps par quelqu'un d'autre en sont retirés (applied_plan).
+
+
+class SupportLoad(NamedTuple):
+    support_id: int
+    support: str
+    before: int
+    after: int
+
+
+class AssignmentPlan(NamedTuple):
+    # (id de l'événement, id du support), dans l'ordre chronologique des événements
+    assignments: list
+    # Événements pour lesquels aucun support n'est libre
+    unassigned: list
+    # Charge de chaque support avant et après l'affectation (SupportLoad)
+    loads: list
+    # Événements affectés par quelqu'un d'autre entre le calcul du plan et son application
+    taken: list
+
+
+class SupportCalendar:
+    """Créneaux occupés d'un support : intervalles [début, fin) disjoints, triés par début"""
+
+    def __init__(self, intervals=()):
+        self.starts = []
+        self.ends = []
+        # Créneaux déjà réservés qui se chevauchent (saisies antérieures) : fusionnés
+        for start, end in sorted(intervals):
+            if start == end:
+                continue
+            if self.ends and start < self.ends[-1]:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def busy_until(self, start, end):
+        """
+        None si [start, end) ne chevauche aucun créneau (seuls les deux voisins sont à tester) ;
+        sinon la fin du créneau en cours à start, ou start si le conflit vient du créneau suivant.
+        """
+        if start == end:
+            return None
+        index = bisect_right(self.starts, start)
+        if index and self.ends[index - 1] > start:
+            return self.ends[index - 1]
+        if index < len(self.starts) and self.starts[index] < end:
+            return start
+        return None
+
+    def book(self, start, end):
+        """Réserve un créneau libre (voir busy_until)"""
+        if start == end:
+            return
+        index = bisect_right(self.starts, start)
+        self.starts.insert(index, start)
+        self.ends.insert(index, end)
+
+
+def plan_assignments(events, supports, loads=None, busy=None):
+    """
+    Répartit les événements sur les supports, par charge puis par disponibilité.
+
+    Args:
+        events: (id, date_debut, date_fin) des événements à affecter
+        supports: Noms des supports par id
+        loads: Charge actuelle de chaque support {id: nombre d'événements}
+        busy: Créneaux déjà réservés de chaque support {id: [(date_debut, date_fin)]}
+
+    Returns:
+        AssignmentPlan
+    """
+    loads = loads or {}
+    busy = busy or {}
+    calendars = {support: SupportCalendar(busy.get(support, ())) for support in supports}
+    available = [(loads.get(support, 0), support) for support in supports]
+    heapq.heapify(available)
+    # Supports occupés jusqu'à une heure connue : (fin du créneau, charge, id)
+    sleeping = []
+
+    assignments, unassigned = [], []
+    periods = sorted((min(date_debut, date_fin), max(date_debut, date_fin), event_id)
+                     for event_id, date_debut, date_fin in events)
+    for start, end, event_id in periods:
+        while sleeping and sleeping[0][0] <= start:
+            _, load, support = heapq.heappop(sleeping)
+            heapq.heappush(available, (load, support))
+
+        skipped = []
+        while available:
+            load, support = heapq.heappop(available)
+            until = calendars[support].busy_until(start, end)
+            if until is None:
+                calendars[support].book(start, end)
+                assignments.append((event_id, support))
+                heapq.heappush(available, (load + 1, support))
+                break
+            if until > start:
+                heapq.heappush(sleeping, (until, load, support))
+            else:
+                skipped.append((load, support))
+        else:
+            unassigned.append(event_id)
+        for entry in skipped:
+            heapq.heappush(available, entry)
+
+    final = {support: load for load, support in available}
+    final.update((support, load) for _, load, support in sleeping)
+    return AssignmentPlan(assignments, unassigned, [
+        SupportLoad(support, name, loads.get(support, 0), final[support]) for support, name in supports.items()
+    ], [])
+
+
+def applied_plan(plan, taken):
+    """Plan réellement appliqué : sans les événements taken, ni leur part dans la charge des supports"""
+    if not taken:
+        return plan
+    taken = set(taken)
+    removed = {}
+    for event_id, support in plan.assignments:
+        if event_id in taken:
+            removed[support] = removed.get(support, 0) + 1
+    return AssignmentPlan(
+        [(event_id, support) for event_id, support in plan.assignments if event_id not in taken],
+        plan.unassigned,
+        [load._replace(after=load.after - removed.get(load.support_id, 0)) for load in plan.loads],
+        sorted(taken)
+    )
+
+
+def unassigned_events(session, since=None):
+    """(id, date_debut, date_fin) des événements sans support, non terminés à since (tous si None)"""
+    stmt = select(Event.id, Event.date_debut, Event.date_fin).where(Event.contact_support_id.is_(None))
+    if since is not None:
+        stmt = stmt.where(Event.date_fin > since)
+    return [tuple(row) for row in session.execute(stmt.order_by(Event.date_debut, Event.id))]
+
+
+def support_workloads(session, since=None):
+    """Noms des supports par id, et leur charge : événements assignés non terminés à since (tous si None)"""
+    supports = dict(session.execute(
+        select(Employee.id, Employee.username).where(Employee.departement == Employee.SUPPORT).order_by(Employee.id)
+    ).all())
+    stmt = select(Event.contact_support_id, func.count(Event.id))\
+        .where(Event.contact_support_id.is_not(None))\
+        .group_by(Event.contact_support_id)
+    if since is not None:
+        stmt = stmt.where(Event.date_fin > since)
+    return supports, dict(session.execute(stmt).all())
+
+
+def busy_intervals(session, start, end):
+    """Créneaux réservés par support chevauchant [start, end), lus par l'index des périodes"""
+    busy = {}
+    rows = execute_overlap(session, lambda dialect, indexed: (
+        select(Event.contact_support_id, Event.date_debut, Event.date_fin)
+        .where(Event.contact_support_id.is_not(None), overlap_condition(dialect, start, end, indexed=indexed))
+    ))
+    for support, date_debut, date_fin in rows:
+        busy.setdefault(support, []).append((min(date_debut, date_fin), max(date_debut, date_fin)))
+    return busy
+
+
+def apply_assignments(session, assignments):
+    """
+    Enregistre le plan en une requête UPDATE exécutée pour toutes les lignes (executemany).
+    Un événement affecté entre-temps par quelqu'un d'autre n'est pas modifié : retourne leurs ids,
+    relus seulement si le nombre de lignes mises à jour est inférieur au plan.
+    """
+    if not assignments:
+        return []
+    events = Event.__table__
+    result = session.connection().execute(
+        update(events)
+        .where(events.c.id == bindparam("event_id"), events.c.contact_support_id.is_(None))
+        .values(contact_support_id=bindparam("support_id")),
+        # Par id : lignes voisines dans la table, mises à jour de proche en proche
+        [{"event_id": event_id, "support_id": support_id} for event_id, support_id in sorted(assignments)]
+    )
+    # Écriture hors unité de travail : les listes d'événements en cache sont invalidées au commit
+    session.info.setdefault(MODIFIED_TABLES, set()).add(events.name)
+    if session.get_bind().dialect.supports_sane_multi_rowcount and result.rowcount == len(assignments):
+        return []
+
+    planned = dict(assignments)
+    taken = []
+    for ids in chunked(sorted(planned), IMPORT_CHUNK_SIZE):
+        rows = session.execute(select(Event.id, Event.contact_support_id).where(Event.id.in_(ids)))
+        taken.extend(event_id for event_id, support in rows if support != planned[event_id])
+    return taken
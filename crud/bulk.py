@@ -0,0 +1,109 @@
+import csv
+import io
+import json
+from itertools import islice
+from sqlalchemy import insert
+
+
+# Outils communs aux imports en masse : lecture en flux des fichiers, découpage en paquets,
+# insertion par executemany ou COPY (PostgreSQL) et rapport des lignes rejetées.
+
+IMPORT_FORMATS = ("csv", "jsonl")
+IMPORT_CHUNK_SIZE = 2000
+
+
+class ImportReport:
+    """Bilan d'un import : nombre de lignes insérées et rejets (numéro de ligne, motif)"""
+
+    __slots__ = ("inserted", "rejects")
+
+    def __init__(self):
+        self.inserted = 0
+        self.rejects = []
+
+    def reject(self, line, reason):
+        self.rejects.append((line, reason))
+
+
+def detect_format(path, file_format=None):
+    """Format explicite, sinon déduit de l'extension du fichier"""
+    if file_format:
+        return file_format.lower()
+    extension = path.rsplit(".", 1)[-1].lower()
+    if extension == "ndjson":
+        return "jsonl"
+    if extension not in IMPORT_FORMATS:
+        raise ValueError(f"Format de fichier non reconnu : {path} (csv ou jsonl attendu)")
+    return extension
+
+
+def read_records(path, file_format=None):
+    """
+    Lit le fichier ligne à ligne, sans le charger en mémoire.
+
+    Yields:
+        (numéro de ligne, dictionnaire des champs) ; les lignes JSON invalides
+        sont transmises avec un dictionnaire vide et un motif sous la clé None
+    """
+    file_format = detect_format(path, file_format)
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        if file_format == "csv":
+            reader = csv.DictReader(f)
+            for record in reader:
+                yield reader.line_num, {key.strip(): value for key, value in record.items() if key}
+        else:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    yield line_number, {None: f"JSON invalide ({e.msg})"}
+                    continue
+                if not isinstance(record, dict):
+                    yield line_number, {None: "objet JSON attendu"}
+                    continue
+                yield line_number, record
+
+
+def chunked(iterable, size):
+    """Découpe un itérable en listes d'au plus size éléments"""
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def supports_copy(session):
+    """COPY n'est disponible qu'avec PostgreSQL et un driver qui l'expose (psycopg2)"""
+    dialect = session.get_bind().dialect
+    return dialect.name == "postgresql" and dialect.driver == "psycopg2"
+
+
+def copy_rows(session, table, columns, rows):
+    """Insère les lignes via COPY FROM STDIN (format CSV), dans la transaction de la session"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(["" if row.get(column) is None else row[column] for column in columns])
+    buffer.seek(0)
+
+    cursor = session.connection().connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer
+        )
+    finally:
+        cursor.close()
+
+
+def insert_rows(session, model, rows, use_copy=False):
+    """
+    Insère un paquet de lignes (dictionnaires ayant tous les mêmes clés).
+    Sans COPY, un seul executemany en Core, sans passer par l'unité de travail de l'ORM.
+    """
+    if not rows:
+        return
+    if use_copy:
+        copy_rows(session, model.__table__, list(rows[0].keys()), rows)
+    else:
+        session.connection().execute(insert(model.__table__), rows)
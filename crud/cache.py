@@ -0,0 +1,216 @@
+import hashlib
+import itertools
+import json
+import os
+import pickle
+import sqlite3
+import time
+from sqlalchemy import event, inspect
+from config.db import Session
+import metrics
+
+
+# Cache local des listes, partagé entre les commandes (chaque commande est un nouveau processus).
+# Une entrée n'est servie que si les compteurs de version des tables qu'elle lit n'ont pas bougé
+# depuis son calcul ; les compteurs sont incrémentés au commit de chaque écriture.
+# Les écritures faites depuis un autre poste ne passent pas par ces compteurs : QUERY_CACHE_TTL
+# borne la durée pendant laquelle elles peuvent rester invisibles.
+QUERY_CACHE_FILE = os.getenv("QUERY_CACHE_FILE", ".query_cache.db")
+QUERY_CACHE_ENABLED = os.getenv("QUERY_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+QUERY_CACHE_MAX_BYTES = int(os.getenv("QUERY_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+QUERY_CACHE_TTL = int(os.getenv("QUERY_CACHE_TTL", "300"))  # en secondes
+
+# Clé de Session.info où sont accumulées les tables modifiées jusqu'au commit
+MODIFIED_TABLES = "modified_tables"
+
+
+class QueryCache:
+    """
+    Stockage SQLite (bibliothèque standard) des résultats de requêtes, avec éviction LRU
+    dès que la taille totale dépasse max_bytes.
+    """
+
+    def __init__(self, path, max_bytes, ttl):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._connection = None
+
+    def _connect(self):
+        if self._connection is None:
+            is_new = not os.path.exists(self.path)
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            if is_new:
+                # Les résultats sont ceux de l'utilisateur connecté : fichier lisible par lui seul
+                os.chmod(self.path, 0o600)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS table_versions (name TEXT PRIMARY KEY, version INTEGER NOT NULL)"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, versions TEXT NOT NULL, payload BLOB NOT NULL, "
+                "size INTEGER NOT NULL, created_at REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS ix_entries_last_used ON entries (last_used)")
+            self._connection = connection
+        return self._connection
+
+    def versions(self, tables):
+        """Version courante de chaque table (0 si elle n'a jamais été modifiée)"""
+        tables = sorted(tables)
+        placeholders = ", ".join("?" * len(tables))
+        rows = self._connect().execute(
+            f"SELECT name, version FROM table_versions WHERE name IN ({placeholders})", tables
+        )
+        found = dict(rows.fetchall())
+        return {table: found.get(table, 0) for table in tables}
+
+    def get(self, key, tables):
+        """Retourne (trouvé, valeur) ; une entrée périmée ou trop ancienne compte comme absente"""
+        connection = self._connect()
+        row = connection.execute(
+            "SELECT versions, payload, created_at FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return False, None
+
+        versions, payload, created_at = row
+        if time.time() - created_at > self.ttl or json.loads(versions) != self.versions(tables):
+            connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+            return False, None
+
+        connection.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+        return True, pickle.loads(payload)
+
+    def put(self, key, versions, value):
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        # Une liste plus grosse qu'une fraction du cache en chasserait toutes les autres
+        if len(payload) > self.max_bytes // 8:
+            return
+
+        now = time.time()
+        connection = self._connect()
+        connection.execute(
+            "INSERT OR REPLACE INTO entries (key, versions, payload, size, created_at, last_used) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (key, json.dumps(versions), payload, len(payload), now, now)
+        )
+        self._evict(connection)
+
+    def _evict(self, connection):
+        """Supprime les entrées les moins récemment utilisées jusqu'à repasser sous max_bytes"""
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        evicted = []
+        for key, size in connection.execute("SELECT key, size FROM entries ORDER BY last_used"):
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        connection.executemany("DELETE FROM entries WHERE key = ?", evicted)
+
+    def bump(self, tables):
+        """Invalide toutes les entrées qui lisent l'une de ces tables"""
+        self._connect().executemany(
+            "INSERT INTO table_versions (name, version) VALUES (?, 1) "
+            "ON CONFLICT (name) DO UPDATE SET version = version + 1",
+            [(table,) for table in sorted(tables)]
+        )
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+query_cache = QueryCache(QUERY_CACHE_FILE, QUERY_CACHE_MAX_BYTES, QUERY_CACHE_TTL)
+
+
+def cache_key(*parts):
+    """Clé d'entrée : requête, paramètres (filtre, tri, page) et rôle de l'utilisateur"""
+    return hashlib.sha256(json.dumps(parts, default=str).encode("utf-8")).hexdigest()
+
+
+def _has_pending_writes(session):
+    return session is not None and bool(
+        session.new or session.dirty or session.deleted or session.info.get(MODIFIED_TABLES)
+    )
+
+
+def cached(key, tables, load, session=None):
+    """
+    Retourne le résultat en cache pour key, ou l'obtient via load() et l'enregistre.
+    Une session portant des écritures non validées lit toujours la base (ses propres modifications
+    ne sont pas encore dans les compteurs de version).
+    """
+    if not QUERY_CACHE_ENABLED or _has_pending_writes(session):
+        return load()
+
+    try:
+        found, value = query_cache.get(key, tables)
+        if found:
+            metrics.increment("cache_hits")
+            return value
+        # Versions relevées avant la requête : une écriture concurrente rendra l'entrée périmée
+        versions = query_cache.versions(tables)
+    except sqlite3.Error:
+        # Le cache est une optimisation : indisponible, on lit simplement la base
+        return load()
+
+    metrics.increment("cache_misses")
+    value = load()
+    try:
+        query_cache.put(key, versions, value)
+    except sqlite3.Error:
+        pass
+    return value
+
+
+def bump_table_versions(tables):
+    """À appeler après une écriture qui ne passe pas par la Session (insertions en masse, COPY...)"""
+    if not tables:
+        return
+    try:
+        query_cache.bump(tables)
+    except sqlite3.Error:
+        # Sans compteur à jour, les entrées de ces tables ne sont plus fiables
+        invalidate_query_cache()
+
+
+def invalidate_query_cache():
+    """Vide le cache (fichier supprimé, compteurs compris)"""
+    query_cache.close()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(QUERY_CACHE_FILE + suffix):
+            os.remove(QUERY_CACHE_FILE + suffix)
+
+
+# === Suivi des tables modifiées par les sessions ===
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_tables(session, flush_context):
+    tables = session.info.setdefault(MODIFIED_TABLES, set())
+    for instance in itertools.chain(session.new, session.dirty, session.deleted):
+        tables.add(inspect(instance).mapper.local_table.name)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_tables(orm_execute_state):
+    # query(...).delete(), update(Model)... : écritures hors unité de travail
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None:
+            orm_execute_state.session.info.setdefault(MODIFIED_TABLES, set()).add(mapper.local_table.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_committed_tables(session):
+    bump_table_versions(session.info.pop(MODIFIED_TABLES, None))
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_tables(session):
+    session.info.pop(MODIFIED_TABLES, None)
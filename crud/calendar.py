@@ -0,0 +1,194 @@
+from typing import NamedTuple, Optional
+from datetime import datetime, timedelta
+from sqlalchemy import select, func, and_, false, text, inspect, table, column
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import aliased
+from models.models import Employee, Client, Contract, Event
+
+
+# Requêtes de calendrier sur la période [date_debut, date_fin) des événements :
+#   - PostgreSQL : index GiST sur tsrange(date_debut, date_fin), seul et précédé du support
+#     (extension btree_gist), interrogés par l'opérateur de chevauchement &&
+#   - SQLite : table R*Tree events_period (support, minute de début, minute de fin) tenue à jour
+#     par des triggers ; ses bornes sont arrondies à la minute vers l'extérieur, le chevauchement
+#     exact est ensuite vérifié sur events
+# Trouver les événements d'un créneau, ou un conflit de réservation d'un support, coûte ainsi
+# O(log n + résultats) au lieu d'un parcours des événements.
+# Comme tsrange sous PostgreSQL, une période vide (date_debut = date_fin) ne chevauche rien,
+# et une base où l'index R*Tree n'a pas été créé est interrogée par la seule comparaison des dates.
+
+PERIOD_TABLE = "events_period"
+# Support des événements qui n'en ont pas, et plus grand id, dans l'index R*Tree
+NO_SUPPORT = 0
+MAX_SUPPORT_ID = 2 ** 31 - 1
+EPOCH = datetime(1970, 1, 1)
+MINUTE = timedelta(minutes=1)
+
+period_index = table(PERIOD_TABLE, column("id"), column("support_min"), column("support_max"),
+                     column("start_minute"), column("end_minute"))
+
+
+class CalendarRow(NamedTuple):
+    id: int
+    nom: str
+    date_debut: datetime
+    date_fin: datetime
+    lieu: str
+    client: str
+    support_id: Optional[int]
+    support: Optional[str]
+
+
+def _period(start, end):
+    """Période d'un événement ; bornes remises dans l'ordre pour qu'une saisie inversée reste indexable"""
+    return func.tsrange(func.least(start, end), func.greatest(start, end))
+
+
+def _minute_floor(value):
+    return (value - EPOCH) // MINUTE
+
+
+def _minute_ceil(value):
+    return -((EPOCH - value) // MINUTE)
+
+
+def _postgresql_indexes(connection):
+    period = "tsrange(least(date_debut, date_fin), greatest(date_debut, date_fin))"
+    connection.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+    connection.execute(text(f"CREATE INDEX IF NOT EXISTS ix_events_period ON events USING gist ({period})"))
+    connection.execute(text(
+        f"CREATE INDEX IF NOT EXISTS ix_events_support_period ON events USING gist (contact_support_id, {period})"
+    ))
+
+
+def _sqlite_index(connection, rebuild):
+    created = PERIOD_TABLE not in inspect(connection).get_table_names()
+    connection.execute(text(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {PERIOD_TABLE} "
+        f"USING rtree_i32(id, support_min, support_max, start_minute, end_minute)"
+    ))
+
+    def values(row):
+        # strftime('%s') lit la date comme UTC, de même que _minute_floor et _minute_ceil
+        support = f"coalesce({row}contact_support_id, {NO_SUPPORT})"
+        start = f"CAST(strftime('%s', min({row}date_debut, {row}date_fin)) AS INTEGER) / 60"
+        end = f"(CAST(strftime('%s', max({row}date_debut, {row}date_fin)) AS INTEGER) + 59) / 60"
+        return f"{row}id, {support}, {support}, {start}, {end}"
+
+    # Triggers supprimés avec la table events : recréés à chaque appel si besoin
+    connection.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS {PERIOD_TABLE}_ai AFTER INSERT ON events BEGIN "
+        f"INSERT OR REPLACE INTO {PERIOD_TABLE} VALUES ({values('new.')}); END"
+    ))
+    connection.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS {PERIOD_TABLE}_ad AFTER DELETE ON events BEGIN "
+        f"DELETE FROM {PERIOD_TABLE} WHERE id = old.id; END"
+    ))
+    connection.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS {PERIOD_TABLE}_au "
+        f"AFTER UPDATE OF date_debut, date_fin, contact_support_id ON events BEGIN "
+        f"INSERT OR REPLACE INTO {PERIOD_TABLE} VALUES ({values('new.')}); END"
+    ))
+    if created or rebuild:
+        connection.execute(text(f"DELETE FROM {PERIOD_TABLE}"))
+        connection.execute(text(f"INSERT INTO {PERIOD_TABLE} SELECT {values('')} FROM events"))
+
+
+def ensure_calendar_index(engine, rebuild=False):
+    """
+    Crée l'index des périodes d'événements s'il manque (sans effet s'il existe déjà).
+    rebuild recharge l'index R*Tree de SQLite, par exemple après la recréation des tables.
+    Les autres SGBD comparent les dates sans index dédié.
+    """
+    with engine.begin() as connection:
+        if engine.dialect.name == "postgresql":
+            _postgresql_indexes(connection)
+        elif engine.dialect.name == "sqlite":
+            _sqlite_index(connection, rebuild)
+
+
+def overlap_condition(dialect, start, end, support_id=None, indexed=True):
+    """
+    Condition « l'événement chevauche [start, end) », et s'il est donné « est assigné à support_id ».
+    indexed=False n'interroge pas l'index R*Tree de SQLite (voir execute_overlap).
+    """
+    if start >= end:
+        return false()
+    support = [Event.contact_support_id == support_id] if support_id is not None else []
+    if dialect == "postgresql":
+        return and_(_period(Event.date_debut, Event.date_fin).op("&&")(func.tsrange(start, end)), *support)
+
+    # Mêmes bornes que tsrange(least, greatest) : période remise dans l'ordre, vide si nulle
+    least, greatest = (func.min, func.max) if dialect == "sqlite" else (func.least, func.greatest)
+    exact = and_(
+        least(Event.date_debut, Event.date_fin) < end,
+        greatest(Event.date_debut, Event.date_fin) > start,
+        Event.date_debut != Event.date_fin,
+        *support
+    )
+    if dialect == "sqlite" and indexed:
+        low, high = (support_id, support_id) if support_id is not None else (NO_SUPPORT, MAX_SUPPORT_ID)
+        candidates = select(period_index.c.id).where(
+            period_index.c.support_min <= high,
+            period_index.c.support_max >= low,
+            period_index.c.start_minute <= _minute_ceil(end),
+            period_index.c.end_minute >= _minute_floor(start),
+        )
+        return and_(Event.id.in_(candidates), exact)
+    return exact
+
+
+def execute_overlap(session, statement):
+    """
+    Exécute statement(dialect, indexed), une requête construite sur overlap_condition.
+    Si l'index R*Tree n'a pas été créé (init_db.py pas lancé), elle est reconstruite sans lui.
+    """
+    dialect = session.get_bind().dialect.name
+    try:
+        return session.execute(statement(dialect, True))
+    except OperationalError as e:
+        if f"no such table: {PERIOD_TABLE}" not in str(e):
+            raise
+        return session.execute(statement(dialect, False))
+
+
+def calendar_statement(dialect, start, end, support_id=None, indexed=True):
+    """Événements chevauchant [start, end), dans l'ordre chronologique"""
+    support = aliased(Employee)
+    return select(
+        Event.id,
+        Event.nom,
+        Event.date_debut,
+        Event.date_fin,
+        Event.lieu,
+        Client.nom_complet,
+        Event.contact_support_id,
+        support.username,
+    ).join(Contract, Event.contrat_id == Contract.id)\
+        .join(Client, Contract.client_id == Client.id)\
+        .outerjoin(support, Event.contact_support_id == support.id)\
+        .where(overlap_condition(dialect, start, end, support_id, indexed))\
+        .order_by(Event.date_debut, Event.id)
+
+
+def check_support_availability(session, support_id, start, end, event_id=None):
+    """
+    Refuse (ValueError) d'affecter support_id sur [start, end) s'il est déjà pris par un autre
+    événement sur ce créneau. Une recherche dans l'index des périodes, quel que soit son planning.
+    """
+    if support_id is None:
+        return
+
+    def statement(dialect, indexed):
+        stmt = select(Event.id, Event.nom, Event.date_debut, Event.date_fin)\
+            .where(overlap_condition(dialect, min(start, end), max(start, end), support_id, indexed))
+        if event_id is not None:
+            stmt = stmt.where(Event.id != event_id)
+        return stmt.order_by(Event.date_debut).limit(1)
+
+    conflict = execute_overlap(session, statement).first()
+    if conflict:
+        raise ValueError(
+            f"Le support est déjà affecté à l'événement {conflict.id} ({conflict.nom}) du "
+            f"{conflict.date_debut:%Y-%m-%d %H:%M} au {conflict.date_fin:%Y-%m-%d %H:%M}"
+        )
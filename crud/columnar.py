@@ -0,0 +1,90 @@
+import typing
+from datetime import datetime
+from decimal import Decimal
+
+
+# Conversion des lignes de projection (crud/projections.py) en colonnes, paquet par paquet :
+# RecordBatch Arrow ou dictionnaires de tableaux NumPy, prêts pour pandas/polars.
+# Montants : décimal exact (Arrow) ou centimes entiers (NumPy) ; dates : timestamp / datetime64[us].
+# pyarrow et numpy sont optionnels et importés à la première conversion.
+
+COLUMNAR_BATCH_SIZE = 50000
+
+
+def require_package(module_name, package):
+    """Import d'une dépendance optionnelle, avec un message d'installation explicite"""
+    try:
+        return __import__(module_name, fromlist=["_"])
+    except ImportError:
+        raise RuntimeError(f"Le paquet '{package}' est nécessaire : pip install {package}") from None
+
+
+def column_types(row_type):
+    """(nom, type Python, nullable) de chaque champ, d'après les annotations de la ligne"""
+    columns = []
+    for name, annotation in typing.get_type_hints(row_type).items():
+        arguments = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        nullable = len(arguments) != len(typing.get_args(annotation))
+        columns.append((name, arguments[0] if arguments else annotation, nullable))
+    return columns
+
+
+def column_batches(session, stmt, keys, batch_size=COLUMNAR_BATCH_SIZE):
+    """
+    Lit la requête (Core, sans instance ORM) par paquets via un curseur côté serveur
+    et transpose chaque paquet en colonnes.
+    """
+    result = session.connection().execute(
+        stmt.order_by(*keys).execution_options(stream_results=True, yield_per=batch_size)
+    )
+    for rows in result.partitions():
+        yield list(zip(*rows))
+
+
+def arrow_schema(row_type):
+    pa = require_package("pyarrow", "pyarrow")
+    types = {int: pa.int64(), str: pa.string(), bool: pa.bool_(),
+             datetime: pa.timestamp("us"), Decimal: pa.decimal128(10, 2)}
+    return pa.schema([
+        pa.field(name, types[python_type], nullable=nullable)
+        for name, python_type, nullable in column_types(row_type)
+    ])
+
+
+def to_arrow(columns, schema):
+    pa = require_package("pyarrow", "pyarrow")
+    return pa.record_batch(
+        [pa.array(column, type=field.type) for column, field in zip(columns, schema)], schema=schema
+    )
+
+
+def _cents(value):
+    return int((value * 100).to_integral_value())
+
+
+def _numpy_column(np, values, python_type):
+    """
+    Les entiers, booléens et montants contenant des valeurs nulles deviennent des tableaux masqués,
+    même si le champ n'est pas annoté Optional : un None n'est jamais converti en 0 ou en False.
+    """
+    if python_type is str:
+        return np.array(values, dtype=object)
+    if python_type is datetime:
+        # None -> NaT
+        return np.array(values, dtype="datetime64[us]")
+
+    convert = _cents if python_type is Decimal else python_type
+    dtype = np.bool_ if python_type is bool else np.int64
+    if None in values:
+        mask = [value is None for value in values]
+        data = [0 if value is None else convert(value) for value in values]
+        return np.ma.masked_array(np.array(data, dtype=dtype), mask=mask)
+    return np.array([convert(value) for value in values], dtype=dtype)
+
+
+def to_numpy(columns, types):
+    np = require_package("numpy", "numpy")
+    return {
+        name: _numpy_column(np, values, python_type)
+        for values, (name, python_type, _) in zip(columns, types)
+    }
@@ -1,156 +1,493 @@
-from config.db import Session
-from models.models import Employee, Client, Contract, Event
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from sqlalchemy import select, insert, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import NoResultFound
+from config.db import session_scope
+from models.models import Employee, Client, Contract, Event, Permission, employee_permissions, hash_password
+from crud.bulk import ImportReport, IMPORT_CHUNK_SIZE, chunked, insert_rows, supports_copy
+from crud.cache import bump_table_versions
+from crud.summaries import apply_contract_change, contract_snapshot, note_event_date
+from crud.calendar import check_support_availability
 from auth import verify_token
-from models.permissions import verify_user_permission
-from logger import log_exception, log_employee_modification, log_contract_signature
+from models.permissions import (
+    verify_user_permission, assign_department_permissions, DEPARTMENT_PERMISSIONS, READ_PERMISSIONS
+)
+from logger import log_exception, log_employee_modification, log_contract_signature, traced_service
 
 
+# Longueur maximale des champs texte importés, lue une fois dans le modèle
+CLIENT_FIELD_LENGTHS = {
+    name: Client.__table__.c[name].type.length
+    for name in ('nom_complet', 'email', 'entreprise', 'telephone')
+}
+EMPLOYEE_FIELD_LENGTHS = {
+    name: Employee.__table__.c[name].type.length
+    for name in ('username', 'email', 'nom', 'prenom', 'telephone')
+}
+
+# Paquets plus petits que pour les clients : chaque ligne coûte un hachage bcrypt
+EMPLOYEE_IMPORT_CHUNK_SIZE = 500
+
+
+def _available_cpus():
+    """Cœurs réellement utilisables par le processus (affinité / conteneur), à défaut tous"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+@traced_service
 class CreateService:
     @staticmethod
-    def create_employee(token, employee_data):
+    def create_employee(token, employee_data, session=None):
         """Créer un nouveau collaborateur."""
-        if not verify_user_permission(token, 'manage_users'):
+        if not verify_user_permission(token, 'manage_users', session=session):
             raise PermissionError("Vous n'avez pas la permission de créer des collaborateurs")
-        
+
         if not all([
-            employee_data.get('username'), 
-            employee_data.get('email'), 
+            employee_data.get('username'),
+            employee_data.get('email'),
             employee_data.get('departement')
         ]):
             raise ValueError("Informations du collaborateur incomplètes")
-        
-        session = Session()
+
         try:
-            # Vérifier si l'username existe déjà
-            existing = session.query(Employee).filter_by(username=employee_data['username']).first()
-            if existing:
-                raise ValueError(f"Un employé avec le nom '{employee_data['username']}' existe déjà")
-                
-            # Créer l'employé
-            new_employee = Employee(**employee_data)
-            session.add(new_employee)
-            session.commit()
-            session.refresh(new_employee)
-            
-            # Assigner les permissions après la création réussie
-            from models.permissions import assign_department_permissions
-            assign_department_permissions(new_employee)
-            
-            log_employee_modification(new_employee, "création")
-            return session.merge(new_employee)
+            with session_scope(session) as session:
+                # Vérifier si l'username existe déjà
+                existing = session.query(Employee).filter_by(username=employee_data['username']).first()
+                if existing:
+                    raise ValueError(f"Un employé avec le nom '{employee_data['username']}' existe déjà")
+
+                # Créer l'employé
+                new_employee = Employee(**employee_data)
+                session.add(new_employee)
+                session.flush()
+
+                # Assigner les permissions dans la même transaction
+                assign_department_permissions(new_employee, session=session)
+
+                log_employee_modification(new_employee, "création")
+                return new_employee
+        except Exception as e:
+            log_exception(e)
+            raise
+
+    @staticmethod
+    def import_employees(token, records, chunk_size=EMPLOYEE_IMPORT_CHUNK_SIZE, workers=None, session=None):
+        """
+        Importe des collaborateurs en masse (mêmes droits que create_employee).
+
+        Le hachage bcrypt, volontairement coûteux, est réparti sur un pool de processus ;
+        chaque paquet est ensuite inséré en deux requêtes groupées (employés puis
+        employee_permissions selon le département) et validé.
+
+        Args:
+            token: Token d'authentification de l'utilisateur
+            records: Itérable de (numéro de ligne, dictionnaire), voir crud.bulk.read_records
+            chunk_size: Nombre de lignes par paquet (un commit par paquet)
+            workers: Nombre de processus de hachage (par défaut, un par cœur ; 1 : sans pool)
+            session: Session de la commande en cours (optionnelle, validée à chaque paquet)
+
+        Returns:
+            ImportReport (lignes insérées et rejets)
+        """
+        if not verify_user_permission(token, 'manage_users', session=session):
+            raise PermissionError("Vous n'avez pas la permission de créer des collaborateurs")
+
+        workers = workers or _available_cpus()
+        report = ImportReport()
+        seen = {'username': {}, 'email': {}}
+        # spawn plutôt que fork : la commande a déjà des threads (Sentry) et une connexion ouverte
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) \
+            if workers > 1 else None
+        try:
+            with session_scope(session) as session:
+                permission_ids = dict(session.execute(select(Permission.code, Permission.id)).all())
+
+                for chunk in chunked(records, chunk_size):
+                    rows = []
+                    for line, record in chunk:
+                        data, error = CreateService._validate_employee_record(record, seen, line)
+                        if error:
+                            report.reject(line, error)
+                        else:
+                            rows.append((line, data))
+
+                    rows = CreateService._reject_existing_employees(session, rows, report)
+                    if not rows:
+                        continue
+
+                    passwords = [data['password'] for _, data in rows]
+                    if executor:
+                        hashes = executor.map(hash_password, passwords,
+                                              chunksize=max(1, len(passwords) // (workers * 4)))
+                    else:
+                        hashes = map(hash_password, passwords)
+                    for (_, data), hashed in zip(rows, hashes):
+                        data['password'] = hashed
+
+                    rows = CreateService._insert_chunk(session, Employee, rows, False, report,
+                                                       "nom d'utilisateur ou email déjà utilisé")
+                    CreateService._insert_employee_permissions(session, rows, permission_ids)
+                    session.commit()
         except Exception as e:
             log_exception(e)
-            session.rollback()
             raise
         finally:
-            session.close()
+            if executor:
+                executor.shutdown(cancel_futures=True)
+            bump_table_versions([Employee.__tablename__, employee_permissions.name])
+        return report
+
+    @staticmethod
+    def _validate_employee_record(record, seen, line):
+        """Retourne (ligne prête à hacher et insérer, None) ou (None, motif du rejet)"""
+        if None in record:
+            return None, record[None]
+
+        def field(name):
+            value = record.get(name)
+            return str(value).strip() if value is not None else ""
+
+        data = {name: field(name) for name in ('username', 'email', 'nom', 'prenom', 'telephone')}
+        data['telephone'] = data['telephone'] or None
+        data['departement'] = field('departement').upper()
+        # Le mot de passe est pris tel quel (les espaces en font partie)
+        data['password'] = record.get('password') or ""
+
+        missing = [name for name in ('username', 'email', 'nom', 'prenom', 'departement', 'password')
+                   if not data[name]]
+        if missing:
+            return None, f"champ(s) manquant(s) : {', '.join(missing)}"
+
+        if data['departement'] not in Employee.DEPARTMENT_CHOICES:
+            return None, f"département inconnu : {data['departement']}"
+
+        for name, max_length in EMPLOYEE_FIELD_LENGTHS.items():
+            if data[name] and len(data[name]) > max_length:
+                return None, f"{name} dépasse {max_length} caractères"
+
+        if "@" not in data['email']:
+            return None, f"email invalide : {data['email']}"
+
+        for name in ('username', 'email'):
+            if data[name] in seen[name]:
+                return None, f"{name} en double dans le fichier (ligne {seen[name][data[name]]})"
+        for name in ('username', 'email'):
+            seen[name][data[name]] = line
+
+        return data, None
+
+    @staticmethod
+    def _reject_existing_employees(session, rows, report):
+        """Écarte, en une requête par paquet, les noms d'utilisateur et emails déjà pris"""
+        if not rows:
+            return rows
+        usernames = [data['username'] for _, data in rows]
+        emails = [data['email'] for _, data in rows]
+        taken = session.execute(
+            select(Employee.username, Employee.email)
+            .where(or_(Employee.username.in_(usernames), Employee.email.in_(emails)))
+        ).all()
+        if not taken:
+            return rows
+
+        taken_usernames = {username for username, _ in taken}
+        taken_emails = {email for _, email in taken}
+        kept = []
+        for line, data in rows:
+            if data['username'] in taken_usernames:
+                report.reject(line, f"nom d'utilisateur déjà utilisé : {data['username']}")
+            elif data['email'] in taken_emails:
+                report.reject(line, f"email déjà utilisé : {data['email']}")
+            else:
+                kept.append((line, data))
+        return kept
 
     @staticmethod
-    def create_client(token, client_data):
+    def _insert_employee_permissions(session, rows, permission_ids):
+        """Permissions du département de chaque employé inséré, en une seule requête groupée"""
+        if not rows:
+            return
+        usernames = [data['username'] for _, data in rows]
+        employee_ids = dict(session.execute(
+            select(Employee.username, Employee.id).where(Employee.username.in_(usernames))
+        ).all())
+
+        links = [
+            {'employee_id': employee_ids[data['username']], 'permission_id': permission_ids[code]}
+            for _, data in rows
+            for code in DEPARTMENT_PERMISSIONS.get(data['departement'], READ_PERMISSIONS)
+            if code in permission_ids
+        ]
+        if links:
+            session.connection().execute(insert(employee_permissions), links)
+
+    @staticmethod
+    def create_client(token, client_data, session=None):
         """Créer un nouveau client."""
-        employee = verify_token(token)
+        employee = verify_token(token, session=session)
         if not employee:
             raise PermissionError("Token invalide")
 
-        session = Session()
+        # L'identité vérifiée suffit : pas de rechargement de l'employé
+        current_user = employee
+
         try:
-            current_user = session.merge(employee)
-            
-            if not (current_user.departement == Employee.COMMERCIAL or 
-                   (current_user.departement == Employee.GESTION and 
-                    verify_user_permission(token, 'manage_clients'))):
-                raise PermissionError("Permissions insuffisantes")
-
-            if current_user.departement == Employee.COMMERCIAL:
-                client_data['commercial_id'] = current_user.id
-
-            if not all([
-                client_data.get('nom_complet'),
-                client_data.get('email'),
-                client_data.get('entreprise')
-            ]):
-                raise ValueError("Informations du client incomplètes")
-
-            new_client = Client(**client_data)
-            session.add(new_client)
-            session.commit()
-            session.refresh(new_client)
-            return session.merge(new_client)
+            with session_scope(session) as session:
+                if not (current_user.departement == Employee.COMMERCIAL or
+                       (current_user.departement == Employee.GESTION and
+                        verify_user_permission(token, 'manage_clients', session=session))):
+                    raise PermissionError("Permissions insuffisantes")
+
+                if current_user.departement == Employee.COMMERCIAL:
+                    client_data['commercial_id'] = current_user.id
+
+                if not all([
+                    client_data.get('nom_complet'),
+                    client_data.get('email'),
+                    client_data.get('entreprise')
+                ]):
+                    raise ValueError("Informations du client incomplètes")
+
+                new_client = Client(**client_data)
+                session.add(new_client)
+                session.flush()
+                return new_client
+        except Exception as e:
+            log_exception(e)
+            raise
+
+    @staticmethod
+    def import_clients(token, records, chunk_size=IMPORT_CHUNK_SIZE, session=None):
+        """
+        Importe des clients en masse (mêmes droits que create_client).
+
+        Les lignes sont traitées par paquets : validation, vérification des emails déjà
+        en base en une requête, insertion en un executemany (ou COPY sous PostgreSQL),
+        puis commit du paquet. Les lignes invalides sont rejetées sans bloquer les autres.
+
+        Args:
+            token: Token d'authentification de l'utilisateur
+            records: Itérable de (numéro de ligne, dictionnaire), voir crud.bulk.read_records
+            chunk_size: Nombre de lignes par paquet (un commit par paquet)
+            session: Session de la commande en cours (optionnelle, validée à chaque paquet)
+
+        Returns:
+            ImportReport (lignes insérées et rejets)
+        """
+        employee = verify_token(token, session=session)
+        if not employee:
+            raise PermissionError("Token invalide")
+
+        if not (employee.departement == Employee.COMMERCIAL or
+                (employee.departement == Employee.GESTION and
+                 verify_user_permission(token, 'manage_clients', session=session))):
+            raise PermissionError("Permissions insuffisantes")
+
+        report = ImportReport()
+        seen_emails = {}
+        try:
+            with session_scope(session) as session:
+                use_copy = supports_copy(session)
+                commercial_ids = None
+                if employee.departement == Employee.GESTION:
+                    commercial_ids = set(session.scalars(
+                        select(Employee.id).where(Employee.departement == Employee.COMMERCIAL)
+                    ))
+
+                for chunk in chunked(records, chunk_size):
+                    now = datetime.utcnow()
+                    rows = []
+                    for line, record in chunk:
+                        data, error = CreateService._validate_client_record(
+                            record, employee, commercial_ids, seen_emails, line, now
+                        )
+                        if error:
+                            report.reject(line, error)
+                        else:
+                            rows.append((line, data))
+
+                    rows = CreateService._reject_existing_emails(session, rows, report)
+                    CreateService._insert_chunk(session, Client, rows, use_copy, report,
+                                                "email déjà utilisé")
+                    session.commit()
         except Exception as e:
             log_exception(e)
-            session.rollback()
             raise
         finally:
-            session.close()
+            # Écritures hors unité de travail (COPY compris) : invalidation explicite du cache
+            bump_table_versions([Client.__tablename__])
+        return report
+
+    @staticmethod
+    def _validate_client_record(record, current_user, commercial_ids, seen_emails, line, now):
+        """Retourne (ligne prête à insérer, None) ou (None, motif du rejet)"""
+        if None in record:
+            return None, record[None]
+
+        def field(name):
+            value = record.get(name)
+            return str(value).strip() if value is not None else ""
+
+        data = {
+            'nom_complet': field('nom_complet'),
+            'email': field('email'),
+            'entreprise': field('entreprise'),
+            'telephone': field('telephone') or None
+        }
+        missing = [name for name in ('nom_complet', 'email', 'entreprise') if not data[name]]
+        if missing:
+            return None, f"champ(s) manquant(s) : {', '.join(missing)}"
+
+        for name, max_length in CLIENT_FIELD_LENGTHS.items():
+            if data[name] and len(data[name]) > max_length:
+                return None, f"{name} dépasse {max_length} caractères"
+
+        if "@" not in data['email']:
+            return None, f"email invalide : {data['email']}"
+        if data['email'] in seen_emails:
+            return None, f"email en double dans le fichier (ligne {seen_emails[data['email']]})"
+        seen_emails[data['email']] = line
+
+        if current_user.departement == Employee.COMMERCIAL:
+            data['commercial_id'] = current_user.id
+        else:
+            commercial_id = field('commercial_id')
+            if not commercial_id:
+                data['commercial_id'] = None
+            elif not commercial_id.isdigit() or int(commercial_id) not in commercial_ids:
+                return None, f"commercial inconnu : {commercial_id}"
+            else:
+                data['commercial_id'] = int(commercial_id)
+
+        data['date_creation'] = now
+        data['derniere_mise_a_jour'] = now
+        return data, None
+
+    @staticmethod
+    def _reject_existing_emails(session, rows, report):
+        """Écarte, en une requête par paquet, les lignes dont l'email existe déjà en base"""
+        if not rows:
+            return rows
+        emails = [data['email'] for _, data in rows]
+        existing = set(session.scalars(select(Client.email).where(Client.email.in_(emails))))
+        if not existing:
+            return rows
+
+        kept = []
+        for line, data in rows:
+            if data['email'] in existing:
+                report.reject(line, f"email déjà utilisé : {data['email']}")
+            else:
+                kept.append((line, data))
+        return kept
 
     @staticmethod
-    def create_contract(token, contract_data):
+    def _insert_chunk(session, model, rows, use_copy, report, conflict_reason):
+        """
+        Insère le paquet d'un bloc. Si une contrainte d'unicité échoue malgré la vérification
+        (import concurrent), le paquet est rejoué ligne à ligne pour n'écarter que les conflits.
+
+        Returns:
+            Les lignes effectivement insérées
+        """
+        if not rows:
+            return rows
+
+        savepoint = session.begin_nested()
+        try:
+            insert_rows(session, model, [data for _, data in rows], use_copy)
+            savepoint.commit()
+            report.inserted += len(rows)
+            return rows
+        except IntegrityError:
+            savepoint.rollback()
+
+        inserted = []
+        for line, data in rows:
+            savepoint = session.begin_nested()
+            try:
+                insert_rows(session, model, [data])
+                savepoint.commit()
+                report.inserted += 1
+                inserted.append((line, data))
+            except IntegrityError:
+                savepoint.rollback()
+                report.reject(line, conflict_reason)
+        return inserted
+
+    @staticmethod
+    def create_contract(token, contract_data, session=None):
         """Créer un nouveau contrat."""
-        if not verify_user_permission(token, 'manage_contracts'):
+        if not verify_user_permission(token, 'manage_contracts', session=session):
             raise PermissionError("Vous n'avez pas la permission de créer des contrats")
-        
+
         if not all([
-            contract_data.get('client_id'), 
+            contract_data.get('client_id'),
             contract_data.get('montant_total') is not None,
             contract_data.get('montant_restant') is not None
         ]):
             raise ValueError("Informations du contrat incomplètes")
-        
-        session = Session()
+
         try:
-            new_contract = Contract(**contract_data)
-            session.add(new_contract)
-            session.commit()
-            session.refresh(new_contract)
-            
-            # Log si le contrat est signé à la création
-            if new_contract.est_signe:
-                log_contract_signature(new_contract)
-                
-            return session.merge(new_contract)
+            with session_scope(session) as session:
+                new_contract = Contract(**contract_data)
+                session.add(new_contract)
+                session.flush()
+                apply_contract_change(session, None, contract_snapshot(session, new_contract))
+
+                # Log si le contrat est signé à la création
+                if new_contract.est_signe:
+                    log_contract_signature(new_contract)
+
+                return new_contract
         except Exception as e:
             log_exception(e)
-            session.rollback()
             raise
-        finally:
-            session.close()
 
     @staticmethod
-    def create_event(token, event_data):
+    def create_event(token, event_data, session=None):
         """Créer un nouvel événement."""
-        employee = verify_token(token)
+        employee = verify_token(token, session=session)
         if not employee:
             raise PermissionError("Token invalide")
-        
-        session = Session()
+
+        current_user = employee
+
         try:
-            current_user = session.merge(employee)
-            contract = session.query(Contract).join(Contract.client).filter(Contract.id == event_data['contrat_id']).first()
-            
-            # Vérifie les permissions
-            if not ((current_user.departement == Employee.GESTION and verify_user_permission(token, 'manage_events')) or
-                    (current_user.departement == Employee.COMMERCIAL and 
-                    contract.client.commercial_id == current_user.id and 
-                    contract.est_signe)):
-                raise PermissionError("Permissions insuffisantes ou contrat non signé")
-            
-            if not all([
-                event_data.get('nom'), 
-                event_data.get('contrat_id'),
-                event_data.get('date_debut'),
-                event_data.get('date_fin'),
-                event_data.get('lieu')
-            ]):
-                raise ValueError("Informations de l'événement incomplètes")
-            
-            new_event = Event(**event_data)
-            session.add(new_event)
-            session.commit()
-            session.refresh(new_event)
-            return session.merge(new_event)
+            with session_scope(session) as session:
+                contract = session.query(Contract).join(Contract.client).filter(Contract.id == event_data.get('contrat_id')).first()
+                if not contract:
+                    raise NoResultFound("Contrat non trouvé")
+
+                # Vérifie les permissions
+                if not ((current_user.departement == Employee.GESTION and verify_user_permission(token, 'manage_events', session=session)) or
+                        (current_user.departement == Employee.COMMERCIAL and
+                        contract.client.commercial_id == current_user.id and
+                        contract.est_signe)):
+                    raise PermissionError("Permissions insuffisantes ou contrat non signé")
+
+                if not all([
+                    event_data.get('nom'),
+                    event_data.get('contrat_id'),
+                    event_data.get('date_debut'),
+                    event_data.get('date_fin'),
+                    event_data.get('lieu')
+                ]):
+                    raise ValueError("Informations de l'événement incomplètes")
+
+                check_support_availability(session, event_data.get('contact_support_id'),
+                                           event_data['date_debut'], event_data['date_fin'])
+
+                new_event = Event(**event_data)
+                session.add(new_event)
+                session.flush()
+                note_event_date(session, contract_snapshot(session, contract), new_event.date_debut)
+                return new_event
         except Exception as e:
             log_exception(e)
-            session.rollback()
             raise
-        finally:
-            session.close()
@@ -1,34 +1,32 @@
-from config.db import Session
-from models.models import Employee
-from auth import verify_token
+from config.db import session_scope
+from models.models import Employee, CommercialSummary
+from auth import verify_token, invalidate_identity_on_commit
 from models.permissions import verify_user_permission
 from sqlalchemy.orm.exc import NoResultFound
+from logger import traced_service
 
 
+@traced_service
 class DeleteService:
     @staticmethod
-    def delete_employee(token, employee_id):
+    def delete_employee(token, employee_id, session=None):
         """Supprime un collaborateur (réservé aux gestionnaires)"""
-        employee = verify_token(token)
+        employee = verify_token(token, session=session)
         if not employee:
             raise PermissionError("Authentification requise")
 
-        session = Session()
-        try:
+        with session_scope(session) as session:
             # Vérifie que l'utilisateur est gestionnaire
-            current_user = session.query(Employee).filter_by(username=employee.username).first()
-            if not current_user or current_user.departement != Employee.GESTION:
+            if employee.departement != Employee.GESTION:
                 raise PermissionError("Seuls les gestionnaires peuvent supprimer un collaborateur")
 
             # Trouver l'employé à supprimer
-            employee_to_delete = session.query(Employee).get(employee_id)
+            employee_to_delete = session.get(Employee, employee_id)
             if not employee_to_delete:
                 raise NoResultFound("Collaborateur non trouvé")
 
+            # Ses contrats n'ont plus de commercial : sa ligne de synthèse disparaît avec lui
+            session.query(CommercialSummary).filter_by(commercial_id=employee_id).delete()
             session.delete(employee_to_delete)
-            session.commit()
-        except Exception as e:
-            session.rollback()
-            raise
-        finally:
-            session.close()
+            session.flush()
+            invalidate_identity_on_commit(session, employee_id)
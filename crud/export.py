@@ -0,0 +1,173 @@
+import csv
+import gzip
+import io
+import json
+import sys
+from contextlib import contextmanager
+from datetime import datetime
+from decimal import Decimal
+from itertools import islice
+from sqlalchemy import Boolean, case
+from config.db import session_scope
+from auth import verify_token
+from crud.bulk import supports_copy
+from crud.columnar import require_package, column_batches, arrow_schema, to_arrow
+from crud.read import ReadService, _stream
+from logger import traced_service
+
+
+EXPORT_ENTITIES = ("clients", "contracts", "events")
+EXPORT_FORMATS = ("csv", "jsonl", "parquet")
+EXPORT_COMPRESSIONS = ("none", "gzip", "zstd")
+
+# Lignes lues par aller-retour et par groupe de lignes Parquet
+EXPORT_BATCH_SIZE = 10000
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        # Chaîne plutôt que float : les montants restent exacts
+        return str(value)
+    raise TypeError(f"Type non exportable : {type(value).__name__}")
+
+
+@contextmanager
+def open_output(output, compression="none"):
+    """
+    Flux binaire d'écriture vers un fichier ('-' : sortie standard), compressé à la volée.
+    """
+    to_stdout = output == "-"
+    raw = sys.stdout.buffer if to_stdout else open(output, "wb")
+    try:
+        if compression == "gzip":
+            with gzip.GzipFile(fileobj=raw, mode="wb") as stream:
+                yield stream
+        elif compression == "zstd":
+            zstandard = require_package("zstandard", "zstandard")
+            with zstandard.ZstdCompressor().stream_writer(raw, closefd=False) as stream:
+                yield stream
+        else:
+            yield raw
+    finally:
+        if to_stdout:
+            raw.flush()
+        else:
+            raw.close()
+
+
+def write_csv(rows, fields, stream):
+    text = io.TextIOWrapper(stream, encoding="utf-8", newline="", write_through=False)
+    writer = csv.writer(text)
+    writer.writerow(fields)
+    count = 0
+    while batch := list(islice(rows, EXPORT_BATCH_SIZE)):
+        writer.writerows(batch)
+        count += len(batch)
+    text.flush()
+    text.detach()
+    return count
+
+
+def write_jsonl(rows, fields, stream):
+    text = io.TextIOWrapper(stream, encoding="utf-8", newline="\n", write_through=False)
+    count = 0
+    for row in rows:
+        text.write(json.dumps(dict(zip(fields, row)), default=_json_default, ensure_ascii=False))
+        text.write("\n")
+        count += 1
+    text.flush()
+    text.detach()
+    return count
+
+
+def write_parquet(batches, row_type, stream, compression="none"):
+    """Un groupe de lignes Parquet par paquet : la mémoire reste bornée quel que soit le volume"""
+    parquet = require_package("pyarrow.parquet", "pyarrow")
+    schema = arrow_schema(row_type)
+    count = 0
+    codec = None if compression == "none" else compression
+    with parquet.ParquetWriter(stream, schema, compression=codec) as writer:
+        for columns in batches:
+            batch = to_arrow(columns, schema)
+            writer.write_batch(batch)
+            count += batch.num_rows
+    return count
+
+
+def csv_text_columns(stmt):
+    """
+    Colonnes booléennes converties en texte comme l'écrit le module csv (True/False), et non t/f
+    comme le fait COPY : le fichier exporté ne dépend pas du chemin d'export.
+    """
+    return stmt.with_only_columns(*(
+        case((column.is_(True), "True"), (column.is_(False), "False")).label(name)
+        if isinstance(column.type, Boolean) else column
+        for name, column in stmt.selected_columns.items()
+    ), maintain_column_froms=True)
+
+
+def copy_to_csv(session, stmt, stream):
+    """
+    Export CSV par COPY ... TO STDOUT (PostgreSQL) : le serveur produit directement le CSV,
+    sans construire de ligne Python.
+    """
+    stmt = csv_text_columns(stmt)
+    sql = str(stmt.compile(session.get_bind(), compile_kwargs={"literal_binds": True}))
+    cursor = session.connection().connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY ({sql}) TO STDOUT WITH (FORMAT csv, HEADER)", stream)
+        return cursor.rowcount
+    finally:
+        cursor.close()
+
+
+@traced_service
+class ExportService:
+    @staticmethod
+    def export(token, entity, output="-", file_format="csv", compression="none", filter_mode=None, session=None):
+        """
+        Exporte toutes les lignes visibles d'une entité, en flux (mémoire constante).
+
+        Args:
+            token: Token d'authentification de l'utilisateur
+            entity: "clients", "contracts" ou "events"
+            output: Chemin du fichier, "-" pour la sortie standard
+            file_format: "csv", "jsonl" ou "parquet"
+            compression: "none", "gzip" ou "zstd" (Parquet : compression interne des colonnes)
+            filter_mode: Filtre de la liste correspondante ('signed', 'my_events'...)
+            session: Session de la commande en cours (optionnelle)
+
+        Returns:
+            Nombre de lignes exportées
+        """
+        employee = verify_token(token, session=session)
+        if not employee:
+            raise PermissionError("Token invalide")
+
+        # Dépendances optionnelles vérifiées avant de créer (ou tronquer) le fichier de sortie
+        if file_format == "parquet":
+            require_package("pyarrow.parquet", "pyarrow")
+        elif compression == "zstd":
+            require_package("zstandard", "zstandard")
+
+        if entity not in EXPORT_ENTITIES:
+            raise ValueError(f"Entité inconnue : {entity}")
+
+        with session_scope(session) as session:
+            stmt, keys, row_type = ReadService.entity_statement(employee, entity, filter_mode)
+
+            if file_format == "parquet":
+                batches = column_batches(session, stmt, keys, EXPORT_BATCH_SIZE)
+                with open_output(output) as stream:
+                    return write_parquet(batches, row_type, stream, compression)
+
+            with open_output(output, compression) as stream:
+                if file_format == "csv" and supports_copy(session):
+                    return copy_to_csv(session, stmt.order_by(*keys), stream)
+
+                rows = _stream(session, stmt, keys, EXPORT_BATCH_SIZE, row_type)
+                if file_format == "csv":
+                    return write_csv(rows, row_type._fields, stream)
+                return write_jsonl(rows, row_type._fields, stream)
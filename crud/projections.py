@@ -0,0 +1,127 @@
+from typing import NamedTuple, Optional
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import select, null
+from sqlalchemy.orm import aliased
+from models.models import Employee, Client, Contract, Event
+
+
+# Lignes d'affichage des listes : uniquement les colonnes montrées par la CLI,
+# lues en une requête Core sans passer par l'identity map ni les relations ORM.
+
+class ClientRow(NamedTuple):
+    id: int
+    nom_complet: str
+    email: str
+    entreprise: str
+    telephone: Optional[str]
+    date_creation: datetime
+    derniere_mise_a_jour: datetime
+    commercial: Optional[str]
+
+
+class ContractRow(NamedTuple):
+    id: int
+    client: str
+    commercial: Optional[str]
+    montant_total: Decimal
+    montant_restant: Decimal
+    # Colonne sans NOT NULL : un contrat saisi hors de l'application peut ne pas l'avoir
+    est_signe: Optional[bool]
+    date_creation: datetime
+    support: Optional[str]
+
+
+class EventRow(NamedTuple):
+    id: int
+    nom: str
+    date_debut: datetime
+    lieu: str
+    client: str
+    support: Optional[str]
+    nb_participants: Optional[int]
+    notes: Optional[str]
+
+
+class EmployeeRow(NamedTuple):
+    id: int
+    username: str
+    nom: str
+    prenom: str
+    email: str
+    telephone: Optional[str]
+    departement: str
+    date_creation: datetime
+
+
+def clients_select():
+    """Clients avec le nom d'utilisateur de leur commercial"""
+    commercial = aliased(Employee)
+    return select(
+        Client.id,
+        Client.nom_complet,
+        Client.email,
+        Client.entreprise,
+        Client.telephone,
+        Client.date_creation,
+        Client.derniere_mise_a_jour,
+        commercial.username.label("commercial")
+    ).outerjoin(commercial, Client.commercial_id == commercial.id)
+
+
+def contracts_select():
+    """
+    Contrats avec client, commercial et support de l'événement associé.
+    L'événement est joint (au plus un par contrat) : les filtres sur le support s'appliquent directement.
+    Le client est joint en externe (client_id n'est jamais nul, le résultat est identique) : SQLite
+    garde ainsi les contrats et leurs index partiels comme point de départ du plan.
+    """
+    commercial = aliased(Employee)
+    support = aliased(Employee)
+    return select(
+        Contract.id,
+        Client.nom_complet.label("client"),
+        commercial.username.label("commercial"),
+        Contract.montant_total,
+        Contract.montant_restant,
+        Contract.est_signe,
+        Contract.date_creation,
+        support.username.label("support")
+    ).outerjoin(Client, Contract.client_id == Client.id)\
+        .outerjoin(commercial, Contract.commercial_id == commercial.id)\
+        .outerjoin(Event, Event.contrat_id == Contract.id)\
+        .outerjoin(support, Event.contact_support_id == support.id)
+
+
+def events_select(with_notes=False):
+    """
+    Événements avec le client du contrat et le support assigné.
+    Les notes (jusqu'à 1000 caractères) ne sont lues que si with_notes est demandé.
+    """
+    support = aliased(Employee)
+    return select(
+        Event.id,
+        Event.nom,
+        Event.date_debut,
+        Event.lieu,
+        Client.nom_complet.label("client"),
+        support.username.label("support"),
+        Event.nb_participants,
+        Event.notes if with_notes else null().label("notes")
+    ).join(Contract, Event.contrat_id == Contract.id)\
+        .join(Client, Contract.client_id == Client.id)\
+        .outerjoin(support, Event.contact_support_id == support.id)
+
+
+def employees_select():
+    """Collaborateurs sans mot de passe ni permissions"""
+    return select(
+        Employee.id,
+        Employee.username,
+        Employee.nom,
+        Employee.prenom,
+        Employee.email,
+        Employee.telephone,
+        Employee.departement,
+        Employee.date_creation
+    )
@@ -1,8 +1,21 @@
 from sqlalchemy.orm import joinedload
-from sqlalchemy import or_
-from config.db import Session
+from sqlalchemy import or_, and_, case, DateTime
+from collections import namedtuple
+from datetime import datetime
+from config.db import session_scope
 from models.models import Employee, Client, Contract, Event
+from crud.projections import (
+    ClientRow, ContractRow, EventRow, EmployeeRow,
+    clients_select, contracts_select, events_select, employees_select
+)
 from auth import verify_token
+from crud.cache import cached, cache_key
+from logger import traced_service
+from crud.columnar import (
+    COLUMNAR_BATCH_SIZE, column_batches, column_types, arrow_schema, to_arrow, to_numpy, require_package
+)
+from crud.search import SEARCH_ENTITIES, DEFAULT_SEARCH_LIMIT, search_terms, matching_ids
+from crud.calendar import CalendarRow, calendar_statement, execute_overlap
 from enum import Enum
 
 
@@ -27,131 +40,515 @@ class EventFilterSupport(Enum):
     MY_EVENTS = "my_events"
 
 
+# Une page de résultats et le curseur à passer pour obtenir la suivante (None en fin de liste)
+Page = namedtuple("Page", ["items", "next_cursor"])
+
+# Résultats d'une recherche, du plus pertinent au moins pertinent pour chaque entité
+SearchResults = namedtuple("SearchResults", ["clients", "contracts", "events"])
+
+DEFAULT_PAGE_SIZE = 50
+
+# Nombre de lignes lues par aller-retour en mode flux (curseur côté serveur)
+STREAM_BATCH_SIZE = 1000
+
+# Tables lues par chaque liste : toute écriture sur l'une d'elles invalide les résultats en cache
+CLIENT_TABLES = (Client.__tablename__, Employee.__tablename__)
+CONTRACT_TABLES = (Contract.__tablename__, Client.__tablename__, Employee.__tablename__, Event.__tablename__)
+EVENT_TABLES = (Event.__tablename__, Contract.__tablename__, Client.__tablename__, Employee.__tablename__)
+EMPLOYEE_TABLES = (Employee.__tablename__,)
+
+# Clés de tri des événements : l'id termine toujours la clé pour la rendre unique
+EVENT_ORDERINGS = {
+    "id": (Event.id,),
+    "date_debut": (Event.date_debut, Event.id)
+}
+
+
+def _encode_cursor(item, keys):
+    """Curseur opaque : valeurs des clés de tri de la dernière ligne, séparées par '|'"""
+    values = []
+    for key in keys:
+        value = getattr(item, key.key)
+        values.append(value.isoformat() if isinstance(value, datetime) else str(value))
+    return "|".join(values)
+
+
+def _decode_cursor(cursor, keys):
+    parts = cursor.split("|")
+    if len(parts) != len(keys):
+        raise ValueError(f"Curseur invalide : {cursor}")
+    values = []
+    for key, part in zip(keys, parts):
+        values.append(datetime.fromisoformat(part) if isinstance(key.type, DateTime) else int(part))
+    return values
+
+
+def _seek_condition(keys, values):
+    """(k1, k2, ...) > (v1, v2, ...) écrit de façon portable : k1 > v1 OR (k1 = v1 AND k2 > v2) ..."""
+    key, value = keys[0], values[0]
+    if len(keys) == 1:
+        return key > value
+    return or_(key > value, and_(key == value, _seek_condition(keys[1:], values[1:])))
+
+
+def _paginate(session, stmt, keys, limit, after, row_type):
+    """
+    Pagination par clé (seek) : la page N coûte le même prix que la page 1,
+    l'index sur les clés de tri permettant de démarrer directement après le curseur.
+    Sans limite, toutes les lignes suivant le curseur sont retournées.
+    """
+    if after:
+        stmt = stmt.where(_seek_condition(keys, _decode_cursor(after, keys)))
+    stmt = stmt.order_by(*keys)
+
+    if limit is None:
+        return Page([row_type._make(row) for row in session.execute(stmt)], None)
+
+    # Une ligne de plus que demandé pour savoir s'il existe une page suivante
+    items = [row_type._make(row) for row in session.execute(stmt.limit(limit + 1))]
+    if len(items) > limit:
+        items = items[:limit]
+        return Page(items, _encode_cursor(items[-1], keys))
+    return Page(items, None)
+
+
+def _stream(session, stmt, keys, batch_size, row_type):
+    """Parcourt la requête par paquets via un curseur côté serveur (mémoire constante)"""
+    result = session.execute(stmt.order_by(*keys).execution_options(yield_per=batch_size))
+    for row in result:
+        yield row_type._make(row)
+
+
+@traced_service
 class ReadService:
     @staticmethod
-    def get_all_clients(token):
+    def _clients_query(session):
+        # Chargement des clients avec leur commercial (sans ses permissions, inutiles à l'affichage)
+        return session.query(Client)\
+            .options(joinedload(Client.commercial_attitré).lazyload(Employee.permissions))
+
+    @staticmethod
+    def _contracts_query(session, current_user, filter_mode):
+        # Base query avec toutes les relations nécessaires pour l'affichage
+        base_query = session.query(Contract)\
+            .options(joinedload(Contract.client))\
+            .options(joinedload(Contract.commercial).lazyload(Employee.permissions))\
+            .options(joinedload(Contract.evenement))\
+            .options(joinedload(Contract.evenement).joinedload(Event.contact_support).lazyload(Employee.permissions))
+
+        conditions = ReadService._contract_conditions(current_user, filter_mode)
+        if conditions:
+            base_query = base_query\
+                .outerjoin(Event, Contract.id == Event.contrat_id)\
+                .filter(*conditions)
+        return base_query
+
+    @staticmethod
+    def _contract_conditions(current_user, filter_mode):
+        """Conditions de filtrage des contrats selon le rôle (l'événement doit être joint)"""
+        # Filtres pour les gestionnaires
+        if current_user.departement == Employee.GESTION:
+            if filter_mode == ContractFilterGestion.WITH_SUPPORT:
+                return [Event.contact_support_id.isnot(None)]
+            elif filter_mode == ContractFilterGestion.WITHOUT_SUPPORT:
+                return [or_(Event.id.is_(None), Event.contact_support_id.is_(None))]
+
+        # Filtres pour les commerciaux
+        elif current_user.departement == Employee.COMMERCIAL:
+            if filter_mode == ContractFilterCommercial.SIGNED:
+                return [Contract.est_signe == True]
+            elif filter_mode == ContractFilterCommercial.UNSIGNED:
+                return [Contract.est_signe == False]
+            elif filter_mode == ContractFilterCommercial.FULLY_PAID:
+                return [Contract.montant_restant == 0]
+            elif filter_mode == ContractFilterCommercial.NOT_FULLY_PAID:
+                return [Contract.montant_restant > 0]
+
+        # Par défaut, tous les contrats
+        return []
+
+    @staticmethod
+    def _events_query(session, current_user, filter_mode):
+        # Base query avec toutes les relations pour l'affichage complet
+        base_query = session.query(Event)\
+            .options(joinedload(Event.contrat))\
+            .options(joinedload(Event.contact_support).lazyload(Employee.permissions))\
+            .options(joinedload(Event.contrat).joinedload(Contract.client))
+
+        return base_query.filter(*ReadService._event_conditions(current_user, filter_mode))
+
+    @staticmethod
+    def _event_conditions(current_user, filter_mode):
+        # Filtre optionnel pour le support
+        if current_user.departement == Employee.SUPPORT and filter_mode == EventFilterSupport.MY_EVENTS:
+            return [Event.contact_support_id == current_user.id]
+
+        # Par défaut, tout le monde voit tous les événements
+        return []
+
+    @staticmethod
+    def contract_filter(current_user, filter_mode):
+        """Filtre de contrats correspondant au rôle de l'utilisateur ('signed', 'with_support'...), sinon None"""
+        if current_user.departement == Employee.GESTION:
+            filters = ContractFilterGestion
+        elif current_user.departement == Employee.COMMERCIAL:
+            filters = ContractFilterCommercial
+        else:
+            return None
+        try:
+            return filters(filter_mode)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def clients_statement(current_user):
+        """Projection des clients et ses clés de tri (tous les collaborateurs voient tous les clients)"""
+        return clients_select(), (Client.id,)
+
+    @staticmethod
+    def contracts_statement(current_user, filter_mode=None):
+        """Projection des contrats filtrée selon le rôle, et ses clés de tri"""
+        stmt = contracts_select().where(*ReadService._contract_conditions(current_user, filter_mode))
+        return stmt, (Contract.id,)
+
+    @staticmethod
+    def events_statement(current_user, filter_mode=None, order_by="id", with_notes=False):
+        """Projection des événements filtrée selon le rôle, et ses clés de tri"""
+        stmt = events_select(with_notes).where(*ReadService._event_conditions(current_user, filter_mode))
+        return stmt, EVENT_ORDERINGS[order_by]
+
+    @staticmethod
+    def entity_statement(current_user, entity, filter_mode=None):
+        """
+        Projection filtrée, clés de tri et type de ligne d'une entité ("clients", "contracts",
+        "events" avec notes, "employees") ; filter_mode accepte le nom du filtre ou son enum.
+        """
+        if entity == "clients":
+            return (*ReadService.clients_statement(current_user), ClientRow)
+        if entity == "contracts":
+            filter_enum = ReadService.contract_filter(current_user, filter_mode)
+            return (*ReadService.contracts_statement(current_user, filter_enum), ContractRow)
+        if entity == "events":
+            try:
+                filter_enum = EventFilterSupport(filter_mode)
+            except ValueError:
+                filter_enum = None
+            return (*ReadService.events_statement(current_user, filter_enum, with_notes=True), EventRow)
+        if entity == "employees":
+            ReadService._check_can_list_employees(current_user)
+            return employees_select(), (Employee.id,), EmployeeRow
+        raise ValueError(f"Entité inconnue : {entity}")
+
+    @staticmethod
+    def _check_can_list_employees(current_user):
+        if current_user.departement != Employee.GESTION:
+            raise PermissionError("Seuls les gestionnaires peuvent voir tous les employés")
+
+    @staticmethod
+    def _employees_query(session, current_user):
+        ReadService._check_can_list_employees(current_user)
+
+        # Chargement des employés avec leurs permissions
+        return session.query(Employee)\
+            .options(joinedload(Employee.permissions))
+
+    @staticmethod
+    def get_all_clients(token, session=None):
         """
         Récupère tous les clients de la base de données.
         Tous les collaborateurs peuvent voir tous les clients en lecture seule.
         Charge la relation avec le commercial pour l'affichage.
-        
+
         Args:
             token: Token d'authentification de l'utilisateur
+            session: Session de la commande en cours (optionnelle)
 
         Returns:
             Liste complète des clients avec leurs commerciaux associés
         """
-        employee = verify_token(token)
+        employee = verify_token(token, session=session)
         if not employee:
             return []
-        
-        session = Session()
-        try:
-            current_user = session.query(Employee).filter_by(username=employee.username).first()
-            if not current_user:
-                return []
-            
-            # Chargement des clients avec leur commercial
-            return session.query(Client)\
-                .options(joinedload(Client.commercial_attitré))\
-                .order_by(Client.id)\
+
+        with session_scope(session) as session:
+            return ReadService._clients_query(session).order_by(Client.id).all()
+
+    @staticmethod
+    def get_all_contracts(token, filter_mode=None, session=None):
+        employee = verify_token(token, session=session)
+        if not employee:
+            return []
+
+        with session_scope(session) as session:
+            return ReadService._contracts_query(session, employee, filter_mode)\
+                .order_by(Contract.id)\
                 .all()
-        finally:
-            session.close()
 
     @staticmethod
-    def get_all_contracts(token, filter_mode=None):
-        employee = verify_token(token)
+    def get_all_events(token, filter_mode=None, session=None):
+        employee = verify_token(token, session=session)
         if not employee:
             return []
 
-        session = Session()
-        try:
-            current_user = session.query(Employee).filter_by(username=employee.username).first()
-            if not current_user:
-                return []
-
-            # Base query avec toutes les relations nécessaires pour l'affichage
-            base_query = session.query(Contract)\
-                .options(joinedload(Contract.client))\
-                .options(joinedload(Contract.commercial))\
-                .options(joinedload(Contract.evenement))\
-                .options(joinedload(Contract.evenement).joinedload(Event.contact_support))\
-                .order_by(Contract.id)
-
-            # Filtres pour les gestionnaires
-            if current_user.departement == Employee.GESTION:
-                if filter_mode == ContractFilterGestion.WITH_SUPPORT:
-                    return base_query\
-                        .join(Event, Contract.id == Event.contrat_id)\
-                        .filter(Event.contact_support_id.isnot(None))\
-                        .all()
-                elif filter_mode == ContractFilterGestion.WITHOUT_SUPPORT:
-                    return base_query\
-                        .outerjoin(Event, Contract.id == Event.contrat_id)\
-                        .filter(or_(Event.id.is_(None), Event.contact_support_id.is_(None)))\
-                        .all()
-
-            # Filtres pour les commerciaux
-            elif current_user.departement == Employee.COMMERCIAL:
-                if filter_mode == ContractFilterCommercial.SIGNED:
-                    return base_query.filter(Contract.est_signe == True).all()
-                elif filter_mode == ContractFilterCommercial.UNSIGNED:
-                    return base_query.filter(Contract.est_signe == False).all()
-                elif filter_mode == ContractFilterCommercial.FULLY_PAID:
-                    return base_query.filter(Contract.montant_restant == 0).all()
-                elif filter_mode == ContractFilterCommercial.NOT_FULLY_PAID:
-                    return base_query.filter(Contract.montant_restant > 0).all()
-
-            # Par défaut, retourner tous les contrats
-            return base_query.all()
-        finally:
-            session.close()
-
-    @staticmethod
-    def get_all_events(token, filter_mode=None):
-        employee = verify_token(token)
+        with session_scope(session) as session:
+            return ReadService._events_query(session, employee, filter_mode)\
+                .order_by(Event.id)\
+                .all()
+
+    @staticmethod
+    def get_all_employees(token, session=None):
+        employee = verify_token(token, session=session)
         if not employee:
             return []
 
-        session = Session()
-        try:
-            current_user = session.query(Employee).filter_by(username=employee.username).first()
-            if not current_user:
-                return []
+        with session_scope(session) as session:
+            return ReadService._employees_query(session, employee)\
+                .order_by(Employee.id)\
+                .all()
 
-            # Base query avec toutes les relations pour l'affichage complet
-            base_query = session.query(Event)\
-                .options(joinedload(Event.contrat))\
-                .options(joinedload(Event.contact_support))\
-                .options(joinedload(Event.contrat).joinedload(Contract.client))\
-                .order_by(Event.id)
+    @staticmethod
+    def get_clients_page(token, limit=DEFAULT_PAGE_SIZE, after=None, session=None):
+        """
+        Récupère une page de clients triés par id, sous forme de lignes légères (ClientRow).
 
-            # Filtre optionnel pour le support
-            if current_user.departement == Employee.SUPPORT and filter_mode == EventFilterSupport.MY_EVENTS:
-                return base_query.filter(Event.contact_support_id == current_user.id).all()
+        Args:
+            token: Token d'authentification de l'utilisateur
+            limit: Nombre maximum de clients retournés (None : tous)
+            after: Curseur retourné par la page précédente (None pour la première page)
+            session: Session de la commande en cours (optionnelle)
+
+        Returns:
+            Page(items, next_cursor)
+        """
+        employee = verify_token(token, session=session)
+        if not employee:
+            return Page([], None)
 
-            # Par défaut, tout le monde voit tous les événements
-            return base_query.all()
-        finally:
-            session.close()
+        def load():
+            with session_scope(session) as scoped:
+                stmt, keys = ReadService.clients_statement(employee)
+                return _paginate(scoped, stmt, keys, limit, after, ClientRow)
+
+        key = cache_key("clients", employee.departement, limit, after)
+        return cached(key, CLIENT_TABLES, load, session)
+
+    @staticmethod
+    def get_contracts_page(token, filter_mode=None, limit=DEFAULT_PAGE_SIZE, after=None, session=None):
+        """Récupère une page de contrats (ContractRow) triés par id, avec les mêmes filtres que get_all_contracts"""
+        employee = verify_token(token, session=session)
+        if not employee:
+            return Page([], None)
+
+        def load():
+            with session_scope(session) as scoped:
+                stmt, keys = ReadService.contracts_statement(employee, filter_mode)
+                return _paginate(scoped, stmt, keys, limit, after, ContractRow)
+
+        mode = filter_mode.value if filter_mode else None
+        key = cache_key("contracts", employee.departement, mode, limit, after)
+        return cached(key, CONTRACT_TABLES, load, session)
+
+    @staticmethod
+    def get_events_page(token, filter_mode=None, order_by="id", limit=DEFAULT_PAGE_SIZE, after=None,
+                        with_notes=False, session=None):
+        """
+        Récupère une page d'événements (EventRow).
+
+        Args:
+            order_by: "id" ou "date_debut" (tri chronologique, départagé par l'id)
+            with_notes: Lit aussi les notes (sinon EventRow.notes vaut None)
+        """
+        employee = verify_token(token, session=session)
+        if not employee:
+            return Page([], None)
+
+        def load():
+            with session_scope(session) as scoped:
+                stmt, keys = ReadService.events_statement(employee, filter_mode, order_by, with_notes)
+                return _paginate(scoped, stmt, keys, limit, after, EventRow)
+
+        # my_events dépend du support connecté, pas seulement de son rôle
+        scope = employee.id if filter_mode == EventFilterSupport.MY_EVENTS else employee.departement
+        mode = filter_mode.value if filter_mode else None
+        key = cache_key("events", scope, mode, order_by, with_notes, limit, after)
+        return cached(key, EVENT_TABLES, load, session)
+
+    @staticmethod
+    def get_employees_page(token, limit=DEFAULT_PAGE_SIZE, after=None, session=None):
+        """Récupère une page de collaborateurs (EmployeeRow) triés par id (réservé aux gestionnaires)"""
+        employee = verify_token(token, session=session)
+        if not employee:
+            return Page([], None)
+        ReadService._check_can_list_employees(employee)
+
+        def load():
+            with session_scope(session) as scoped:
+                return _paginate(scoped, employees_select(), (Employee.id,), limit, after, EmployeeRow)
+
+        key = cache_key("employees", employee.departement, limit, after)
+        return cached(key, EMPLOYEE_TABLES, load, session)
+
+    @staticmethod
+    def iter_clients(token, batch_size=STREAM_BATCH_SIZE, session=None):
+        """
+        Parcourt tous les clients sans les charger en mémoire d'un coup.
+        La session reste ouverte tant que le générateur n'est pas épuisé.
+
+        Yields:
+            Les clients (ClientRow) triés par id, lus par paquets de batch_size
+        """
+        employee = verify_token(token, session=session)
+        if not employee:
+            return
+
+        with session_scope(session) as session:
+            stmt, keys = ReadService.clients_statement(employee)
+            yield from _stream(session, stmt, keys, batch_size, ClientRow)
+
+    @staticmethod
+    def iter_contracts(token, filter_mode=None, batch_size=STREAM_BATCH_SIZE, session=None):
+        """Parcourt les contrats (mêmes filtres que get_all_contracts) par paquets"""
+        employee = verify_token(token, session=session)
+        if not employee:
+            return
+
+        with session_scope(session) as session:
+            stmt, keys = ReadService.contracts_statement(employee, filter_mode)
+            yield from _stream(session, stmt, keys, batch_size, ContractRow)
+
+    @staticmethod
+    def iter_events(token, filter_mode=None, order_by="id", batch_size=STREAM_BATCH_SIZE,
+                    with_notes=False, session=None):
+        """Parcourt les événements (mêmes filtres que get_all_events) par paquets"""
+        employee = verify_token(token, session=session)
+        if not employee:
+            return
+
+        with session_scope(session) as session:
+            stmt, keys = ReadService.events_statement(employee, filter_mode, order_by, with_notes)
+            yield from _stream(session, stmt, keys, batch_size, EventRow)
+
+    @staticmethod
+    def iter_employees(token, batch_size=STREAM_BATCH_SIZE, session=None):
+        """Parcourt les collaborateurs par paquets (réservé aux gestionnaires)"""
+        employee = verify_token(token, session=session)
+        if not employee:
+            return
+        ReadService._check_can_list_employees(employee)
+
+        with session_scope(session) as session:
+            yield from _stream(session, employees_select(), (Employee.id,), batch_size, EmployeeRow)
 
     @staticmethod
-    def get_all_employees(token):
-        employee = verify_token(token)
+    def iter_arrow_batches(token, entity, filter_mode=None, batch_size=COLUMNAR_BATCH_SIZE, session=None):
+        """
+        Parcourt une entité en RecordBatch Arrow de batch_size lignes (nécessite pyarrow).
+        Montants en decimal128(10, 2), dates en timestamp[us].
+
+        Exemple :
+            table = pyarrow.Table.from_batches(ReadService.iter_arrow_batches(token, "contracts"))
+        """
+        employee = verify_token(token, session=session)
         if not employee:
+            return
+
+        with session_scope(session) as session:
+            stmt, keys, row_type = ReadService.entity_statement(employee, entity, filter_mode)
+            schema = arrow_schema(row_type)
+            for columns in column_batches(session, stmt, keys, batch_size):
+                yield to_arrow(columns, schema)
+
+    @staticmethod
+    def iter_numpy_batches(token, entity, filter_mode=None, batch_size=COLUMNAR_BATCH_SIZE, session=None):
+        """
+        Parcourt une entité en dictionnaires {colonne: tableau NumPy} de batch_size lignes (nécessite numpy).
+        Montants en centimes (int64), dates en datetime64[us], textes en tableaux d'objets ;
+        les entiers et montants pouvant être nuls sont des tableaux masqués.
+        """
+        employee = verify_token(token, session=session)
+        if not employee:
+            return
+
+        with session_scope(session) as session:
+            stmt, keys, row_type = ReadService.entity_statement(employee, entity, filter_mode)
+            types = column_types(row_type)
+            require_package("numpy", "numpy")
+            for columns in column_batches(session, stmt, keys, batch_size):
+                yield to_numpy(columns, types)
+
+    @staticmethod
+    def _rows_by_ids(session, stmt, id_column, ids, row_type):
+        """Lignes d'affichage des ids donnés, dans l'ordre de ids"""
+        if not ids:
             return []
+        rows = {row.id: row for row in map(row_type._make, session.execute(stmt.where(id_column.in_(ids))))}
+        return [rows[item] for item in ids if item in rows]
 
-        session = Session()
-        try:
-            current_user = session.query(Employee).filter_by(username=employee.username).first()
-            if not current_user or current_user.departement != Employee.GESTION:
-                raise PermissionError("Seuls les gestionnaires peuvent voir tous les employés")
+    @staticmethod
+    def search(token, query, entities=SEARCH_ENTITIES, limit=DEFAULT_SEARCH_LIMIT, session=None):
+        """
+        Recherche plein texte, tolérante aux débuts de mots : clients (nom, email, entreprise,
+        téléphone), contrats des clients trouvés et événements (nom, lieu, notes).
+        Les index de recherche sont créés par init_db (voir crud.search).
 
-            # Chargement des employés avec leurs permissions
-            return session.query(Employee)\
-                .options(joinedload(Employee.permissions))\
-                .order_by(Employee.id)\
-                .all()
-        finally:
-            session.close()
\ No newline at end of file
+        Args:
+            query: Mots recherchés (tous doivent correspondre)
+            entities: Entités à rechercher, parmi SEARCH_ENTITIES
+            limit: Nombre maximal de résultats par entité
+
+        Returns:
+            SearchResults(clients, contracts, events) : ClientRow, ContractRow et EventRow (avec notes)
+        """
+        unknown = set(entities) - set(SEARCH_ENTITIES)
+        if unknown:
+            raise ValueError(f"Entité inconnue : {', '.join(sorted(unknown))}")
+        terms = search_terms(query)
+
+        employee = verify_token(token, session=session)
+        if not employee:
+            return SearchResults([], [], [])
+
+        clients, contracts, events = [], [], []
+        with session_scope(session) as session:
+            if "clients" in entities or "contracts" in entities:
+                client_ids = matching_ids(session, Client.__tablename__, terms, limit)
+                if "clients" in entities:
+                    stmt, _ = ReadService.clients_statement(employee)
+                    clients = ReadService._rows_by_ids(session, stmt, Client.id, client_ids, ClientRow)
+                if "contracts" in entities and client_ids:
+                    # Contrats des clients les plus pertinents d'abord, puis par id
+                    stmt, _ = ReadService.contracts_statement(employee)
+                    rank = case({client_id: index for index, client_id in enumerate(client_ids)},
+                                value=Contract.client_id)
+                    stmt = stmt.where(Contract.client_id.in_(client_ids)).order_by(rank, Contract.id).limit(limit)
+                    contracts = [ContractRow._make(row) for row in session.execute(stmt)]
+            if "events" in entities:
+                event_ids = matching_ids(session, Event.__tablename__, terms, limit)
+                stmt, _ = ReadService.events_statement(employee, with_notes=True)
+                events = ReadService._rows_by_ids(session, stmt, Event.id, event_ids, EventRow)
+        return SearchResults(clients, contracts, events)
+
+    @staticmethod
+    def calendar(token, start, end, support_id=None, session=None):
+        """
+        Événements dont la période chevauche [start, end), dans l'ordre chronologique,
+        éventuellement ceux d'un seul support. Servi par l'index des périodes (voir crud.calendar).
+
+        Returns:
+            Liste de CalendarRow
+        """
+        if end <= start:
+            raise ValueError("La fin du créneau doit être postérieure à son début")
+
+        employee = verify_token(token, session=session)
+        if not employee:
+            return []
+
+        def load():
+            with session_scope(session) as scoped:
+                rows = execute_overlap(
+                    scoped, lambda dialect, indexed: calendar_statement(dialect, start, end, support_id, indexed)
+                )
+                return [CalendarRow._make(row) for row in rows]
+
+        return cached(cache_key("calendar", start, end, support_id), EVENT_TABLES, load, session)
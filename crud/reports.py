@@ -0,0 +1,264 @@
+from typing import NamedTuple, Optional
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import select, func
+from sqlalchemy.orm import aliased
+from config.db import session_scope
+from models.models import Employee, Client, Contract, Event, CommercialSummary, ClientSummary
+from auth import verify_token
+from models.permissions import verify_user_permission
+from crud.cache import cached, cache_key
+from crud.read import ReadService, CONTRACT_TABLES
+from crud.summaries import rebuild_summaries, check_summaries, next_event_column
+from logger import traced_service
+
+
+# Rapports agrégés calculés par la base : une requête par rapport (GROUP BY, agrégats filtrés
+# par FILTER (WHERE ...) et fonctions de fenêtre), quel que soit le nombre de contrats.
+# Les filtres de contrats de chaque rôle (--filter de `contracts list`) s'appliquent aussi.
+# Le tableau de bord lit les tables de synthèse (crud.summaries) : une ligne par commercial
+# et les premiers clients par montant dû, sans parcourir les contrats.
+
+DEFAULT_RECEIVABLES_LIMIT = 20
+DEFAULT_DASHBOARD_CLIENTS = 10
+ZERO = Decimal("0.00")
+
+
+class CommercialReportRow(NamedTuple):
+    commercial_id: Optional[int]
+    commercial: Optional[str]
+    contracts: int
+    signed_contracts: int
+    signed_total: Decimal
+    unsigned_total: Decimal
+    outstanding: Decimal
+    without_event: int
+    rank: int
+    signed_share: float
+
+
+class ReceivableRow(NamedTuple):
+    client_id: int
+    client: str
+    commercial: Optional[str]
+    unpaid_contracts: int
+    outstanding: Decimal
+    oldest_unpaid: Optional[datetime]
+    rank: int
+    cumulative_share: float
+
+
+class DashboardCommercialRow(NamedTuple):
+    commercial_id: int
+    commercial: str
+    contracts: int
+    signed_contracts: int
+    signed_total: Decimal
+    outstanding: Decimal
+    next_event: Optional[datetime]
+
+
+class DashboardClientRow(NamedTuple):
+    client_id: int
+    client: str
+    commercial: Optional[str]
+    contracts: int
+    signed_total: Decimal
+    outstanding: Decimal
+    next_event: Optional[datetime]
+
+
+class Dashboard(NamedTuple):
+    commercials: list
+    clients: list
+
+
+def _amount(value):
+    """Somme SQL d'un montant : NULL quand aucune ligne ne correspond au filtre"""
+    return Decimal(value).quantize(ZERO) if value is not None else ZERO
+
+
+def commercials_statement(current_user, filter_mode=None):
+    """
+    Totaux par commercial du client (celui qui suit le contrat, comme dans les droits de
+    modification) : contrats signés / non signés, montants restant dus sur les contrats
+    signés, contrats sans événement, rang et part du chiffre signé.
+    """
+    commercial = aliased(Employee)
+    signed = Contract.est_signe.is_(True)
+    signed_total = func.coalesce(func.sum(Contract.montant_total).filter(signed), 0)
+    return select(
+        Client.commercial_id,
+        commercial.username,
+        func.count(Contract.id),
+        func.count(Contract.id).filter(signed),
+        signed_total,
+        func.coalesce(func.sum(Contract.montant_total).filter(~signed), 0),
+        func.coalesce(func.sum(Contract.montant_restant).filter(signed), 0),
+        func.count(Contract.id).filter(Event.id.is_(None)),
+        func.rank().over(order_by=signed_total.desc()),
+        # Part du chiffre signé de tous les commerciaux (fenêtre sur l'ensemble des groupes)
+        func.coalesce(signed_total * 1.0 / func.nullif(func.sum(signed_total).over(), 0), 0),
+    ).select_from(Contract)\
+        .join(Client, Contract.client_id == Client.id)\
+        .outerjoin(Event, Event.contrat_id == Contract.id)\
+        .outerjoin(commercial, Client.commercial_id == commercial.id)\
+        .where(*ReadService._contract_conditions(current_user, filter_mode))\
+        .group_by(Client.commercial_id, commercial.username)\
+        .order_by(signed_total.desc(), Client.commercial_id)
+
+
+def receivables_statement(current_user, filter_mode=None, limit=DEFAULT_RECEIVABLES_LIMIT):
+    """
+    Clients dont les contrats signés ne sont pas soldés, du plus gros montant dû au plus petit,
+    avec la part cumulée du total dû (les premiers clients concentrent-ils l'encours ?).
+    """
+    commercial = aliased(Employee)
+    unpaid = (Contract.est_signe.is_(True)) & (Contract.montant_restant > 0)
+    conditions = ReadService._contract_conditions(current_user, filter_mode)
+    outstanding = func.sum(Contract.montant_restant)
+    stmt = select(
+        Client.id,
+        Client.nom_complet,
+        commercial.username,
+        func.count(Contract.id),
+        outstanding,
+        func.min(Contract.date_creation),
+        func.rank().over(order_by=outstanding.desc()),
+        # Somme courante dans l'ordre du rapport, rapportée au total dû
+        func.sum(outstanding).over(order_by=(outstanding.desc(), Client.id), rows=(None, 0)) * 1.0
+        / func.sum(outstanding).over(),
+    ).select_from(Contract)\
+        .join(Client, Contract.client_id == Client.id)\
+        .outerjoin(commercial, Client.commercial_id == commercial.id)
+    if conditions:
+        # Les filtres des gestionnaires portent sur le support de l'événement
+        stmt = stmt.outerjoin(Event, Event.contrat_id == Contract.id)
+    return stmt.where(unpaid, *conditions)\
+        .group_by(Client.id, Client.nom_complet, commercial.username)\
+        .order_by(outstanding.desc(), Client.id)\
+        .limit(limit)
+
+
+def dashboard_commercials_statement():
+    """Synthèse de chaque commercial (y compris ceux sans contrat), du plus gros chiffre signé au plus petit"""
+    signed_total = func.coalesce(CommercialSummary.signed_total, 0)
+    return select(
+        Employee.id,
+        Employee.username,
+        func.coalesce(CommercialSummary.contracts, 0),
+        func.coalesce(CommercialSummary.signed_contracts, 0),
+        signed_total,
+        func.coalesce(CommercialSummary.outstanding, 0),
+        next_event_column(CommercialSummary),
+    ).outerjoin(CommercialSummary, CommercialSummary.commercial_id == Employee.id)\
+        .where((Employee.departement == Employee.COMMERCIAL) | CommercialSummary.commercial_id.is_not(None))\
+        .order_by(signed_total.desc(), Employee.username)
+
+
+def dashboard_clients_statement(limit=DEFAULT_DASHBOARD_CLIENTS):
+    """Premiers clients par montant dû (parcours de ix_client_summaries_outstanding)"""
+    commercial = aliased(Employee)
+    return select(
+        Client.id,
+        Client.nom_complet,
+        commercial.username,
+        ClientSummary.contracts,
+        ClientSummary.signed_total,
+        ClientSummary.outstanding,
+        next_event_column(ClientSummary),
+    ).join(Client, ClientSummary.client_id == Client.id)\
+        .outerjoin(commercial, Client.commercial_id == commercial.id)\
+        .where(ClientSummary.outstanding > 0)\
+        .order_by(ClientSummary.outstanding.desc(), ClientSummary.client_id.desc())\
+        .limit(limit)
+
+
+@traced_service
+class ReportService:
+    @staticmethod
+    def commercials_report(token, filter_mode=None, session=None):
+        """
+        Chiffre par commercial (CommercialReportRow), du plus gros chiffre signé au plus petit.
+
+        Args:
+            token: Token d'authentification de l'utilisateur
+            filter_mode: Filtre de contrats du rôle (voir ReadService.contract_filter)
+            session: Session de la commande en cours (optionnelle)
+        """
+        employee = verify_token(token, session=session)
+        if not employee:
+            return []
+
+        def load():
+            with session_scope(session) as scoped:
+                return [
+                    CommercialReportRow(
+                        row[0], row[1], row[2], row[3], _amount(row[4]), _amount(row[5]), _amount(row[6]),
+                        row[7], row[8], float(row[9] or 0)
+                    )
+                    for row in scoped.execute(commercials_statement(employee, filter_mode))
+                ]
+
+        mode = filter_mode.value if filter_mode else None
+        return cached(cache_key("report commercials", employee.departement, mode), CONTRACT_TABLES, load, session)
+
+    @staticmethod
+    def receivables_report(token, filter_mode=None, limit=DEFAULT_RECEIVABLES_LIMIT, session=None):
+        """Clients aux plus gros montants restant dus sur contrats signés (ReceivableRow)"""
+        employee = verify_token(token, session=session)
+        if not employee:
+            return []
+
+        def load():
+            with session_scope(session) as scoped:
+                return [
+                    ReceivableRow(row[0], row[1], row[2], row[3], _amount(row[4]), row[5], row[6],
+                                  float(row[7] or 0))
+                    for row in scoped.execute(receivables_statement(employee, filter_mode, limit))
+                ]
+
+        mode = filter_mode.value if filter_mode else None
+        key = cache_key("report receivables", employee.departement, mode, limit)
+        return cached(key, CONTRACT_TABLES, load, session)
+
+    @staticmethod
+    def dashboard(token, limit=DEFAULT_DASHBOARD_CLIENTS, session=None):
+        """
+        Tableau de bord lu dans les tables de synthèse : une ligne par commercial et les limit
+        clients aux plus gros montants dus. Les prochains événements déjà passés sont recalculés
+        dans la requête (ces seules lignes), sans écriture ; le résultat dépend de l'heure, d'où
+        l'absence de cache.
+        """
+        employee = verify_token(token, session=session)
+        if not employee:
+            return None
+
+        with session_scope(session) as scoped:
+            commercials = [
+                DashboardCommercialRow(row[0], row[1], row[2], row[3], _amount(row[4]), _amount(row[5]), row[6])
+                for row in scoped.execute(dashboard_commercials_statement())
+            ]
+            clients = [
+                DashboardClientRow(row[0], row[1], row[2], row[3], _amount(row[4]), _amount(row[5]), row[6])
+                for row in scoped.execute(dashboard_clients_statement(limit))
+            ]
+            return Dashboard(commercials, clients)
+
+    @staticmethod
+    def rebuild_summaries(token, session=None):
+        """Recalcule entièrement les tables de synthèse (réservé aux gestionnaires des contrats)"""
+        if not verify_user_permission(token, 'manage_contracts', session=session):
+            raise PermissionError("Vous n'avez pas la permission de recalculer les synthèses")
+
+        with session_scope(session) as scoped:
+            return rebuild_summaries(scoped)
+
+    @staticmethod
+    def check_summaries(token, session=None):
+        """Écarts entre les tables de synthèse et les contrats (liste de SummaryDiscrepancy)"""
+        if not verify_token(token, session=session):
+            raise PermissionError("Token invalide")
+
+        with session_scope(session) as scoped:
+            return check_summaries(scoped)
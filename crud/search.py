@@ -0,0 +1,141 @@
+import re
+from sqlalchemy import text, inspect
+from sqlalchemy.exc import OperationalError
+from models.models import Client, Event
+
+
+# Recherche plein texte indexée :
+#   - PostgreSQL : index GIN sur un tsvector (mots entiers ou préfixes) et index trigrammes
+#     (pg_trgm) sur le même texte, pour tolérer les fautes de frappe
+#   - SQLite : tables virtuelles FTS5 à contenu externe, tenues à jour par des triggers
+# Le classement est fait par la base (ts_rank + similarité, ou bm25) ; seuls les ids des
+# meilleurs résultats sont lus, puis les lignes d'affichage habituelles.
+
+SEARCH_ENTITIES = ("clients", "contracts", "events")
+DEFAULT_SEARCH_LIMIT = 20
+
+# Colonnes indexées par table (les contrats sont trouvés par leur client)
+SEARCH_COLUMNS = {
+    Client.__tablename__: ("nom_complet", "email", "entreprise", "telephone"),
+    Event.__tablename__: ("nom", "lieu", "notes"),
+}
+
+# Configuration sans racinisation : noms propres, emails et téléphones restent tels quels
+TS_CONFIG = "simple"
+
+
+def search_terms(query):
+    """Mots de la recherche (lettres et chiffres), en minuscules"""
+    terms = re.findall(r"\w+", query.lower())
+    if not terms:
+        raise ValueError("La recherche doit contenir au moins un mot")
+    return terms
+
+
+def _document(table):
+    """Texte indexé d'une table : expression identique dans les index et les requêtes"""
+    return " || ' ' || ".join(f"coalesce({column}, '')" for column in SEARCH_COLUMNS[table])
+
+
+def _fts_table(table):
+    return f"{table}_fts"
+
+
+def _postgresql_indexes(connection, table):
+    document = _document(table)
+    connection.execute(text(
+        f"CREATE INDEX IF NOT EXISTS ix_{table}_search_tsv ON {table} "
+        f"USING gin (to_tsvector('{TS_CONFIG}', {document}))"
+    ))
+    connection.execute(text(
+        f"CREATE INDEX IF NOT EXISTS ix_{table}_search_trgm ON {table} USING gin (({document}) gin_trgm_ops)"
+    ))
+
+
+def _sqlite_indexes(connection, table, rebuild):
+    fts = _fts_table(table)
+    columns = SEARCH_COLUMNS[table]
+    names = ", ".join(columns)
+    new_values = ", ".join(f"new.{column}" for column in columns)
+    old_values = ", ".join(f"old.{column}" for column in columns)
+
+    created = fts not in inspect(connection).get_table_names()
+    connection.execute(text(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({names}, content='{table}', "
+        f"content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+    ))
+    # Triggers supprimés avec la table source : recréés à chaque appel si besoin
+    connection.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END"
+    ))
+    connection.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); END"
+    ))
+    # Seules les colonnes indexées déclenchent la mise à jour (pas l'affectation d'un support...) ;
+    # recréé à chaque appel pour remplacer l'ancienne version, déclenchée par toute modification
+    connection.execute(text(f"DROP TRIGGER IF EXISTS {fts}_au"))
+    connection.execute(text(
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {names} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END"
+    ))
+    if created or rebuild:
+        connection.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+
+
+def ensure_search_indexes(engine, rebuild=False):
+    """
+    Crée les index de recherche manquants (sans effet s'ils existent déjà).
+    rebuild reconstruit l'index FTS5 de SQLite, par exemple après la recréation des tables.
+    Les autres SGBD n'ont pas d'index de recherche (matching_ids lève NotImplementedError).
+    """
+    with engine.begin() as connection:
+        if engine.dialect.name == "postgresql":
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            for table in SEARCH_COLUMNS:
+                _postgresql_indexes(connection, table)
+        elif engine.dialect.name == "sqlite":
+            for table in SEARCH_COLUMNS:
+                _sqlite_indexes(connection, table, rebuild)
+
+
+def _postgresql_matches(session, table, terms, limit):
+    document = _document(table)
+    # Tous les mots, chacun pouvant être un début de mot ; ou un texte proche (fautes de frappe)
+    tsquery = " & ".join(f"{term}:*" for term in terms)
+    rows = session.execute(text(
+        f"SELECT id, ts_rank(to_tsvector('{TS_CONFIG}', {document}), to_tsquery('{TS_CONFIG}', :tsquery))"
+        f" + word_similarity(:query, {document}) AS score "
+        f"FROM {table} "
+        f"WHERE to_tsvector('{TS_CONFIG}', {document}) @@ to_tsquery('{TS_CONFIG}', :tsquery) "
+        f"OR :query <% ({document}) "
+        f"ORDER BY score DESC, id LIMIT :limit"
+    ), {"tsquery": tsquery, "query": " ".join(terms), "limit": limit})
+    return [row[0] for row in rows]
+
+
+def _sqlite_matches(session, table, terms, limit):
+    fts = _fts_table(table)
+    # Tous les mots, chacun pouvant être un début de mot (les guillemets neutralisent la syntaxe FTS5)
+    match = " ".join(f'"{term}"*' for term in terms)
+    try:
+        rows = session.execute(text(
+            f"SELECT rowid FROM {fts} WHERE {fts} MATCH :match ORDER BY bm25({fts}), rowid LIMIT :limit"
+        ), {"match": match, "limit": limit})
+    except OperationalError as e:
+        if f"no such table: {fts}" not in str(e):
+            raise
+        raise RuntimeError("Index de recherche absent : lancez python init_db.py") from e
+    return [row[0] for row in rows]
+
+
+def matching_ids(session, table, terms, limit):
+    """Ids des lignes de table correspondant aux mots, de la plus pertinente à la moins pertinente"""
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        return _postgresql_matches(session, table, terms, limit)
+    if dialect == "sqlite":
+        return _sqlite_matches(session, table, terms, limit)
+    raise NotImplementedError(f"Recherche non disponible pour {dialect}")
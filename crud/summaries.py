@@ -0,0 +1,280 @@
+from typing import NamedTuple, Optional
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import select, insert, update, delete, func, or_, case
+from sqlalchemy.dialects import postgresql, sqlite
+from models.models import Client, Contract, Event, CommercialSummary, ClientSummary
+
+
+# Tables de synthèse du tableau de bord (une ligne par commercial, une ligne par client) :
+#   - tenues à jour par différences dans la transaction de chaque écriture de contrat
+#     (apply_contract_change) ou d'événement (note_event_date, refresh_next_events)
+#   - reconstruites d'un bloc par rebuild_summaries (`reports rebuild`, `db seed`)
+#   - lues sans écriture : un prochain événement déjà passé est recalculé dans la requête de
+#     lecture (next_event_column), et enregistré par refresh_stale_next_events (`init_db.py`)
+#   - comparées aux agrégats recalculés sur les contrats par check_summaries (`reports check`)
+# Comme dans les rapports, un contrat compte pour le commercial de son client, le restant dû ne
+# compte que les contrats signés et les clients sans commercial n'ont pas de ligne commerciale.
+
+# (table de synthèse, sa clé, colonne correspondante du contrat ou de son client)
+SUMMARIES = (
+    (CommercialSummary, CommercialSummary.commercial_id, Client.commercial_id),
+    (ClientSummary, ClientSummary.client_id, Contract.client_id),
+)
+SUMMARY_TABLES = tuple(summary.__tablename__ for summary, _, _ in SUMMARIES)
+AMOUNT_COLUMNS = ("signed_total", "outstanding")
+CENT = Decimal("0.01")
+
+
+class ContractSnapshot(NamedTuple):
+    commercial_id: Optional[int]
+    client_id: int
+    est_signe: bool
+    montant_total: Decimal
+    montant_restant: Decimal
+
+
+class SummaryDiscrepancy(NamedTuple):
+    table: str
+    key: int
+    column: str
+    expected: object
+    stored: object
+
+
+def contract_snapshot(session, contract):
+    """Valeurs d'un contrat qui comptent dans les synthèses, avant ou après une écriture"""
+    # Client relu par son id : la relation contract.client ne suit pas un changement de client_id
+    client = session.get(Client, contract.client_id)
+    return ContractSnapshot(
+        client.commercial_id if client else None, contract.client_id, bool(contract.est_signe),
+        Decimal(str(contract.montant_total)), Decimal(str(contract.montant_restant))
+    )
+
+
+def _contribution(summary, snapshot, sign):
+    """Part d'un contrat dans une ligne de synthèse (sign = -1 pour la retirer)"""
+    signed = snapshot.est_signe
+    values = {
+        "contracts": sign,
+        "signed_contracts": sign if signed else 0,
+        "signed_total": sign * snapshot.montant_total if signed else 0,
+        "outstanding": sign * snapshot.montant_restant if signed else 0,
+    }
+    return {name: value for name, value in values.items() if name in summary.__table__.c}
+
+
+def _increment(session, summary, key_column, key, values):
+    """Ajoute values à la ligne key, créée au besoin, en une requête"""
+    dialect = session.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = dialect_insert(summary).values({key_column.key: key, **values})
+        session.execute(stmt.on_conflict_do_update(
+            index_elements=[key_column.key],
+            set_={name: getattr(summary, name) + stmt.excluded[name] for name in values}
+        ))
+        return
+
+    # Autres SGBD : mise à jour, puis création de la ligne si elle n'existait pas
+    result = session.execute(
+        update(summary).where(key_column == key)
+        .values({name: getattr(summary, name) + value for name, value in values.items()})
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        session.execute(insert(summary).values({key_column.key: key, **values}))
+
+
+def apply_contract_change(session, before, after):
+    """
+    Reporte la création (before=None) ou la modification d'un contrat dans les synthèses :
+    sa part avant l'écriture est retirée, sa part après est ajoutée, une requête par ligne touchée.
+    """
+    for summary, key_column, contract_key in SUMMARIES:
+        deltas = {}
+        for snapshot, sign in ((before, -1), (after, 1)):
+            key = snapshot and getattr(snapshot, contract_key.key)
+            if key is None:
+                continue
+            delta = deltas.setdefault(key, {})
+            for name, value in _contribution(summary, snapshot, sign).items():
+                delta[name] = delta.get(name, 0) + value
+        for key, delta in deltas.items():
+            values = {name: value for name, value in delta.items() if value}
+            if values:
+                _increment(session, summary, key_column, key, values)
+
+
+def note_event_date(session, snapshot, date_debut, now=None):
+    """
+    Nouvel événement du contrat (ContractSnapshot) : avance, s'il est plus proche,
+    le prochain événement de son commercial et de son client
+    """
+    if date_debut < (now or datetime.now()):
+        return
+    for summary, key_column, contract_key in SUMMARIES:
+        key = getattr(snapshot, contract_key.key)
+        if key is None:
+            continue
+        session.execute(
+            update(summary)
+            .where(key_column == key, or_(summary.next_event.is_(None), summary.next_event > date_debut))
+            .values(next_event=date_debut)
+            .execution_options(synchronize_session=False)
+        )
+
+
+def _with_client(stmt, contract_key):
+    """Jointure du client, si la clé de la synthèse est une colonne du client"""
+    return stmt.join(Client, Contract.client_id == Client.id) if contract_key.table is Client.__table__ else stmt
+
+
+def _upcoming_event(key_column, contract_key, now):
+    """Prochain événement de la ligne de synthèse (sous-requête corrélée sur sa clé)"""
+    stmt = select(func.min(Event.date_debut)).join(Contract, Event.contrat_id == Contract.id)
+    return _with_client(stmt, contract_key)\
+        .where(contract_key == key_column, Event.date_debut >= now)\
+        .scalar_subquery()
+
+
+def _refresh_next_event(session, summary, key_column, contract_key, condition, now):
+    """Recalcule le prochain événement des lignes retenues par condition"""
+    return session.execute(
+        update(summary).where(condition).values(next_event=_upcoming_event(key_column, contract_key, now))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+
+def next_event_column(summary, now=None):
+    """
+    Prochain événement d'une ligne de synthèse pour une lecture : la valeur enregistrée, ou, si
+    elle est déjà passée, celle recalculée par la sous-requête (évaluée pour ces seules lignes)
+    """
+    now = now or datetime.now()
+    for candidate, key_column, contract_key in SUMMARIES:
+        if candidate is summary:
+            return case(
+                (or_(summary.next_event.is_(None), summary.next_event >= now), summary.next_event),
+                else_=_upcoming_event(key_column, contract_key, now)
+            )
+    raise ValueError(f"Table de synthèse inconnue : {summary.__tablename__}")
+
+
+def refresh_next_events(session, commercial_ids=(), client_ids=(), now=None):
+    """Recalcule le prochain événement des commerciaux et clients dont un événement a changé"""
+    now = now or datetime.now()
+    for (summary, key_column, contract_key), keys in zip(SUMMARIES, (commercial_ids, client_ids)):
+        keys = {key for key in keys if key is not None}
+        if keys:
+            _refresh_next_event(session, summary, key_column, contract_key, key_column.in_(keys), now)
+
+
+def refresh_stale_next_events(session, now=None):
+    """
+    Enregistre les prochains événements déjà passés (lignes trouvées par l'index sur next_event).
+    Appelée par init_db.py ; retourne le nombre de lignes recalculées.
+    """
+    now = now or datetime.now()
+    return sum(
+        _refresh_next_event(session, summary, key_column, contract_key, summary.next_event < now, now)
+        for summary, key_column, contract_key in SUMMARIES
+    )
+
+
+def _summary_columns(summary):
+    return [column.key for column in summary.__table__.columns if not column.primary_key]
+
+
+def summary_statement(summary, contract_key, now):
+    """Agrégats d'une table de synthèse recalculés sur les contrats (une ligne par clé)"""
+    signed = Contract.est_signe.is_(True)
+    aggregates = {
+        "contracts": func.count(Contract.id),
+        "signed_contracts": func.count(Contract.id).filter(signed),
+        "signed_total": func.coalesce(func.sum(Contract.montant_total).filter(signed), 0),
+        "outstanding": func.coalesce(func.sum(Contract.montant_restant).filter(signed), 0),
+        "next_event": func.min(Event.date_debut).filter(Event.date_debut >= now),
+    }
+    stmt = select(contract_key, *(aggregates[name] for name in _summary_columns(summary))).select_from(Contract)
+    return _with_client(stmt, contract_key)\
+        .outerjoin(Event, Event.contrat_id == Contract.id)\
+        .where(contract_key.is_not(None))\
+        .group_by(contract_key)
+
+
+def _rebuild_rows(session, summary, key_column, contract_key, now, keys=None):
+    """Remplace les lignes des clés données (toutes si keys est None) par les agrégats recalculés"""
+    removed = delete(summary).execution_options(synchronize_session=False)
+    recomputed = summary_statement(summary, contract_key, now)
+    if keys is not None:
+        removed = removed.where(key_column.in_(keys))
+        recomputed = recomputed.where(contract_key.in_(keys))
+    session.execute(removed)
+    session.execute(insert(summary).from_select([key_column.key, *_summary_columns(summary)], recomputed))
+
+
+def rebuild_summaries(session, now=None):
+    """
+    Recalcule entièrement les synthèses (une requête INSERT ... SELECT par table),
+    par exemple après un chargement en masse. Retourne le nombre de lignes par table.
+    """
+    now = now or datetime.now()
+    counts = {}
+    for summary, key_column, contract_key in SUMMARIES:
+        _rebuild_rows(session, summary, key_column, contract_key, now)
+        counts[summary.__tablename__] = session.scalar(select(func.count()).select_from(summary))
+    return counts
+
+
+def move_client_contracts(session, previous_commercial_id, commercial_id, now=None):
+    """
+    Client confié à un autre commercial : ses contrats passent d'une ligne commerciale à l'autre.
+    Les deux lignes sont recalculées sur leurs contrats (une requête DELETE et une INSERT ... SELECT).
+    """
+    keys = {key for key in (previous_commercial_id, commercial_id) if key is not None}
+    if keys:
+        summary, key_column, contract_key = SUMMARIES[0]
+        _rebuild_rows(session, summary, key_column, contract_key, now or datetime.now(), keys)
+
+
+def _normalized(column, value):
+    """Valeur comparable : montants au centime, absence de ligne équivalente à une ligne à zéro"""
+    if column in AMOUNT_COLUMNS:
+        return Decimal(str(value or 0)).quantize(CENT)
+    if column == "next_event":
+        return value
+    return value or 0
+
+
+def check_summaries(session, now=None):
+    """
+    Compare les synthèses aux agrégats recalculés sur les contrats.
+    Un prochain événement déjà passé n'est pas comparé : il est recalculé à la lecture (next_event_column).
+
+    Returns:
+        Liste de SummaryDiscrepancy (vide si les synthèses sont cohérentes)
+    """
+    now = now or datetime.now()
+    discrepancies = []
+    for summary, key_column, contract_key in SUMMARIES:
+        columns = _summary_columns(summary)
+        expected = {row[0]: row[1:] for row in session.execute(summary_statement(summary, contract_key, now))}
+        stored = {
+            row[0]: row[1:]
+            for row in session.execute(select(key_column, *(getattr(summary, name) for name in columns)))
+        }
+        empty = (None,) * len(columns)
+        for key in sorted(expected.keys() | stored.keys()):
+            for column, expected_value, stored_value in zip(
+                columns, expected.get(key, empty), stored.get(key, empty)
+            ):
+                if column == "next_event" and stored_value is not None and stored_value < now:
+                    continue
+                expected_value = _normalized(column, expected_value)
+                stored_value = _normalized(column, stored_value)
+                if expected_value != stored_value:
+                    discrepancies.append(SummaryDiscrepancy(
+                        summary.__tablename__, key, column, expected_value, stored_value
+                    ))
+    return discrepancies
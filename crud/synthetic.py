@@ -0,0 +1,343 @@
+import bisect
+import random
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import NamedTuple
+from sqlalchemy import select, func, text
+from models.models import Employee, Client, Contract, Event, Permission, employee_permissions, hash_password
+from models.permissions import DEPARTMENT_PERMISSIONS, READ_PERMISSIONS
+from crud.bulk import supports_copy, insert_rows
+from crud.cache import MODIFIED_TABLES
+from crud.assignment import SupportCalendar
+
+
+# Jeu de données synthétique, déterministe pour une graine donnée : mêmes lignes quel que soit le
+# SGBD, et mêmes ids sur une base vide (les ids suivent les lignes existantes, par exemple le
+# compte administrateur : `db seed --reset` repart de tables vides). Les répartitions imitent la
+# production : quelques commerciaux portent l'essentiel du portefeuille, quelques clients
+# l'essentiel des contrats (lois de Pareto), la plupart des contrats sont signés, les événements
+# passés ont presque tous un support, jamais affecté à deux événements simultanés.
+
+SYNTHETIC_SCALES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+SYNTHETIC_CHUNK_SIZE = 10_000
+
+# Date de référence fixe (et non la date du jour) : le jeu de données ne dépend que de la graine
+REFERENCE_DATE = datetime(2025, 1, 1)
+HISTORY_DAYS = 3 * 365
+
+CONTRACTS_PER_CLIENT = 3
+CLIENTS_PER_COMMERCIAL = 250
+SIGNED_RATE = 0.80
+# Parmi les contrats signés : soldés, partiellement payés, le reste sans paiement
+FULLY_PAID_RATE = 0.45
+PARTIALLY_PAID_RATE = 0.35
+# Contrat repris par un autre commercial que celui du client
+REASSIGNED_RATE = 0.05
+EVENT_RATE = 0.70
+# Support assigné : presque toujours pour un événement passé, moins souvent à venir
+PAST_EVENT_SUPPORT_RATE = 0.95
+FUTURE_EVENT_SUPPORT_RATE = 0.60
+# Supports tirés pour un événement avant de le laisser sans support si tous sont déjà pris
+SUPPORT_DRAWS = 5
+NOTES_RATE = 0.30
+# Durées d'événement (en heures) et leurs poids
+EVENT_DURATIONS = (3, 4, 6, 8, 24, 48)
+EVENT_DURATION_WEIGHTS = (10, 25, 25, 20, 15, 5)
+
+FIRST_NAMES = (
+    "Camille", "Léa", "Manon", "Chloé", "Emma", "Inès", "Sarah", "Julie", "Lucie", "Anaïs",
+    "Lucas", "Hugo", "Louis", "Nathan", "Théo", "Paul", "Jules", "Arthur", "Tom", "Maxime",
+)
+LAST_NAMES = (
+    "Martin", "Bernard", "Thomas", "Petit", "Robert", "Richard", "Durand", "Dubois", "Moreau",
+    "Laurent", "Simon", "Michel", "Lefebvre", "Leroy", "Roux", "David", "Bertrand", "Morel",
+    "Fournier", "Girard",
+)
+COMPANY_PREFIXES = ("Atelier", "Groupe", "Studio", "Maison", "Agence", "Cabinet", "Société", "Réseau")
+COMPANY_NAMES = (
+    "Horizon", "Azur", "Lumière", "Mistral", "Cèdre", "Boréal", "Odyssée", "Quartz", "Vauban", "Orion",
+)
+CITIES = (
+    "Paris", "Lyon", "Marseille", "Bordeaux", "Lille", "Nantes", "Toulouse", "Strasbourg",
+    "Nice", "Rennes", "Montpellier", "Annecy",
+)
+VENUES = ("Salle des fêtes", "Château", "Domaine", "Hôtel", "Parc des expositions", "Rooftop")
+
+
+class SyntheticVolumes(NamedTuple):
+    """Nombre de lignes générées par table"""
+    gestion: int
+    commerciaux: int
+    supports: int
+    clients: int
+    contracts: int
+
+
+def plan_volumes(nb_contracts):
+    """Volumes déduits du nombre de contrats (un client pour trois contrats, 250 clients par commercial)"""
+    clients = max(nb_contracts // CONTRACTS_PER_CLIENT, 1)
+    commerciaux = max(clients // CLIENTS_PER_COMMERCIAL, 2)
+    return SyntheticVolumes(
+        gestion=max(commerciaux // 10, 1),
+        commerciaux=commerciaux,
+        supports=max(commerciaux // 2, 1),
+        clients=clients,
+        contracts=nb_contracts,
+    )
+
+
+class WeightedPicker:
+    """Tirage pondéré en O(log n) : poids cumulés calculés une fois, une recherche dichotomique par tirage"""
+
+    __slots__ = ("values", "cumulative", "total")
+
+    def __init__(self, values, weights):
+        self.values = values
+        self.cumulative = []
+        total = 0.0
+        for weight in weights:
+            total += weight
+            self.cumulative.append(total)
+        self.total = total
+
+    def pick(self, rng):
+        return self.values[bisect.bisect_right(self.cumulative, rng.random() * self.total)]
+
+
+def pareto_picker(rng, values, alpha):
+    """Poids tirés d'une loi de Pareto : plus alpha est petit, plus la répartition est concentrée"""
+    return WeightedPicker(values, [rng.paretovariate(alpha) for _ in values])
+
+
+def _phone(rng):
+    return f"0{rng.choice('67')}{rng.randrange(10 ** 8):08d}"
+
+
+def _person(rng):
+    return rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+
+
+def _amount(cents):
+    return Decimal(cents).scaleb(-2)
+
+
+def generate_employees(rng, volumes, password_hash, first_id=1):
+    """Collaborateurs des trois départements ; tous partagent le même mot de passe (haché une fois)"""
+    rows = []
+    departments = (
+        (Employee.GESTION, volumes.gestion),
+        (Employee.COMMERCIAL, volumes.commerciaux),
+        (Employee.SUPPORT, volumes.supports),
+    )
+    employee_id = first_id
+    for departement, count in departments:
+        for index in range(1, count + 1):
+            prenom, nom = _person(rng)
+            username = f"{departement.lower()}{index:05d}"
+            rows.append({
+                "id": employee_id, "username": username, "password": password_hash,
+                "numero_employe": f"E{employee_id:07d}", "email": f"{username}@epicevents.test",
+                "nom": nom, "prenom": prenom, "telephone": _phone(rng), "departement": departement,
+                "date_creation": REFERENCE_DATE - timedelta(days=rng.randrange(HISTORY_DAYS + 365)),
+                "permission_version": 0,
+            })
+            employee_id += 1
+    return rows
+
+
+def generate_clients(rng, volumes, commercial_picker, first_id=1):
+    """Clients rattachés à un commercial (portefeuilles inégaux), créés sur l'historique"""
+    for client_id in range(first_id, first_id + volumes.clients):
+        prenom, nom = _person(rng)
+        created = REFERENCE_DATE - timedelta(days=rng.randrange(HISTORY_DAYS), seconds=rng.randrange(86400))
+        yield {
+            "id": client_id, "nom_complet": f"{prenom} {nom}", "email": f"client{client_id}@example.test",
+            "telephone": _phone(rng) if rng.random() < 0.9 else None,
+            "entreprise": f"{rng.choice(COMPANY_PREFIXES)} {rng.choice(COMPANY_NAMES)} {client_id}",
+            "date_creation": created,
+            "derniere_mise_a_jour": created + timedelta(days=rng.randrange(90)),
+            "commercial_id": commercial_picker.pick(rng),
+        }
+
+
+def _free_support(rng, support_picker, calendars, start, end):
+    """Support tiré parmi ceux libres sur [start, end), réservé ; None si SUPPORT_DRAWS tirages sont pris"""
+    for _ in range(SUPPORT_DRAWS):
+        support = support_picker.pick(rng)
+        calendar = calendars.setdefault(support, SupportCalendar())
+        if calendar.busy_until(start, end) is None:
+            calendar.book(start, end)
+            return support
+    return None
+
+
+def generate_contracts_and_events(rng, volumes, clients, client_picker, commercial_picker, support_picker,
+                                  first_contract_id=1, first_event_id=1):
+    """
+    Contrats (client tiré avec une forte concentration) et, pour une partie des contrats
+    signés, leur événement. Le support d'un événement est libre sur son créneau.
+
+    Args:
+        clients: client_id -> (commercial_id, date de création)
+
+    Yields:
+        (contrat, événement ou None)
+    """
+    event_id = first_event_id
+    # Créneaux réservés de chaque support
+    calendars = {}
+    for contract_id in range(first_contract_id, first_contract_id + volumes.contracts):
+        client_id = client_picker.pick(rng)
+        commercial_id, client_created = clients[client_id]
+        if rng.random() < REASSIGNED_RATE:
+            commercial_id = commercial_picker.pick(rng)
+
+        age = (REFERENCE_DATE - client_created).days
+        created = client_created + timedelta(days=rng.randrange(age + 1), seconds=rng.randrange(86400))
+        # Montants log-normaux : médiane autour de 5 000 €, quelques gros contrats
+        total = min(int(rng.lognormvariate(13.1, 0.9)), 10 ** 9)
+        signed = rng.random() < SIGNED_RATE
+        remaining = total
+        if signed:
+            payment = rng.random()
+            if payment < FULLY_PAID_RATE:
+                remaining = 0
+            elif payment < FULLY_PAID_RATE + PARTIALLY_PAID_RATE:
+                remaining = rng.randrange(1, total) if total > 1 else total
+
+        contract = {
+            "id": contract_id, "client_id": client_id, "commercial_id": commercial_id,
+            "montant_total": _amount(total), "montant_restant": _amount(remaining),
+            "date_creation": created, "est_signe": signed,
+        }
+
+        event = None
+        if signed and rng.random() < EVENT_RATE:
+            # Événement quelques semaines après la signature, en journée
+            start = (created + timedelta(days=int(rng.expovariate(1 / 45)) + 1)).replace(
+                hour=rng.randrange(9, 21), minute=rng.choice((0, 15, 30, 45)), second=0, microsecond=0
+            )
+            end = start + timedelta(hours=rng.choices(EVENT_DURATIONS, EVENT_DURATION_WEIGHTS)[0])
+            support_rate = PAST_EVENT_SUPPORT_RATE if start < REFERENCE_DATE else FUTURE_EVENT_SUPPORT_RATE
+            event = {
+                "id": event_id, "nom": f"Événement {event_id}", "contrat_id": contract_id,
+                "date_debut": start, "date_fin": end,
+                "lieu": f"{rng.choice(VENUES)}, {rng.choice(CITIES)}",
+                "nb_participants": max(int(rng.lognormvariate(4.3, 0.8)), 5),
+                "notes": "Besoins techniques à confirmer" if rng.random() < NOTES_RATE else None,
+                "contact_support_id": _free_support(rng, support_picker, calendars, start, end)
+                if rng.random() < support_rate else None,
+            }
+            event_id += 1
+        yield contract, event
+
+
+def _next_id(session, model):
+    return (session.scalar(select(func.max(model.id))) or 0) + 1
+
+
+def _reset_sequences(session):
+    """Sous PostgreSQL, les ids explicites n'avancent pas les séquences : créations ultérieures en conflit"""
+    if session.get_bind().dialect.name != "postgresql":
+        return
+    for model in (Employee, Client, Contract, Event):
+        name = model.__tablename__
+        session.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{name}', 'id'), (SELECT MAX(id) FROM {name}))"
+        ))
+
+
+def load_synthetic_data(session, nb_contracts, seed=42, password="epicevents", progress=None):
+    """
+    Génère et insère le jeu de données synthétique dans la transaction de la session,
+    par paquets de SYNTHETIC_CHUNK_SIZE lignes (COPY sous PostgreSQL, executemany sinon).
+    Les clients, contrats et événements existants doivent avoir été supprimés au préalable ;
+    les collaborateurs générés sont numérotés à la suite de ceux déjà en base.
+
+    Args:
+        session: Session ouverte (validée par l'appelant)
+        nb_contracts: Nombre de contrats, dont découlent les autres volumes (plan_volumes)
+        seed: Graine du générateur : même graine, mêmes données (mêmes ids sur une base vide)
+        password: Mot de passe de tous les collaborateurs générés
+        progress: Fonction appelée avec (table, lignes insérées) après chaque table
+
+    Returns:
+        Nombre de lignes insérées par table
+    """
+    if any(session.scalar(select(func.count()).select_from(model)) for model in (Client, Contract, Event)):
+        raise ValueError("La base contient déjà des clients, contrats ou événements")
+
+    rng = random.Random(seed)
+    volumes = plan_volumes(nb_contracts)
+    use_copy = supports_copy(session)
+    counts = {}
+
+    def report(table, count):
+        counts[table] = count
+        if progress:
+            progress(table, count)
+
+    # Collaborateurs, ajoutés après ceux déjà en base (administrateur)
+    employees = generate_employees(rng, volumes, hash_password(password), _next_id(session, Employee))
+    insert_rows(session, Employee, employees, use_copy)
+    report(Employee.__tablename__, len(employees))
+
+    permission_ids = dict(session.execute(select(Permission.code, Permission.id)).all())
+    links = [
+        {"employee_id": employee["id"], "permission_id": permission_ids[code]}
+        for employee in employees
+        for code in DEPARTMENT_PERMISSIONS.get(employee["departement"], READ_PERMISSIONS)
+        if code in permission_ids
+    ]
+    for start in range(0, len(links), SYNTHETIC_CHUNK_SIZE):
+        session.connection().execute(employee_permissions.insert(), links[start:start + SYNTHETIC_CHUNK_SIZE])
+    report(employee_permissions.name, len(links))
+
+    def ids_of(departement):
+        return [employee["id"] for employee in employees if employee["departement"] == departement]
+
+    commercial_picker = pareto_picker(rng, ids_of(Employee.COMMERCIAL), 2.0)
+    support_picker = pareto_picker(rng, ids_of(Employee.SUPPORT), 3.0)
+
+    # Clients : seuls le commercial et la date de création sont conservés pour les contrats
+    clients = {}
+    chunk = []
+    for client in generate_clients(rng, volumes, commercial_picker, _next_id(session, Client)):
+        clients[client["id"]] = (client["commercial_id"], client["date_creation"])
+        chunk.append(client)
+        if len(chunk) == SYNTHETIC_CHUNK_SIZE:
+            insert_rows(session, Client, chunk, use_copy)
+            chunk = []
+    insert_rows(session, Client, chunk, use_copy)
+    report(Client.__tablename__, len(clients))
+
+    client_picker = pareto_picker(rng, list(clients), 2.5)
+    contracts, events = [], []
+    nb_events = 0
+    generated = generate_contracts_and_events(
+        rng, volumes, clients, client_picker, commercial_picker, support_picker,
+        _next_id(session, Contract), _next_id(session, Event)
+    )
+    for contract, event in generated:
+        contracts.append(contract)
+        if event:
+            events.append(event)
+        if len(contracts) == SYNTHETIC_CHUNK_SIZE:
+            insert_rows(session, Contract, contracts, use_copy)
+            insert_rows(session, Event, events, use_copy)
+            nb_events += len(events)
+            contracts, events = [], []
+    insert_rows(session, Contract, contracts, use_copy)
+    insert_rows(session, Event, events, use_copy)
+    report(Contract.__tablename__, volumes.contracts)
+    report(Event.__tablename__, nb_events + len(events))
+
+    _reset_sequences(session)
+    session.flush()
+
+    # Écritures hors unité de travail : les listes en cache sont invalidées au commit
+    session.info.setdefault(MODIFIED_TABLES, set()).update([
+        Employee.__tablename__, employee_permissions.name, Client.__tablename__,
+        Contract.__tablename__, Event.__tablename__
+    ])
+    return counts
@@ -1,138 +1,213 @@
-from config.db import Session
+from datetime import datetime
+from config.db import session_scope
 from models.models import Employee, Client, Contract, Event
-from auth import verify_token
-from models.permissions import verify_user_permission
+from auth import verify_token, invalidate_identity_on_commit
+from models.permissions import verify_user_permission, assign_department_permissions
+from crud.summaries import apply_contract_change, contract_snapshot, refresh_next_events, move_client_contracts
+from crud.calendar import check_support_availability
+from crud.assignment import (
+    unassigned_events, support_workloads, busy_intervals, plan_assignments, apply_assignments, applied_plan
+)
+from sqlalchemy import select
 from sqlalchemy.orm.exc import NoResultFound
-from logger import log_exception, log_employee_modification, log_contract_signature
+from logger import log_exception, log_employee_modification, log_contract_signature, traced_service
 
 
+@traced_service
 class UpdateService:
     @staticmethod
-    def update_employee(token, employee_id, update_data):
+    def update_employee(token, employee_id, update_data, session=None):
         """Modifier un collaborateur."""
-        if not verify_user_permission(token, 'manage_users'):
+        if not verify_user_permission(token, 'manage_users', session=session):
             raise PermissionError("Vous n'avez pas la permission de modifier des collaborateurs")
-        
-        session = Session()
+
         try:
-            employee = session.query(Employee).get(employee_id)
-            if not employee:
-                raise NoResultFound("Collaborateur non trouvé")
-            
-            for key, value in update_data.items():
-                setattr(employee, key, value)
-            
-            session.commit()
-            session.refresh(employee)
-            log_employee_modification(employee, "modification")
-            return session.merge(employee)
+            with session_scope(session) as session:
+                employee = session.get(Employee, employee_id)
+                if not employee:
+                    raise NoResultFound("Collaborateur non trouvé")
+
+                previous_departement = employee.departement
+                for key, value in update_data.items():
+                    setattr(employee, key, value)
+
+                if employee.departement != previous_departement:
+                    # Droits du nouveau département ; les tokens émis avant ne sont plus valides
+                    assign_department_permissions(employee, session=session)
+                elif 'permissions' in update_data:
+                    employee.permission_version = (employee.permission_version or 0) + 1
+                session.flush()
+
+                # Les identités en cache ne reflètent plus le collaborateur modifié
+                invalidate_identity_on_commit(session, employee_id)
+                log_employee_modification(employee, "modification")
+                return employee
         except Exception as e:
             log_exception(e)
-            session.rollback()
             raise
-        finally:
-            session.close()
 
     @staticmethod
-    def update_client(token, client_id, update_data):
+    def update_client(token, client_id, update_data, session=None):
         """Modifier un client."""
-        employee = verify_token(token)
+        employee = verify_token(token, session=session)
         if not employee:
             raise PermissionError("Token invalide")
 
-        session = Session()
+        current_user = employee
+
         try:
-            current_user = session.merge(employee)
-            client = session.query(Client).get(client_id)
-
-            if not client:
-                raise NoResultFound("Client non trouvé")
-
-            if not (current_user.departement == Employee.COMMERCIAL and client.commercial_id == current_user.id) and \
-               not (current_user.departement == Employee.GESTION and verify_user_permission(token, 'manage_clients')):
-                raise PermissionError("Permissions insuffisantes")
-
-            for key, value in update_data.items():
-                setattr(client, key, value)
-            
-            session.commit()
-            session.refresh(client)
-            return session.merge(client)
+            with session_scope(session) as session:
+                client = session.get(Client, client_id)
+
+                if not client:
+                    raise NoResultFound("Client non trouvé")
+
+                if not (current_user.departement == Employee.COMMERCIAL and client.commercial_id == current_user.id) and \
+                   not (current_user.departement == Employee.GESTION and verify_user_permission(token, 'manage_clients', session=session)):
+                    raise PermissionError("Permissions insuffisantes")
+
+                previous_commercial_id = client.commercial_id
+                for key, value in update_data.items():
+                    setattr(client, key, value)
+
+                session.flush()
+                if client.commercial_id != previous_commercial_id:
+                    # Les contrats du client comptent désormais pour son nouveau commercial
+                    move_client_contracts(session, previous_commercial_id, client.commercial_id)
+                return client
         except Exception as e:
             log_exception(e)
-            session.rollback()
             raise
-        finally:
-            session.close()
 
     @staticmethod
-    def update_contract(token, contract_id, update_data):
+    def update_contract(token, contract_id, update_data, session=None):
         """Modifier un contrat."""
-        employee = verify_token(token)
+        employee = verify_token(token, session=session)
         if not employee:
             raise PermissionError("Token invalide")
-        
-        session = Session()
+
+        current_user = employee
+
         try:
-            current_user = session.merge(employee)
-            contract = session.query(Contract).join(Contract.client).filter(Contract.id == contract_id).first()
-            if not contract:
-                raise NoResultFound("Contrat non trouvé")
-            
-            # Autorise si c'est un gestionnaire ou si c'est le commercial du client
-            if not ((current_user.departement == Employee.GESTION and verify_user_permission(token, 'manage_contracts')) or
-                    (current_user.departement == Employee.COMMERCIAL and contract.client.commercial_id == current_user.id)):
-                raise PermissionError("Permissions insuffisantes")
-            
-            was_signed = contract.est_signe 
-            for key, value in update_data.items():
-                setattr(contract, key, value)
-            
-            session.commit()
-            session.refresh(contract)
-
-            if not was_signed and contract.est_signe:
-                log_contract_signature(contract)
-                
-            return session.merge(contract)
+            with session_scope(session) as session:
+                contract = session.query(Contract).join(Contract.client).filter(Contract.id == contract_id).first()
+                if not contract:
+                    raise NoResultFound("Contrat non trouvé")
+
+                # Autorise si c'est un gestionnaire ou si c'est le commercial du client
+                if not ((current_user.departement == Employee.GESTION and verify_user_permission(token, 'manage_contracts', session=session)) or
+                        (current_user.departement == Employee.COMMERCIAL and contract.client.commercial_id == current_user.id)):
+                    raise PermissionError("Permissions insuffisantes")
+
+                was_signed = contract.est_signe
+                before = contract_snapshot(session, contract)
+                for key, value in update_data.items():
+                    setattr(contract, key, value)
+
+                session.flush()
+                after = contract_snapshot(session, contract)
+                apply_contract_change(session, before, after)
+                # L'événement du contrat change de commercial ou de client
+                if (before.commercial_id, before.client_id) != (after.commercial_id, after.client_id) \
+                        and contract.evenement is not None:
+                    refresh_next_events(session, (before.commercial_id, after.commercial_id),
+                                        (before.client_id, after.client_id))
+
+                if not was_signed and contract.est_signe:
+                    log_contract_signature(contract)
+
+                return contract
         except Exception as e:
             log_exception(e)
-            session.rollback()
             raise
-        finally:
-            session.close()
 
     @staticmethod
-    def update_event(token, event_id, update_data):
+    def update_event(token, event_id, update_data, session=None):
         """Modifier un événement."""
-        employee = verify_token(token)
+        employee = verify_token(token, session=session)
+        if not employee:
+            raise PermissionError("Token invalide")
+
+        try:
+            with session_scope(session) as session:
+                event = session.get(Event, event_id)
+
+                if not event:
+                    raise NoResultFound("Événement non trouvé")
+
+                # Si on essaie d'assigner un support
+                if 'contact_support_id' in update_data:
+                    # Vérifier que l'utilisateur est bien du département SUPPORT
+                    potential_support = session.get(Employee, update_data['contact_support_id'])
+                    if not potential_support or potential_support.departement != Employee.SUPPORT:
+                        raise PermissionError("Le contact support doit être du département SUPPORT")
+
+                if {'contact_support_id', 'date_debut', 'date_fin'} & update_data.keys():
+                    # Un support ne peut pas être affecté à deux événements qui se chevauchent
+                    check_support_availability(
+                        session,
+                        update_data.get('contact_support_id', event.contact_support_id),
+                        update_data.get('date_debut', event.date_debut),
+                        update_data.get('date_fin', event.date_fin),
+                        event_id=event.id
+                    )
+
+                contract_ids = {event.contrat_id}
+                for key, value in update_data.items():
+                    setattr(event, key, value)
+
+                session.flush()
+                if 'date_debut' in update_data or 'contrat_id' in update_data:
+                    # Prochain événement des commerciaux et clients de l'ancien et du nouveau contrat
+                    contract_ids.add(event.contrat_id)
+                    keys = session.execute(
+                        select(Client.commercial_id, Contract.client_id)
+                        .join(Client, Contract.client_id == Client.id)
+                        .where(Contract.id.in_(contract_ids))
+                    ).all()
+                    refresh_next_events(session, [key[0] for key in keys], [key[1] for key in keys])
+                return event
+        except Exception as e:
+            log_exception(e)
+            raise
+
+    @staticmethod
+    def auto_assign_supports(token, include_past=False, dry_run=False, session=None):
+        """
+        Affecte à chaque événement sans support le moins chargé des supports libres sur son
+        créneau (voir crud.assignment), en une requête. Réservé aux gestionnaires.
+
+        Args:
+            token: Token d'authentification de l'utilisateur
+            include_past: Traite aussi les événements terminés (sinon : à venir ou en cours)
+            dry_run: Calcule le plan sans l'enregistrer
+            session: Session de la commande en cours (optionnelle)
+
+        Returns:
+            AssignmentPlan (affectations enregistrées, événements sans support libre, charges avant / après,
+            événements affectés entre-temps par quelqu'un d'autre)
+        """
+        employee = verify_token(token, session=session)
         if not employee:
             raise PermissionError("Token invalide")
+        if not (employee.departement == Employee.GESTION and
+                verify_user_permission(token, 'manage_events', session=session)):
+            raise PermissionError("Seuls les gestionnaires peuvent affecter les supports")
 
-        session = Session()
         try:
-            current_user = session.query(Employee).filter_by(username=employee.username).first()
-            event = session.query(Event).get(event_id)
-            
-            if not event:
-                raise NoResultFound("Événement non trouvé")
-
-            # Si on essaie d'assigner un support
-            if 'contact_support_id' in update_data:
-                # Vérifier que l'utilisateur est bien du département SUPPORT
-                potential_support = session.query(Employee).get(update_data['contact_support_id'])
-                if not potential_support or potential_support.departement != Employee.SUPPORT:
-                    raise PermissionError("Le contact support doit être du département SUPPORT")
-
-            for key, value in update_data.items():
-                setattr(event, key, value)
-            
-            session.commit()
-            session.refresh(event)
-            return session.merge(event)
+            with session_scope(session) as session:
+                since = None if include_past else datetime.now()
+                events = unassigned_events(session, since)
+                supports, loads = support_workloads(session, since)
+                busy = {}
+                if events:
+                    # Seuls les créneaux réservés pendant la période des événements à affecter comptent
+                    busy = busy_intervals(session, min(min(event[1:]) for event in events),
+                                          max(max(event[1:]) for event in events))
+                plan = plan_assignments(events, supports, loads, busy)
+                if not dry_run:
+                    plan = applied_plan(plan, apply_assignments(session, plan.assignments))
+                return plan
         except Exception as e:
             log_exception(e)
-            session.rollback()
             raise
-        finally:
-            session.close()
\ No newline at end of file
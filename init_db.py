@@ -1,6 +1,48 @@
-from config.db import Base, engine
-from models.models import Employee, Permission, Client, Contract, Event
+from config.db import Base, engine, session_scope
+from models.models import Employee, Permission, Client, Contract, Event, ClientSummary
 from models.permissions import setup_department_permissions
+from crud.cache import invalidate_query_cache
+from crud.search import ensure_search_indexes
+from crud.calendar import ensure_calendar_index
+from crud.summaries import rebuild_summaries, refresh_stale_next_events
+from sqlalchemy import inspect, text, select
+
+
+def upgrade_schema():
+    """Met à niveau une base existante (colonnes ajoutées depuis sa création)"""
+    columns = {column['name'] for column in inspect(engine).get_columns('employees')}
+    if 'permission_version' not in columns:
+        with engine.begin() as connection:
+            connection.execute(text(
+                "ALTER TABLE employees ADD COLUMN permission_version INTEGER NOT NULL DEFAULT 0"
+            ))
+        print("Colonne employees.permission_version ajoutée")
+
+    # Index déclarés dans les modèles après la création des tables
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(engine)
+                print(f"Index {index.name} créé")
+
+    # Index de recherche plein texte (tsvector et trigrammes, ou FTS5 sous SQLite)
+    ensure_search_indexes(engine)
+
+    # Index des périodes d'événements (GiST, ou R*Tree sous SQLite)
+    ensure_calendar_index(engine)
+
+    # Tables de synthèse ajoutées à une base qui a déjà des contrats : calculées une fois
+    with session_scope() as session:
+        if session.scalar(select(Contract.id).limit(1)) is not None and \
+                session.scalar(select(ClientSummary.client_id).limit(1)) is None:
+            rebuild_summaries(session)
+            print("Tables de synthèse calculées")
+        # Prochains événements passés depuis la dernière écriture : le tableau de bord ne les recalcule plus
+        stale = refresh_stale_next_events(session)
+        if stale:
+            print(f"Prochain événement recalculé pour {stale} ligne(s) de synthèse")
 
 
 def init_database():
@@ -8,9 +50,15 @@ def init_database():
     # Création de toutes les tables définies dans models.py
     Base.metadata.create_all(engine)
     print("Tables créées avec succès !")
-    
+
+    # Mise à niveau des tables déjà présentes
+    upgrade_schema()
+
+    # Les résultats en cache peuvent provenir d'une autre base
+    invalidate_query_cache()
+
     # Configuration des permissions de base
     setup_department_permissions()
 
 if __name__ == "__main__":
-    init_database()
\ No newline at end of file
+    init_database()
@@ -1,18 +1,179 @@
+import functools
+import inspect
+import itertools
+import os
+import threading
+import time
 import sentry_sdk
 from sentry_sdk import capture_exception, capture_message, flush
-import os
+from sentry_sdk.envelope import Envelope
+from sentry_sdk.transport import HttpTransport
+from sentry_sdk.utils import capture_internal_exceptions
 from dotenv import load_dotenv
 
 
 load_dotenv()
 
+# Échantillonnage par environnement : (part des erreurs envoyées, part des commandes tracées).
+# SENTRY_SAMPLE_RATE et SENTRY_TRACES_SAMPLE_RATE remplacent ces valeurs.
+SENTRY_SAMPLING = {
+    "production": (1.0, 0.05),
+    "staging": (1.0, 0.25),
+    "development": (1.0, 1.0),
+}
+
+# Événements en attente d'envoi ; au-delà, ils sont écrits dans le spool au lieu d'être perdus
+SENTRY_QUEUE_SIZE = int(os.getenv("SENTRY_QUEUE_SIZE", "100"))
+# Attente maximale des envois à la sortie du processus (en secondes) ; le reste part au spool
+SENTRY_SHUTDOWN_TIMEOUT = float(os.getenv("SENTRY_SHUTDOWN_TIMEOUT", "0.5"))
+SENTRY_SPOOL_DIR = os.getenv("SENTRY_SPOOL_DIR", ".sentry_spool")
+SENTRY_SPOOL_MAX_FILES = int(os.getenv("SENTRY_SPOOL_MAX_FILES", "1000"))
+# Enveloppes du spool renvoyées au démarrage de chaque processus
+SENTRY_SPOOL_REPLAY = 50
+
+
+class SpoolingTransport(HttpTransport):
+    """
+    Transport HTTP de Sentry (thread d'envoi, file bornée) qui ne perd ni ne bloque :
+    une enveloppe qui ne peut pas partir (file pleine, réseau absent, sortie du processus)
+    est écrite dans SENTRY_SPOOL_DIR, un fichier par enveloppe, et renvoyée par un processus suivant.
+    """
+
+    def __init__(self, options):
+        super().__init__(options)
+        self._spool_dir = SENTRY_SPOOL_DIR
+        self._pending = {}
+        self._ids = itertools.count()
+        self._worker.submit(self._replay_spool)
+
+    def capture_envelope(self, envelope):
+        key = next(self._ids)
+        self._pending[key] = envelope
+
+        def send():
+            # Retirée avant l'envoi : kill() ne met au spool que les enveloppes pas encore parties
+            if self._pending.pop(key, None) is None:
+                return
+            with capture_internal_exceptions():
+                self._send_envelope(envelope)
+                self._flush_client_reports()
+
+        if not self._worker.submit(send):
+            self._pending.pop(key, None)
+            # Comme le transport du SDK : file pleine signalée, pertes comptées (si le spool est plein)
+            self.on_dropped_event("full_queue")
+            self._spool_or_record_loss(envelope, "queue_overflow")
+
+    def _handle_request_error(self, envelope, loss_reason="network", record_reason="network_error"):
+        # Réseau indisponible : l'enveloppe mise au spool sera renvoyée plus tard, ce n'est pas une perte
+        if loss_reason == "network" and envelope is not None and self._spool(envelope):
+            return
+        super()._handle_request_error(envelope, loss_reason=loss_reason, record_reason=record_reason)
+
+    def kill(self):
+        # Sortie du processus : ce qui n'est pas encore parti est mis de côté, sans attendre le réseau
+        for key in list(self._pending):
+            envelope = self._pending.pop(key, None)
+            if envelope is not None:
+                self._spool(envelope)
+        super().kill()
+
+    def _spool_or_record_loss(self, envelope, reason):
+        # Enveloppe ni envoyée ni mise de côté : perte comptée dans le prochain rapport du SDK
+        if not self._spool(envelope):
+            for item in envelope.items:
+                self.record_lost_event(reason, item=item)
+
+    def _spool(self, envelope):
+        """Écrit l'enveloppe dans le spool ; False si elle n'a pas pu l'être (spool plein, disque)"""
+        # Les rapports de pertes du SDK sont recalculés par le processus suivant
+        if all(item.type == "client_report" for item in envelope.items):
+            return True
+        spooled = False
+        with capture_internal_exceptions():
+            os.makedirs(self._spool_dir, exist_ok=True)
+            if len(os.listdir(self._spool_dir)) >= SENTRY_SPOOL_MAX_FILES:
+                return False
+            name = f"{time.time_ns()}-{os.getpid()}-{threading.get_ident()}"
+            path = os.path.join(self._spool_dir, name)
+            with open(path + ".tmp", "wb") as f:
+                envelope.serialize_into(f)
+            # Renommage atomique : un autre processus ne lit jamais une enveloppe incomplète
+            os.replace(path + ".tmp", path + ".envelope")
+            spooled = True
+        return spooled
+
+    def _replay_spool(self):
+        """Renvoie les plus anciennes enveloppes du spool (exécuté par le thread d'envoi)"""
+        if not os.path.isdir(self._spool_dir):
+            return
+        names = sorted(name for name in os.listdir(self._spool_dir) if name.endswith(".envelope"))
+        for name in names[:SENTRY_SPOOL_REPLAY]:
+            path = os.path.join(self._spool_dir, name)
+            claimed = path + ".sending"
+            try:
+                # Le renommage réserve le fichier : deux processus ne renvoient pas la même enveloppe
+                os.rename(path, claimed)
+            except OSError:
+                continue
+            with capture_internal_exceptions():
+                with open(claimed, "rb") as f:
+                    envelope = Envelope.deserialize_from(f)
+                os.remove(claimed)
+                self._send_envelope(envelope)
+
+
 def init_sentry():
+    environment = os.getenv("SENTRY_ENVIRONMENT", "development")
+    sample_rate, traces_sample_rate = SENTRY_SAMPLING.get(environment, SENTRY_SAMPLING["production"])
     sentry_sdk.init(
         dsn=os.getenv('SENTRY_DSN'),
-        traces_sample_rate=1.0,
-        environment="development"
+        environment=environment,
+        sample_rate=float(os.getenv("SENTRY_SAMPLE_RATE", sample_rate)),
+        traces_sample_rate=float(os.getenv("SENTRY_TRACES_SAMPLE_RATE", traces_sample_rate)),
+        transport=SpoolingTransport,
+        transport_queue_size=SENTRY_QUEUE_SIZE,
+        shutdown_timeout=SENTRY_SHUTDOWN_TIMEOUT
     )
 
+
+def traced_service(cls):
+    """
+    Décorateur de classe : chaque point d'entrée du service (méthode statique recevant le token)
+    s'exécute dans un span Sentry ("ReadService.get_contracts_page"...), rattaché à la transaction
+    de la commande en cours. Hors transaction, la méthode est appelée directement.
+    """
+    for name, attribute in list(vars(cls).items()):
+        if not isinstance(attribute, staticmethod):
+            continue
+        parameters = list(inspect.signature(attribute.__func__).parameters)
+        if name.startswith("_") or not parameters or parameters[0] != "token":
+            continue
+        setattr(cls, name, staticmethod(_traced(attribute.__func__, f"{cls.__name__}.{name}")))
+    return cls
+
+
+def _traced(func, description):
+    if inspect.isgeneratorfunction(func):
+        # Parcours en flux : le span couvre toute l'itération, pas seulement la création du générateur
+        @functools.wraps(func)
+        def generator_wrapper(*args, **kwargs):
+            if sentry_sdk.get_current_span() is None:
+                yield from func(*args, **kwargs)
+                return
+            with sentry_sdk.start_span(op="crud", name=description):
+                yield from func(*args, **kwargs)
+        return generator_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if sentry_sdk.get_current_span() is None:
+            return func(*args, **kwargs)
+        with sentry_sdk.start_span(op="crud", name=description):
+            return func(*args, **kwargs)
+    return wrapper
+
+
 def log_exception(error):
     """Log les exceptions inattendues"""
     capture_exception(error)
@@ -0,0 +1,249 @@
+import json
+import math
+import os
+import time
+from contextlib import contextmanager
+
+
+# Métriques des commandes, cumulées d'une invocation à l'autre (la CLI tourne sous cron) :
+# nombre d'exécutions, histogramme des durées, temps en base, connexions empruntées au pool,
+# cache des listes et temps bcrypt. Chaque commande mesure en mémoire, puis fusionne ses valeurs
+# dans METRICS_DIR/state.json sous verrou exclusif et réécrit le fichier texte lu par le
+# collecteur textfile de node-exporter (METRICS_DIR/epic_events.prom).
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+METRICS_DIR = os.getenv("METRICS_DIR", ".metrics")
+METRICS_PREFIX = "epic_events"
+
+# Bornes (en secondes) de l'histogramme des durées de commande
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Durées conservées par commande pour le calcul exact des percentiles de `metrics show`
+RECENT_LATENCIES = 1000
+
+# Compteurs relevés pendant une commande : nom -> (nom exposé, description)
+COUNTERS = {
+    "db_seconds": ("db_seconds_total", "Temps passé à exécuter des requêtes SQL"),
+    "db_statements": ("db_statements_total", "Requêtes SQL exécutées"),
+    "pool_checkouts": ("pool_checkouts_total", "Connexions empruntées au pool"),
+    "cache_hits": ("query_cache_hits_total", "Listes servies par le cache local"),
+    "cache_misses": ("query_cache_misses_total", "Listes lues en base faute d'entrée valide en cache"),
+    "bcrypt_seconds": ("bcrypt_seconds_total", "Temps passé à hacher ou vérifier des mots de passe"),
+    "bcrypt_calls": ("bcrypt_calls_total", "Hachages et vérifications de mots de passe"),
+}
+
+_current = None
+
+
+class CommandMetrics:
+    """Valeurs relevées pendant l'exécution d'une commande"""
+
+    __slots__ = ("command", "start", "counters")
+
+    def __init__(self, command):
+        self.command = command
+        self.start = time.perf_counter()
+        self.counters = dict.fromkeys(COUNTERS, 0)
+
+
+def increment(name, amount=1):
+    """Ajoute amount au compteur de la commande en cours (sans effet hors commande)"""
+    if _current is not None:
+        _current.counters[name] += amount
+
+
+@contextmanager
+def timed(name):
+    """Cumule la durée du bloc dans <name>_seconds et compte l'appel dans <name>_calls"""
+    if _current is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        increment(f"{name}_seconds", time.perf_counter() - start)
+        increment(f"{name}_calls")
+
+
+# === Relevés automatiques : requêtes et pool, pour tous les engines ===
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics.start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    increment("db_seconds", time.perf_counter() - conn.info["metrics.start"].pop())
+    increment("db_statements")
+
+
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    increment("pool_checkouts")
+
+
+_listeners_installed = False
+
+
+def _install_listeners():
+    global _listeners_installed
+    if _listeners_installed:
+        return
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+    from sqlalchemy.pool import Pool
+
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Pool, "checkout", _on_checkout)
+    _listeners_installed = True
+
+
+def start_command(command):
+    """Commence le relevé d'une commande ("contracts list")"""
+    global _current
+    if not METRICS_ENABLED:
+        return
+    _install_listeners()
+    _current = CommandMetrics(command)
+
+
+def finish_command(status="ok"):
+    """Termine le relevé et le fusionne dans les fichiers de métriques"""
+    global _current
+    current, _current = _current, None
+    if current is None:
+        return
+    elapsed = time.perf_counter() - current.start
+    try:
+        with _locked_state() as state:
+            _merge(state, current, status, elapsed)
+            _write_textfile(state)
+    except OSError:
+        # Les métriques ne doivent jamais faire échouer la commande
+        pass
+
+
+# === Agrégation entre invocations ===
+@contextmanager
+def _locked_state(directory=None):
+    """
+    État cumulé, lu et réécrit sous verrou exclusif : deux commandes lancées en même temps
+    (cron, scripts) ne perdent pas leurs relevés.
+    """
+    directory = directory or METRICS_DIR
+    os.makedirs(directory, exist_ok=True)
+    state_path = os.path.join(directory, "state.json")
+    with open(os.path.join(directory, "state.lock"), "a+b") as lock:
+        _lock(lock)
+        try:
+            state = read_state(directory)
+            yield state
+            _atomic_write(state_path, json.dumps(state, separators=(",", ":")))
+        finally:
+            _unlock(lock)
+
+
+def _lock(f):
+    try:
+        import fcntl
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    except ImportError:
+        import msvcrt
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+
+def _unlock(f):
+    try:
+        import fcntl
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    except ImportError:
+        import msvcrt
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _atomic_write(path, content):
+    # Le collecteur ne doit jamais lire un fichier à moitié écrit
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(path + ".tmp", path)
+
+
+def read_state(directory=None):
+    """État cumulé : {"commands": {commande: {...}}} (vide si aucune commande n'a été mesurée)"""
+    path = os.path.join(directory or METRICS_DIR, "state.json")
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {"commands": {}}
+
+
+def _merge(state, current, status, elapsed):
+    entry = state["commands"].setdefault(current.command, {
+        "status": {}, "buckets": [0] * len(LATENCY_BUCKETS), "sum": 0.0, "count": 0,
+        "recent": [], "counters": dict.fromkeys(COUNTERS, 0),
+    })
+    entry["status"][status] = entry["status"].get(status, 0) + 1
+    entry["sum"] += elapsed
+    entry["count"] += 1
+    for index, bound in enumerate(LATENCY_BUCKETS):
+        if elapsed <= bound:
+            entry["buckets"][index] += 1
+    entry["recent"] = (entry["recent"] + [round(elapsed, 6)])[-RECENT_LATENCIES:]
+    for name, value in current.counters.items():
+        entry["counters"][name] = entry["counters"].get(name, 0) + value
+
+
+def _labels(**labels):
+    return ",".join(f'{key}="{value}"' for key, value in labels.items())
+
+
+def render_textfile(state):
+    """Format texte Prometheus / OpenMetrics (collecteur textfile de node-exporter)"""
+    commands = sorted(state["commands"].items())
+    name = f"{METRICS_PREFIX}_command_invocations_total"
+    lines = [f"# HELP {name} Exécutions de la commande, par issue", f"# TYPE {name} counter"]
+    for command, entry in commands:
+        for status, count in sorted(entry["status"].items()):
+            lines.append(f"{name}{{{_labels(command=command, status=status)}}} {count}")
+
+    name = f"{METRICS_PREFIX}_command_duration_seconds"
+    lines += [f"# HELP {name} Durée des commandes", f"# TYPE {name} histogram"]
+    for command, entry in commands:
+        for bound, count in zip(LATENCY_BUCKETS, entry["buckets"]):
+            lines.append(f"{name}_bucket{{{_labels(command=command, le=bound)}}} {count}")
+        lines.append(f"{name}_bucket{{{_labels(command=command, le='+Inf')}}} {entry['count']}")
+        lines.append(f"{name}_sum{{{_labels(command=command)}}} {entry['sum']:.6f}")
+        lines.append(f"{name}_count{{{_labels(command=command)}}} {entry['count']}")
+
+    for key, (suffix, description) in COUNTERS.items():
+        name = f"{METRICS_PREFIX}_{suffix}"
+        lines += [f"# HELP {name} {description}", f"# TYPE {name} counter"]
+        for command, entry in commands:
+            value = entry["counters"].get(key, 0)
+            lines.append(f"{name}{{{_labels(command=command)}}} {round(value, 6)}")
+
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def _write_textfile(state):
+    _atomic_write(os.path.join(METRICS_DIR, f"{METRICS_PREFIX}.prom"), render_textfile(state))
+
+
+def percentile(values, fraction):
+    """Percentile par la méthode du rang le plus proche (valeurs triées)"""
+    if not values:
+        return None
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+
+def summary(state):
+    """(commande, exécutions, erreurs, p50, p95, p99, temps moyen en base) par commande"""
+    rows = []
+    for command, entry in sorted(state["commands"].items()):
+        recent = sorted(entry["recent"])
+        errors = sum(count for status, count in entry["status"].items() if status != "ok")
+        db_mean = entry["counters"].get("db_seconds", 0) / entry["count"] if entry["count"] else 0
+        rows.append((command, entry["count"], errors, percentile(recent, 0.50),
+                     percentile(recent, 0.95), percentile(recent, 0.99), db_mean))
+    return rows
@@ -1,8 +1,18 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Table, DECIMAL
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Table, DECIMAL, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from config.db import Base
 import bcrypt
+import metrics
+
+
+def hash_password(password):
+   """
+   Hash bcrypt d'un mot de passe.
+   Fonction de module (et non méthode) pour pouvoir être répartie sur un pool de processus.
+   """
+   with metrics.timed("bcrypt"):
+       return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
 
 employee_permissions = Table(
    'employee_permissions', 
@@ -32,6 +42,8 @@ class Employee(Base):
    telephone = Column(String(20))
    departement = Column(String(10), nullable=False)
    date_creation = Column(DateTime, default=datetime.utcnow)
+   # Incrémentée à chaque changement de droits : invalide les tokens émis auparavant
+   permission_version = Column(Integer, nullable=False, default=0)
 
    # Relations avec les autres tables
    permissions = relationship('Permission', secondary=employee_permissions, back_populates='employees', lazy='joined')
@@ -50,17 +62,15 @@ class Employee(Base):
 
    def set_password(self, password):
        """Hash le mot de passe avant de le stocker"""
-       password_bytes = password.encode('utf-8')
-       salt = bcrypt.gensalt()
-       hashed = bcrypt.hashpw(password_bytes, salt)
-       self.password = hashed.decode('utf-8')
+       self.password = hash_password(password)
 
    def check_password(self, password):
        """Vérifie si le mot de passe est correct"""
-       return bcrypt.checkpw(
-           password.encode('utf-8'), 
-           self.password.encode('utf-8')
-       )
+       with metrics.timed("bcrypt"):
+           return bcrypt.checkpw(
+               password.encode('utf-8'),
+               self.password.encode('utf-8')
+           )
 
    def __repr__(self):
        """Représentation de l'objet pour le débug"""
@@ -88,7 +98,7 @@ class Client(Base):
    entreprise = Column(String(100), nullable=False)
    date_creation = Column(DateTime, default=datetime.utcnow)
    derniere_mise_a_jour = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-   commercial_id = Column(Integer, ForeignKey('employees.id'))
+   commercial_id = Column(Integer, ForeignKey('employees.id'), index=True)
 
    # Relations
    commercial_attitré = relationship("Employee", back_populates="clients")
@@ -102,13 +112,22 @@ class Contract(Base):
    __tablename__ = 'contracts'
 
    id = Column(Integer, primary_key=True)
-   client_id = Column(Integer, ForeignKey('clients.id'), nullable=False)
-   commercial_id = Column(Integer, ForeignKey('employees.id'))
+   client_id = Column(Integer, ForeignKey('clients.id'), nullable=False, index=True)
+   commercial_id = Column(Integer, ForeignKey('employees.id'), index=True)
    montant_total = Column(DECIMAL(10, 2), nullable=False)
    montant_restant = Column(DECIMAL(10, 2), nullable=False)
    date_creation = Column(DateTime, default=datetime.utcnow)
    est_signe = Column(Boolean, default=False)
 
+   # Index partiels des filtres de liste sélectifs (ContractFilterCommercial), sur l'id pour la pagination.
+   # Les filtres peu sélectifs (signed, not_fully_paid) restent servis par le parcours de la clé primaire.
+   __table_args__ = (
+      Index('ix_contracts_unsigned', 'id',
+            postgresql_where=est_signe == False, sqlite_where=est_signe == False),
+      Index('ix_contracts_fully_paid', 'id',
+            postgresql_where=montant_restant == 0, sqlite_where=montant_restant == 0),
+   )
+
    # Relations
    client = relationship("Client", back_populates="contrats")
    commercial = relationship("Employee", back_populates="contrats")
@@ -131,9 +150,50 @@ class Event(Base):
    notes = Column(String(1000))
    contact_support_id = Column(Integer, ForeignKey('employees.id'))
 
+   __table_args__ = (
+      # Filtre my_events (EventFilterSupport) et clé étrangère vers le support
+      Index('ix_events_contact_support_id_id', 'contact_support_id', 'id'),
+      # Filtres with_support / without_support (ContractFilterGestion) : jointure et test du support
+      # résolus dans l'index, sans lire la table
+      Index('ix_events_contrat_id_contact_support_id', 'contrat_id', 'contact_support_id'),
+      # Tri chronologique (--sort date_debut)
+      Index('ix_events_date_debut_id', 'date_debut', 'id'),
+   )
+
    # Relations
    contrat = relationship("Contract", back_populates="evenement")
    contact_support = relationship("Employee", back_populates="evenements")
 
    def __repr__(self):
-       return f"{self.nom} - {self.contrat.client.nom_complet}"
\ No newline at end of file
+       return f"{self.nom} - {self.contrat.client.nom_complet}"
+
+class CommercialSummary(Base):
+   """
+   Totaux par commercial du contrat, tenus à jour à chaque écriture de contrat ou d'événement
+   (voir crud.summaries) : le tableau de bord les lit sans parcourir les contrats.
+   """
+   __tablename__ = 'commercial_summaries'
+
+   commercial_id = Column(Integer, ForeignKey('employees.id', ondelete='CASCADE'), primary_key=True)
+   contracts = Column(Integer, nullable=False, default=0)
+   signed_contracts = Column(Integer, nullable=False, default=0)
+   signed_total = Column(DECIMAL(14, 2), nullable=False, default=0)
+   # Restant dû des contrats signés
+   outstanding = Column(DECIMAL(14, 2), nullable=False, default=0)
+   # Premier événement à venir (recalculé à la lecture une fois passé)
+   next_event = Column(DateTime, index=True)
+
+class ClientSummary(Base):
+   """Totaux par client, tenus à jour comme CommercialSummary"""
+   __tablename__ = 'client_summaries'
+
+   client_id = Column(Integer, ForeignKey('clients.id', ondelete='CASCADE'), primary_key=True)
+   contracts = Column(Integer, nullable=False, default=0)
+   signed_total = Column(DECIMAL(14, 2), nullable=False, default=0)
+   outstanding = Column(DECIMAL(14, 2), nullable=False, default=0)
+   next_event = Column(DateTime, index=True)
+
+   __table_args__ = (
+      # Clients aux plus gros montants dus du tableau de bord
+      Index('ix_client_summaries_outstanding', 'outstanding', 'client_id'),
+   )
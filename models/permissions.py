@@ -1,6 +1,20 @@
-from config.db import Session
+from config.db import Session, session_scope
 from models.models import Permission, Employee
-from auth import verify_token
+from auth import verify_token, invalidate_identity_on_commit
+
+
+# Permissions de lecture par défaut pour tous
+READ_PERMISSIONS = ['read_clients', 'read_contracts', 'read_events']
+
+# Permissions spécifiques par département
+DEPARTMENT_PERMISSIONS = {
+    Employee.COMMERCIAL: READ_PERMISSIONS + ['manage_clients'],
+    Employee.SUPPORT: READ_PERMISSIONS + ['manage_events'],
+    Employee.GESTION: READ_PERMISSIONS + [
+        'manage_users', 'delete_users',
+        'manage_contracts', 'manage_clients', 'manage_events'
+    ]
+}
 
 def setup_department_permissions():
     """Configure les permissions initiales pour chaque département"""
@@ -34,50 +48,36 @@ def setup_department_permissions():
     finally:
         session.close()
 
-def assign_department_permissions(employee):
-    """Attribue les permissions selon le département"""
-    session = Session()
-
+def assign_department_permissions(employee, session=None):
+    """
+    Attribue les permissions selon le département.
+    Avec la session de la commande en cours, l'attribution fait partie de sa transaction.
+    """
     try:
-        current_employee = session.merge(employee)
-        current_employee.permissions.clear()
-        
-        # Permissions de lecture par défaut pour tous
-        read_permissions = ['read_clients', 'read_contracts', 'read_events']
-        for perm in read_permissions:
-            permission = session.query(Permission).filter_by(code=perm).first()
-            current_employee.permissions.append(permission)
+        with session_scope(session) as current_session:
+            current_employee = current_session.merge(employee)
+            current_employee.permissions.clear()
+
+            codes = DEPARTMENT_PERMISSIONS.get(current_employee.departement, READ_PERMISSIONS)
+            permissions = current_session.query(Permission).filter(Permission.code.in_(codes)).all()
+            current_employee.permissions.extend(permissions)
+
+            # Les tokens émis avec les anciens droits deviennent obsolètes
+            current_employee.permission_version = (current_employee.permission_version or 0) + 1
+            current_session.flush()
+            invalidate_identity_on_commit(current_session, current_employee.id)
 
-        # Permissions spécifiques par département
-        if current_employee.departement == Employee.COMMERCIAL:
-            permission = session.query(Permission).filter_by(code='manage_clients').first()
-            current_employee.permissions.append(permission)
-        
-        elif current_employee.departement == Employee.SUPPORT:
-            permission = session.query(Permission).filter_by(code='manage_events').first()
-            current_employee.permissions.append(permission)
-        
-        elif current_employee.departement == Employee.GESTION:
-            permissions = [
-                'manage_users', 'delete_users',
-                'manage_contracts', 'manage_clients', 'manage_events'
-            ]
-            for perm_code in permissions:
-                permission = session.query(Permission).filter_by(code=perm_code).first()
-                current_employee.permissions.append(permission)
-        
-        session.commit()
         print(f"Permissions attribuées à {current_employee.prenom} {current_employee.nom}")
 
     except Exception as e:
         print(f"Erreur lors de l'attribution des permissions : {e}")
-        session.rollback()
-    finally:
-        session.close()
+        # Dans une transaction partagée, l'erreur doit annuler toute la commande
+        if session is not None:
+            raise
 
-def verify_user_permission(token: str, required_permission: str):
-    """Vérifie si l'utilisateur a la permission requise"""
-    employee = verify_token(token)
+def verify_user_permission(token: str, required_permission: str, session=None):
+    """Vérifie si l'utilisateur a la permission requise (à partir des claims du token)"""
+    employee = verify_token(token, session=session)
     if not employee:
         return False
         
@@ -85,9 +85,5 @@ def verify_user_permission(token: str, required_permission: str):
     if required_permission.startswith('read_'):
         return True
 
-    # Vérifier les autres permissions
-    for permission in employee.permissions:
-        if permission.code == required_permission:
-            return True
-    
-    return False
\ No newline at end of file
+    # Vérifier les autres permissions (embarquées dans le token)
+    return required_permission in employee.permission_codes
\ No newline at end of file
@@ -0,0 +1,319 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+import click
+from sqlalchemy import event
+
+
+# Profilage d'une commande, activé par les options globales de cli.py :
+#   --profile         requêtes SQL (nombre, temps en base, lignes lues), relevées par les
+#                     événements de l'engine, avec un budget de requêtes par commande
+#   --profile-cpu     temps Python, par cProfile (fichier .prof) ou par échantillonnage de la pile
+#                     (fichier .collapsed, au format attendu par flamegraph.pl / speedscope)
+#   --profile-memory  allocations Python (tracemalloc) : pic et top des lignes qui allouent
+# Les rapports sont écrits sur la sortie d'erreur, les fichiers dans PROFILE_DIR.
+
+# Nombre maximal de requêtes par commande ; au-delà, --profile termine la commande en erreur.
+# Les commandes absentes de QUERY_BUDGETS utilisent DEFAULT_QUERY_BUDGET.
+DEFAULT_QUERY_BUDGET = int(os.getenv("QUERY_BUDGET", "20"))
+QUERY_BUDGETS = {
+    "clients list": 3,
+    "contracts list": 3,
+    "events list": 3,
+    "events calendar": 3,
+    # Événements sans support, supports et charges, créneaux réservés, puis l'UPDATE groupé
+    "events auto-assign": 7,
+    "employees list": 3,
+    "export clients": 3,
+    "export contracts": 3,
+    "export events": 3,
+    "reports commercials": 2,
+    "reports receivables": 2,
+    # Version du token, puis lecture des commerciaux et des clients
+    "reports dashboard": 3,
+    # Clients trouvés, puis lignes des clients, des contrats et des événements
+    "search": 5,
+}
+
+# Une même requête exécutée au moins ce nombre de fois est signalée (N+1 probable)
+REPEATED_STATEMENT_THRESHOLD = 5
+SLOWEST_STATEMENTS = 5
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", ".profiles")
+PROFILE_TOP = int(os.getenv("PROFILE_TOP", "20"))
+# Intervalle entre deux échantillons de la pile (en secondes)
+SAMPLING_INTERVAL = float(os.getenv("PROFILE_SAMPLING_INTERVAL", "0.005"))
+# Profondeur des piles conservées par tracemalloc
+TRACEMALLOC_FRAMES = 10
+
+# Clé de Context.meta (partagé par toute la chaîne de contextes click) où `monitored`
+# enregistre le nom de la commande exécutée
+COMMAND_META_KEY = "profiling.command"
+
+
+class StatementStats:
+    """Cumul des exécutions d'une même requête"""
+
+    __slots__ = ("statement", "count", "duration", "max_duration", "rows")
+
+    def __init__(self, statement):
+        self.statement = statement
+        self.count = 0
+        self.duration = 0.0
+        self.max_duration = 0.0
+        self.rows = 0
+
+
+class CountingCursor:
+    """Curseur DBAPI qui compte les lignes lues par le résultat SQLAlchemy"""
+
+    def __init__(self, cursor, stats):
+        self._cursor = cursor
+        self._stats = stats
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._stats.rows += 1
+        return row
+
+    def fetchmany(self, *args):
+        rows = self._cursor.fetchmany(*args)
+        self._stats.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._stats.rows += len(rows)
+        return rows
+
+    def __iter__(self):
+        for row in self._cursor:
+            self._stats.rows += 1
+            yield row
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class SQLProfile:
+    """Statistiques des requêtes exécutées par un engine entre install() et remove()"""
+
+    def __init__(self):
+        self.statements = {}
+
+    def install(self, engine):
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def remove(self, engine):
+        event.remove(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.remove(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("profiling.start", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info["profiling.start"].pop()
+        stats = self.statements.get(statement)
+        if stats is None:
+            stats = self.statements[statement] = StatementStats(statement)
+        stats.count += 1
+        stats.duration += duration
+        stats.max_duration = max(stats.max_duration, duration)
+
+        # Le résultat est construit après cet événement, à partir de context.cursor :
+        # les lignes qu'il lira seront comptées
+        if context is not None and cursor.description is not None:
+            context.cursor = CountingCursor(cursor, stats)
+
+    @property
+    def count(self):
+        return sum(stats.count for stats in self.statements.values())
+
+    @property
+    def duration(self):
+        return sum(stats.duration for stats in self.statements.values())
+
+    @property
+    def rows(self):
+        return sum(stats.rows for stats in self.statements.values())
+
+    def report(self, command, budget):
+        lines = [
+            f"\n[profile] {command or 'commande'} : {self.count} requête(s) (budget {budget}), "
+            f"{self.duration * 1000:.1f} ms en base, {self.rows} ligne(s) lue(s)"
+        ]
+        slowest = sorted(self.statements.values(), key=lambda stats: stats.duration, reverse=True)
+        for stats in slowest[:SLOWEST_STATEMENTS]:
+            statement = " ".join(stats.statement.split())
+            lines.append(
+                f"  {stats.duration * 1000:8.1f} ms  x{stats.count:<4} {stats.rows:>7} ligne(s)  "
+                f"{statement[:120]}"
+            )
+        for stats in self.statements.values():
+            if stats.count >= REPEATED_STATEMENT_THRESHOLD:
+                statement = " ".join(stats.statement.split())
+                lines.append(f"  N+1 probable : {stats.count} exécutions de {statement[:100]}")
+        return lines
+
+
+def query_budget(command, override=None):
+    """Budget explicite (--query-budget), sinon celui de la commande, sinon le budget par défaut"""
+    if override is not None:
+        return override
+    return QUERY_BUDGETS.get(command, DEFAULT_QUERY_BUDGET)
+
+
+def start_sql_profile(ctx, budget_override=None):
+    """
+    Active le profilage SQL jusqu'à la fin de la commande click ; le rapport est affiché
+    à la fermeture du contexte, et un dépassement de budget fait échouer la commande.
+    """
+    from config.db import get_engine
+
+    engine = get_engine()
+    profile = SQLProfile()
+    profile.install(engine)
+
+    def finish():
+        profile.remove(engine)
+        command = ctx.meta.get(COMMAND_META_KEY)
+        budget = query_budget(command, budget_override)
+        for line in profile.report(command, budget):
+            click.echo(line, err=True)
+        if profile.count > budget:
+            raise click.ClickException(
+                f"Budget de requêtes dépassé : {profile.count} requêtes pour un budget de {budget}"
+            )
+
+    ctx.call_on_close(finish)
+    return profile
+
+
+def _output_path(ctx, directory, extension):
+    """Fichier de sortie nommé d'après la commande et l'heure : .profiles/contracts-list-20250101-120000.prof"""
+    os.makedirs(directory, exist_ok=True)
+    command = (ctx.meta.get(COMMAND_META_KEY) or "cli").replace(" ", "-")
+    return os.path.join(directory, f"{command}-{datetime.now():%Y%m%d-%H%M%S}.{extension}")
+
+
+class StackSampler:
+    """
+    Profileur par échantillonnage : un thread relève la pile du thread principal à intervalle
+    régulier et compte les piles identiques (format « collapsed » : f1;f2;f3 nombre).
+    Le coût reste faible et indépendant du nombre d'appels, contrairement à cProfile.
+    """
+
+    def __init__(self, interval=SAMPLING_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self._thread_id = threading.get_ident()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)})")
+                frame = frame.f_back
+            # Un échantillon pris pendant stop() ne montrerait que l'attente du thread
+            if stack and not self._stopped.is_set():
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def write_collapsed(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def top_functions(self, limit):
+        """Fonctions les plus souvent au sommet de la pile (temps propre)"""
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return leaves.most_common(limit)
+
+
+def start_cpu_profile(ctx, mode, directory=PROFILE_DIR):
+    """Profil CPU de la commande : mode "cprofile" (déterministe) ou "sampling" (échantillonnage)"""
+    if mode == "cprofile":
+        import cProfile
+        import pstats
+
+        profiler = cProfile.Profile()
+
+        def finish():
+            profiler.disable()
+            path = _output_path(ctx, directory, "prof")
+            profiler.dump_stats(path)
+            click.echo(f"\n[profile-cpu] cProfile : {path} (snakeviz, pstats)", err=True)
+            stats = pstats.Stats(profiler, stream=sys.stderr)
+            stats.sort_stats("cumulative").print_stats(PROFILE_TOP)
+
+        ctx.call_on_close(finish)
+        profiler.enable()
+        return profiler
+
+    sampler = StackSampler()
+
+    def finish():
+        sampler.stop()
+        path = _output_path(ctx, directory, "collapsed")
+        sampler.write_collapsed(path)
+        total = sum(sampler.stacks.values())
+        click.echo(f"\n[profile-cpu] {total} échantillon(s) toutes les {sampler.interval * 1000:g} ms : "
+                   f"{path} (flamegraph.pl, speedscope)", err=True)
+        for function, count in sampler.top_functions(PROFILE_TOP):
+            click.echo(f"  {count / total:6.1%}  {function}", err=True)
+
+    ctx.call_on_close(finish)
+    sampler.start()
+    return sampler
+
+
+def start_memory_profile(ctx, directory=PROFILE_DIR):
+    """Suivi des allocations (tracemalloc) : pic mémoire et lignes qui allouent le plus"""
+    import tracemalloc
+
+    tracemalloc.start(TRACEMALLOC_FRAMES)
+
+    def finish():
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ))
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        statistics = snapshot.statistics("lineno")
+        path = _output_path(ctx, directory, "alloc.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"Mémoire allouée : {current / 1024:.1f} Kio, pic : {peak / 1024:.1f} Kio\n\n")
+            for stat in snapshot.statistics("traceback")[:PROFILE_TOP]:
+                f.write(f"{stat.size / 1024:.1f} Kio en {stat.count} bloc(s)\n")
+                f.writelines(f"    {line}\n" for line in stat.traceback.format())
+                f.write("\n")
+
+        click.echo(f"\n[profile-memory] pic {peak / 1024:.1f} Kio, encore allouée {current / 1024:.1f} Kio : {path}",
+                   err=True)
+        for stat in statistics[:PROFILE_TOP]:
+            frame = stat.traceback[0]
+            click.echo(f"  {stat.size / 1024:9.1f} Kio  {stat.count:>7} bloc(s)  "
+                       f"{os.path.basename(frame.filename)}:{frame.lineno}", err=True)
+
+    ctx.call_on_close(finish)
@@ -1,7 +1,11 @@
-from config.db import Session
+from config.db import Session, engine
 from models.models import Employee
-from models.permissions import verify_user_permission, assign_department_permissions
-from auth import verify_token
+from models.permissions import verify_user_permission, assign_department_permissions, setup_department_permissions
+from auth import verify_token, create_access_token, load_identity_cache, IDENTITY_CACHE_FILE
+from crud.update import UpdateService
+from sqlalchemy import event
+import os
+import uuid
 
 
 def create_test_user():
@@ -45,6 +49,54 @@ def test_permissions():
     print(verify_user_permission(token, 'manage_users'))    # False pour commercial
 
 
+def test_identity_cache():
+    """Le second appel à verify_token ne touche pas la base, une modification invalide le cache"""
+    setup_department_permissions()
+    session = Session()
+    unique_id = uuid.uuid4()
+    employee = Employee(
+        username=f"test_user_{unique_id}",
+        email=f"test_{unique_id}@test.com",
+        nom="Cache",
+        prenom="User",
+        departement="GESTION"
+    )
+    employee.set_password("test123")
+    session.add(employee)
+    session.commit()
+    employee_id = employee.id
+    session.close()
+    assign_department_permissions(employee)
+
+    token = create_access_token(f"test_user_{unique_id}")
+    identity = verify_token(token)
+    assert identity.id == employee_id
+    assert 'manage_users' in identity.permission_codes
+    assert os.path.exists(IDENTITY_CACHE_FILE)
+
+    # Identité servie depuis le cache : aucune requête
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        assert verify_user_permission(token, 'manage_users')
+        assert statements == []
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    # Modification annulée : l'identité en cache reste servie
+    session = Session()
+    UpdateService.update_employee(token, employee_id, {"nom": "Annulé"}, session=session)
+    session.rollback()
+    session.close()
+    assert any(entry["identity"]["id"] == employee_id for entry in load_identity_cache().values())
+
+    # Changement de département : le token devient obsolète, un nouveau porte les nouveaux claims
+    UpdateService.update_employee(token, employee_id, {"departement": "SUPPORT"})
+    assert verify_token(token) is None
+    assert verify_token(create_access_token(f"test_user_{unique_id}")).departement == "SUPPORT"
+
+
 if __name__ == "__main__":
     create_test_user()
     test_permissions()
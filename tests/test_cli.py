@@ -327,3 +327,38 @@ def test_delete_employee(admin_user):
 
     # Re-vérifier que les autres employés n'ont pas été supprimés
     result = admin_user.invoke(cli, ['employees', 'list'])
+
+
+def test_profile_query_budgets(admin_user, commercial_user):
+    """Les listes restent dans leur budget de requêtes ; un dépassement fait échouer la commande"""
+    for runner in (admin_user, commercial_user):
+        for resource in ['clients', 'contracts', 'events']:
+            result = runner.invoke(cli, ['--profile', resource, 'list'])
+            assert result.exit_code == 0, result.output
+            assert f"[profile] {resource} list" in result.output
+
+    # Page absente du cache de requêtes : au moins une requête
+    result = commercial_user.invoke(cli, ['--profile', '--query-budget', '0', 'clients', 'list', '--limit', '1'])
+    assert result.exit_code != 0
+    assert "Budget de requêtes dépassé" in result.output
+
+
+def test_profile_cpu_and_memory(admin_user, tmp_path):
+    """Les profils CPU et mémoire sont écrits dans le répertoire demandé"""
+    result = admin_user.invoke(cli, ['--profile-cpu', 'sampling', '--profile-memory',
+                                     '--profile-dir', str(tmp_path), 'employees', 'list'])
+    assert result.exit_code == 0, result.output
+    assert "[profile-memory] pic" in result.output
+    files = {name.split(".", 1)[1]: name for name in (path.name for path in tmp_path.iterdir())}
+    assert set(files) == {'alloc.txt', 'collapsed'}
+    assert all(name.startswith('employees-list-') for name in files.values())
+
+    # Format « collapsed » : pile séparée par des ';' puis le nombre d'échantillons
+    for line in (tmp_path / files['collapsed']).read_text(encoding="utf-8").splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0 and stack
+
+    result = admin_user.invoke(cli, ['--profile-cpu', 'cprofile', '--profile-dir', str(tmp_path),
+                                     'employees', 'list'])
+    assert result.exit_code == 0, result.output
+    assert any(path.suffix == ".prof" for path in tmp_path.iterdir())
@@ -0,0 +1,65 @@
+import subprocess
+import sys
+import os
+
+
+# Budget d'import du module cli (en secondes), vérifié seulement si CLI_STARTUP_BUDGET est défini :
+# une mesure de temps dépend de la machine. Les modules chargés sont, eux, toujours vérifiés.
+STARTUP_BUDGET = float(os.getenv("CLI_STARTUP_BUDGET", "0") or 0)
+HEAVY_MODULES = ['sqlalchemy', 'sentry_sdk', 'bcrypt', 'jwt', 'crud.read', 'models.models']
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPT = """
+import sys, time
+start = time.perf_counter()
+from cli import cli
+elapsed = time.perf_counter() - start
+from click.testing import CliRunner
+result = CliRunner().invoke(cli, {args!r})
+assert result.exit_code == 0, result.output
+loaded = [name for name in {heavy!r} if name in sys.modules]
+print(elapsed)
+print(','.join(loaded))
+"""
+
+
+def run_isolated(args, tmp_path):
+    """Lance la commande dans un interpréteur neuf pour mesurer les imports réels"""
+    script = SCRIPT.format(args=args, heavy=HEAVY_MODULES)
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=tmp_path,
+        env={**os.environ, "PYTHONPATH": PROJECT_ROOT},
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    elapsed, loaded = result.stdout.split("\n")[:2]
+    return float(elapsed), [name for name in loaded.split(",") if name]
+
+
+def check_budget(elapsed):
+    if not STARTUP_BUDGET:
+        return
+    assert elapsed < STARTUP_BUDGET, f"import de cli en {elapsed:.3f} s (budget {STARTUP_BUDGET} s)"
+
+
+def test_help_imports_nothing_heavy(tmp_path):
+    """`cli --help` ne charge ni l'ORM, ni bcrypt, ni PyJWT, ni Sentry"""
+    elapsed, loaded = run_isolated(['--help'], tmp_path)
+    assert loaded == []
+    check_budget(elapsed)
+
+
+def test_group_help_imports_nothing_heavy(tmp_path):
+    """L'aide d'un groupe charge le module du groupe, pas les services"""
+    elapsed, loaded = run_isolated(['clients', '--help'], tmp_path)
+    assert loaded == []
+
+
+def test_logout_imports_nothing_heavy(tmp_path):
+    """`auth logout` se contente de vider les fichiers locaux"""
+    elapsed, loaded = run_isolated(['auth', 'logout'], tmp_path)
+    assert loaded == []
+    check_budget(elapsed)
@@ -2,6 +2,7 @@ import pytest
 from config.db import Session, Base, engine
 from models.models import Employee, Client, Contract, Event, Permission
 from crud.create import CreateService
+from crud.bulk import read_records
 from crud.update import UpdateService
 from auth import create_access_token
 from models.permissions import assign_department_permissions
@@ -175,6 +176,18 @@ def test_update_employee(test_tokens):
     assert updated_employee.departement == "COMMERCIAL"
     assert updated_employee.nom == "Modifié"
 
+    # Changement de département : droits du nouveau département, anciens tokens obsolètes ;
+    # simple modification des coordonnées : les tokens restent valides
+    session = Session()
+    employee = session.get(Employee, employee_id)
+    assert 'manage_clients' in {permission.code for permission in employee.permissions}
+    version = employee.permission_version
+    session.close()
+    UpdateService.update_employee(test_tokens['all_rights'], employee_id, {"telephone": "0600000000"})
+    session = Session()
+    assert session.get(Employee, employee_id).permission_version == version
+    session.close()
+
     # Test avec droits COMMERCIAL (doit échouer)
     with pytest.raises(PermissionError):
         UpdateService.update_employee(test_tokens['limited_rights'], employee_id, update_data)
@@ -264,4 +277,61 @@ def test_update_event(test_tokens, test_contract):
 
     # Test avec droits COMMERCIAL (doit échouer)
     with pytest.raises(PermissionError):
-        UpdateService.update_event(test_tokens['limited_rights'], event_id, update_data)
\ No newline at end of file
+        UpdateService.update_event(test_tokens['limited_rights'], event_id, update_data)
+
+def test_import_clients(test_tokens, test_client, tmp_path):
+    """Import en masse : lignes valides insérées, doublons et lignes incomplètes rejetés"""
+    session = Session()
+    existing_email = session.get(Client, test_client).email
+    session.close()
+
+    new_email = generate_unique_email()
+    csv_file = tmp_path / "clients.csv"
+    csv_file.write_text(
+        "nom_complet,email,entreprise,telephone\n"
+        f"Client Import,{new_email},Entreprise Import,0102030405\n"
+        f"Client Doublon,{new_email},Entreprise Import,\n"
+        f"Client Existant,{existing_email},Entreprise Import,\n"
+        f"Client Incomplet,{generate_unique_email()},,\n",
+        encoding="utf-8"
+    )
+
+    report = CreateService.import_clients(test_tokens['limited_rights'], read_records(str(csv_file)), chunk_size=2)
+    assert report.inserted == 1
+    assert [line for line, _ in sorted(report.rejects)] == [3, 4, 5]
+
+    session = Session()
+    imported = session.query(Client).filter_by(email=new_email).one()
+    assert imported.commercial_id is not None
+    assert imported.telephone == "0102030405"
+    session.close()
+
+
+def test_import_employees(test_tokens, tmp_path):
+    """Import de collaborateurs : mots de passe hachés en parallèle, permissions du département"""
+    username = generate_unique_username()
+    jsonl_file = tmp_path / "employees.jsonl"
+    jsonl_file.write_text(
+        f'{{"username": "{username}", "email": "{generate_unique_email()}", "nom": "Import", '
+        f'"prenom": "Support", "departement": "support", "password": "secret"}}\n'
+        f'{{"username": "{generate_unique_username()}", "email": "{generate_unique_email()}", "nom": "Import", '
+        f'"prenom": "Inconnu", "departement": "RH", "password": "secret"}}\n',
+        encoding="utf-8"
+    )
+
+    # Un commercial n'a pas le droit de créer des collaborateurs
+    with pytest.raises(PermissionError):
+        CreateService.import_employees(test_tokens['limited_rights'], read_records(str(jsonl_file)))
+
+    report = CreateService.import_employees(test_tokens['all_rights'], read_records(str(jsonl_file)), workers=2)
+    assert report.inserted == 1
+    assert report.rejects == [(2, "département inconnu : RH")]
+
+    session = Session()
+    employee = session.query(Employee).filter_by(username=username).one()
+    assert employee.departement == "SUPPORT"
+    assert employee.check_password("secret")
+    assert {permission.code for permission in employee.permissions} == {
+        'read_clients', 'read_contracts', 'read_events', 'manage_events'
+    }
+    session.close()
@@ -1,12 +1,19 @@
 from datetime import datetime
-from config.db import Session
+from decimal import Decimal
+from config.db import Session, engine
 from models.models import Employee, Client, Contract, Event, Permission
 from models.permissions import setup_department_permissions, assign_department_permissions
 from crud.read import ReadService
-from auth import create_access_token
-from sqlalchemy import text
+from crud.projections import ContractRow, EventRow, EmployeeRow
+from crud.export import ExportService
+from auth import create_access_token, verify_token
+from sqlalchemy import text, inspect, event, update
+from init_db import upgrade_schema
 import pytest
 import uuid
+import csv
+import gzip
+import json
 
 
 def generate_unique_email():
@@ -191,4 +198,514 @@ def test_gestion_access(setup_test_data, session):
     assert len(gestion_contracts) == 1
 
     gestion_events = ReadService.get_all_events(tokens['gestion'])
-    assert len(gestion_events) == 1
\ No newline at end of file
+    assert len(gestion_events) == 1
+
+def test_keyset_pagination(setup_test_data, session):
+    """Les pages se suivent sans doublon ni trou, la dernière n'a pas de curseur"""
+    tokens = setup_test_data['tokens']
+    for index in range(4):
+        session.add(Client(
+            nom_complet=f"Client Page {index}",
+            email=generate_unique_email(),
+            entreprise="Entreprise Test"
+        ))
+    session.commit()
+
+    first_page = ReadService.get_clients_page(tokens['gestion'], limit=2)
+    assert len(first_page.items) == 2
+    assert first_page.next_cursor is not None
+
+    seen = [client.id for client in first_page.items]
+    cursor = first_page.next_cursor
+    while cursor:
+        page = ReadService.get_clients_page(tokens['gestion'], limit=2, after=cursor)
+        seen.extend(client.id for client in page.items)
+        cursor = page.next_cursor
+
+    all_clients = ReadService.get_all_clients(tokens['gestion'])
+    assert seen == [client.id for client in all_clients]
+
+    # Tri chronologique des événements : curseur composite (date_debut, id)
+    events_page = ReadService.get_events_page(tokens['gestion'], order_by="date_debut", limit=1)
+    assert len(events_page.items) == 1
+    assert events_page.next_cursor is None
+
+
+def test_stream_matches_full_list(setup_test_data):
+    """Le parcours par paquets renvoie les mêmes lignes, dans le même ordre, que la liste complète"""
+    tokens = setup_test_data['tokens']
+
+    streamed = [client.id for client in ReadService.iter_clients(tokens['gestion'], batch_size=1)]
+    assert streamed == [client.id for client in ReadService.get_all_clients(tokens['gestion'])]
+
+    streamed = [employee.id for employee in ReadService.iter_employees(tokens['gestion'], batch_size=2)]
+    assert streamed == [employee.id for employee in ReadService.get_all_employees(tokens['gestion'])]
+
+
+def test_listing_projections(setup_test_data):
+    """Les listes retournent des lignes légères : ni mot de passe, ni notes sauf demande"""
+    tokens = setup_test_data['tokens']
+
+    employees = ReadService.get_employees_page(tokens['gestion'], limit=None).items
+    assert isinstance(employees[0], EmployeeRow)
+    assert not hasattr(employees[0], 'password')
+
+    event = ReadService.get_events_page(tokens['gestion'], limit=None).items[0]
+    assert isinstance(event, EventRow)
+    assert event.client == "Client Test"
+    assert event.support == setup_test_data['employees']['support'].username
+    assert event.notes is None
+
+    contract = ReadService.get_contracts_page(tokens['gestion'], limit=None).items[0]
+    assert isinstance(contract, ContractRow)
+    assert contract.support == setup_test_data['employees']['support'].username
+
+
+def test_upgrade_schema_creates_missing_indexes():
+    """Une base créée avant l'ajout des index les récupère à la mise à niveau"""
+    index = next(index for index in Event.__table__.indexes if index.name == 'ix_events_date_debut_id')
+    index.drop(engine, checkfirst=True)
+    assert 'ix_events_date_debut_id' not in {i['name'] for i in inspect(engine).get_indexes('events')}
+
+    upgrade_schema()
+
+    assert 'ix_events_date_debut_id' in {i['name'] for i in inspect(engine).get_indexes('events')}
+
+
+def test_query_cache(setup_test_data, session):
+    """Une liste répétée ne touche pas la base ; une écriture validée l'invalide"""
+    tokens = setup_test_data['tokens']
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    first = ReadService.get_clients_page(tokens['gestion'], limit=10)
+    event.listen(engine, "before_cursor_execute", count_statement)
+    try:
+        second = ReadService.get_clients_page(tokens['gestion'], limit=10)
+    finally:
+        event.remove(engine, "before_cursor_execute", count_statement)
+    assert second == first
+    assert statements == []
+
+    session.add(Client(nom_complet="Client Cache", email=generate_unique_email(), entreprise="Entreprise Test"))
+    session.commit()
+
+    third = ReadService.get_clients_page(tokens['gestion'], limit=10)
+    assert [client.nom_complet for client in third.items][-1] == "Client Cache"
+
+
+def test_export_applies_role_filters(setup_test_data, tmp_path):
+    """L'export produit les lignes de la liste correspondante, filtres de rôle compris"""
+    tokens = setup_test_data['tokens']
+
+    csv_file = tmp_path / "contrats.csv.gz"
+    count = ExportService.export(tokens['commercial'], "contracts", str(csv_file), "csv", "gzip", "unsigned")
+    assert count == 1
+    with gzip.open(csv_file, "rt", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert [int(row['id']) for row in rows] == [setup_test_data['contrat'].id]
+    assert rows[0]['montant_restant'] == "500.00"
+    assert rows[0]['est_signe'] == "False"
+
+    # Chemin COPY (PostgreSQL) : booléens écrits comme le module csv, et non t/f
+    from crud.export import csv_text_columns
+    employee = verify_token(tokens['commercial'])
+    stmt, keys, row_type = ReadService.entity_statement(employee, "contracts", "unsigned")
+    with Session() as session:
+        copied = session.execute(csv_text_columns(stmt)).all()
+    assert [row.est_signe for row in copied] == ["False"]
+    assert list(csv_text_columns(stmt).selected_columns.keys()) == list(row_type._fields)
+
+    assert ExportService.export(tokens['commercial'], "contracts", str(csv_file), "csv", "gzip", "signed") == 0
+
+    jsonl_file = tmp_path / "evenements.jsonl"
+    ExportService.export(tokens['support'], "events", str(jsonl_file), "jsonl", filter_mode="my_events")
+    events = [json.loads(line) for line in jsonl_file.read_text(encoding="utf-8").splitlines()]
+    assert [item['nom'] for item in events] == ["Événement de Test"]
+    assert events[0]['support'] == setup_test_data['employees']['support'].username
+
+
+def test_column_batches(setup_test_data, session):
+    """Les lots colonnes sont lus sans instance ORM et respectent les filtres de rôle"""
+    from crud.columnar import column_batches
+
+    employee = verify_token(setup_test_data['tokens']['commercial'], session=session)
+    stmt, keys, row_type = ReadService.entity_statement(employee, "contracts", "unsigned")
+    batches = list(column_batches(session, stmt, keys, batch_size=10))
+    assert len(batches) == 1
+    columns = dict(zip(row_type._fields, batches[0]))
+    assert columns['id'] == (setup_test_data['contrat'].id,)
+    assert columns['montant_restant'] == (Decimal("500.00"),)
+    assert not session.identity_map
+
+
+def test_column_batches_keep_nulls(setup_test_data, session):
+    """Un contrat sans statut de signature reste nul dans les colonnes (jamais False)"""
+    from crud.columnar import column_batches, column_types, to_numpy
+
+    contract_id = setup_test_data['contrat'].id
+    session.execute(update(Contract).where(Contract.id == contract_id).values(est_signe=None))
+    session.commit()
+
+    employee = verify_token(setup_test_data['tokens']['gestion'], session=session)
+    stmt, keys, row_type = ReadService.entity_statement(employee, "contracts")
+    columns = dict(zip(row_type._fields, next(column_batches(session, stmt, keys))))
+    assert columns['est_signe'] == (None,)
+    assert ("est_signe", bool, True) in column_types(row_type)
+
+    pytest.importorskip("numpy")
+    signed = to_numpy(list(columns.values()), column_types(row_type))['est_signe']
+    assert signed.mask.tolist() == [True]
+
+
+def test_numpy_batches(setup_test_data):
+    """Montants en centimes entiers, dates en datetime64"""
+    np = pytest.importorskip("numpy")
+    batches = list(ReadService.iter_numpy_batches(setup_test_data['tokens']['gestion'], "contracts"))
+    contracts = batches[0]
+    assert contracts['montant_total'].dtype == np.int64
+    assert contracts['montant_total'].tolist() == [100000]
+    assert contracts['date_creation'].dtype == np.dtype("datetime64[us]")
+
+    events = next(ReadService.iter_numpy_batches(setup_test_data['tokens']['gestion'], "events"))
+    assert events['nom'].tolist() == ["Événement de Test"]
+
+
+def test_search(setup_test_data, session):
+    """Recherche par débuts de mots ; l'index suit les modifications"""
+    from crud.search import ensure_search_indexes
+
+    ensure_search_indexes(engine)
+    token = setup_test_data['tokens']['support']
+
+    results = ReadService.search(token, "client tes", session=session)
+    assert [client.id for client in results.clients] == [setup_test_data['client'].id]
+    assert [contract.id for contract in results.contracts] == [setup_test_data['contrat'].id]
+    assert results.events == []
+
+    results = ReadService.search(token, "lieu", entities=("events",), session=session)
+    assert [event.id for event in results.events] == [setup_test_data['event'].id]
+    assert results.clients == [] and results.contracts == []
+
+    client = session.get(Client, setup_test_data['client'].id)
+    client.entreprise = "Zephyr Productions"
+    session.commit()
+    assert [row.id for row in ReadService.search(token, "zephyr", session=session).clients] == [client.id]
+    assert ReadService.search(token, "introuvable", session=session) == ([], [], [])
+
+    with pytest.raises(ValueError):
+        ReadService.search(token, "  !? ", session=session)
+
+def test_reports(setup_test_data, session):
+    """Totaux par commercial et encours par client, calculés en une requête chacun"""
+    from crud.reports import ReportService
+    from crud.read import ContractFilterGestion
+
+    commercial = setup_test_data['employees']['commercial']
+    client = setup_test_data['client']
+    # Contrat créé comme par `contracts add` (sans commercial) : compté pour le commercial du client
+    session.add(Contract(client_id=client.id, montant_total=3000.00, montant_restant=200.00, est_signe=True))
+    session.commit()
+    token = setup_test_data['tokens']['gestion']
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        [row] = ReportService.commercials_report(token, session=session)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert len([sql for sql in statements if "GROUP BY" in sql]) == 1
+    assert row.commercial == commercial.username
+    assert (row.contracts, row.signed_contracts, row.without_event, row.rank) == (2, 1, 1, 1)
+    assert (row.signed_total, row.unsigned_total, row.outstanding) == (
+        Decimal("3000.00"), Decimal("1000.00"), Decimal("200.00")
+    )
+    assert row.signed_share == pytest.approx(1.0)
+
+    [receivable] = ReportService.receivables_report(token, session=session)
+    assert (receivable.client_id, receivable.unpaid_contracts, receivable.outstanding) == (
+        client.id, 1, Decimal("200.00")
+    )
+    assert receivable.cumulative_share == pytest.approx(1.0)
+
+    # Filtre du rôle : seul le contrat dont l'événement a un support est compté
+    [row] = ReportService.commercials_report(token, ContractFilterGestion.WITH_SUPPORT, session=session)
+    assert (row.contracts, row.signed_contracts) == (1, 0)
+    assert ReportService.receivables_report(token, ContractFilterGestion.WITH_SUPPORT, session=session) == []
+
+def test_dashboard_summaries(setup_test_data, session):
+    """Synthèses tenues à jour par les services, comparées aux contrats puis reconstruites"""
+    from crud.reports import ReportService
+    from crud.create import CreateService
+    from crud.update import UpdateService
+    from crud.summaries import check_summaries, refresh_stale_next_events
+    from crud.cache import MODIFIED_TABLES
+    from models.models import CommercialSummary
+    from sqlalchemy import select
+    from sqlalchemy.orm.exc import NoResultFound
+
+    commercial = setup_test_data['employees']['commercial']
+    client = setup_test_data['client']
+    token = setup_test_data['tokens']['gestion']
+    # Jeu de test inséré hors services : synthèses calculées d'un bloc
+    ReportService.rebuild_summaries(token, session=session)
+    session.commit()
+    assert check_summaries(session) == []
+
+    # Comme avec `contracts add` : le contrat compte pour le commercial du client
+    contract = CreateService.create_contract(token, {
+        'client_id': client.id,
+        'montant_total': Decimal("3000.00"), 'montant_restant': Decimal("3000.00"), 'est_signe': False
+    }, session=session)
+    UpdateService.update_contract(token, contract.id, {'est_signe': True, 'montant_restant': Decimal("200.00")},
+                                  session=session)
+    later = datetime(2100, 6, 1, 9, 0)
+    event_data = {'nom': "Gala", 'contrat_id': contract.id, 'date_debut': datetime(2100, 7, 1, 9, 0),
+                  'date_fin': datetime(2100, 7, 1, 18, 0), 'lieu': "Lyon"}
+    session.commit()
+    with pytest.raises(NoResultFound, match="Contrat non trouvé"):
+        CreateService.create_event(token, {**event_data, 'contrat_id': contract.id + 1000}, session=session)
+    session.rollback()
+    new_event = CreateService.create_event(token, event_data, session=session)
+    session.commit()
+    assert check_summaries(session) == []
+
+    # Événement avancé : prochain événement recalculé
+    UpdateService.update_event(token, new_event.id, {'date_debut': later}, session=session)
+    session.commit()
+    assert check_summaries(session) == []
+
+    board = ReportService.dashboard(token, session=session)
+    [row] = board.commercials
+    assert (row.commercial_id, row.contracts, row.signed_contracts) == (commercial.id, 2, 1)
+    assert (row.signed_total, row.outstanding, row.next_event) == (Decimal("3000.00"), Decimal("200.00"), later)
+    [client_row] = board.clients
+    assert (client_row.client_id, client_row.contracts, client_row.outstanding, client_row.next_event) == (
+        client.id, 2, Decimal("200.00"), later
+    )
+
+    # Prochain événement enregistré déjà passé : recalculé à la lecture, sans écriture
+    session.query(CommercialSummary).update({CommercialSummary.next_event: datetime(2000, 1, 1)})
+    session.commit()
+    assert ReportService.dashboard(token, session=session).commercials[0].next_event == later
+    assert not session.info.get(MODIFIED_TABLES)
+    assert session.scalar(select(CommercialSummary.next_event)) == datetime(2000, 1, 1)
+    assert refresh_stale_next_events(session) == 1
+    session.commit()
+
+    # Synthèse altérée : écart signalé, puis corrigé par la reconstruction
+    session.query(CommercialSummary).update({CommercialSummary.contracts: 5})
+    session.commit()
+    assert [(gap.table, gap.key, gap.column, gap.expected, gap.stored) for gap in check_summaries(session)] == [
+        ("commercial_summaries", commercial.id, "contracts", 2, 5)
+    ]
+    ReportService.rebuild_summaries(token, session=session)
+    session.commit()
+    assert check_summaries(session) == []
+
+    # Client retiré à son commercial : ses contrats quittent la ligne de celui-ci
+    UpdateService.update_client(token, client.id, {'commercial_id': None}, session=session)
+    session.commit()
+    assert check_summaries(session) == []
+    assert ReportService.dashboard(token, session=session).commercials[0].contracts == 0
+
+
+def test_calendar(setup_test_data, session):
+    """Créneaux servis par l'index des périodes ; un support ne peut pas être réservé deux fois"""
+    from crud.calendar import ensure_calendar_index
+    from crud.update import UpdateService
+
+    ensure_calendar_index(engine, rebuild=True)
+    token = setup_test_data['tokens']['gestion']
+    support = setup_test_data['employees']['support']
+    contracts = [
+        Contract(client_id=setup_test_data['client'].id, commercial_id=setup_test_data['employees']['commercial'].id,
+                 montant_total=100.00, montant_restant=0.00, est_signe=True)
+        for _ in range(2)
+    ]
+    session.add_all(contracts)
+    session.flush()
+    morning = Event(nom="Matin", contrat_id=contracts[0].id, lieu="Paris", contact_support_id=support.id,
+                    date_debut=datetime(2100, 3, 1, 9, 0), date_fin=datetime(2100, 3, 1, 12, 0))
+    afternoon = Event(nom="Après-midi", contrat_id=contracts[1].id, lieu="Paris",
+                      date_debut=datetime(2100, 3, 1, 12, 0), date_fin=datetime(2100, 3, 1, 18, 0))
+    session.add_all([morning, afternoon])
+    session.commit()
+
+    def calendar(start, end, support_id=None):
+        return [row.id for row in ReadService.calendar(token, start, end, support_id, session=session)]
+
+    assert calendar(datetime(2100, 3, 1), datetime(2100, 3, 2)) == [morning.id, afternoon.id]
+    assert calendar(datetime(2100, 3, 1, 12, 0), datetime(2100, 3, 1, 12, 30)) == [afternoon.id]
+    assert calendar(datetime(2100, 3, 1), datetime(2100, 3, 2), support.id) == [morning.id]
+    with pytest.raises(ValueError):
+        calendar(datetime(2100, 3, 2), datetime(2100, 3, 1))
+
+    # Créneaux contigus : même support accepté ; chevauchement : refusé
+    UpdateService.update_event(token, afternoon.id, {'contact_support_id': support.id}, session=session)
+    session.commit()
+    with pytest.raises(ValueError, match=f"événement {morning.id}"):
+        UpdateService.update_event(token, afternoon.id, {'date_debut': datetime(2100, 3, 1, 11, 0)}, session=session)
+    session.rollback()
+
+    # L'index suit les modifications des dates
+    UpdateService.update_event(token, morning.id, {'date_debut': datetime(2100, 3, 2, 9, 0),
+                                                   'date_fin': datetime(2100, 3, 2, 12, 0)}, session=session)
+    session.commit()
+    assert calendar(datetime(2100, 3, 1), datetime(2100, 3, 2), support.id) == [afternoon.id]
+    UpdateService.update_event(token, afternoon.id, {'date_debut': datetime(2100, 3, 1, 11, 0)}, session=session)
+    session.commit()
+
+    # Période vide : ne chevauche rien, comme tsrange sous PostgreSQL
+    UpdateService.update_event(token, morning.id, {'date_debut': datetime(2100, 3, 1, 14, 0),
+                                                   'date_fin': datetime(2100, 3, 1, 14, 0)}, session=session)
+    session.commit()
+    assert calendar(datetime(2100, 3, 1), datetime(2100, 3, 2), support.id) == [afternoon.id]
+
+    # Sans l'index R*Tree (init_db.py pas lancé) : comparaison des dates seule
+    with engine.begin() as connection:
+        for trigger in ("ai", "ad", "au"):
+            connection.execute(text(f"DROP TRIGGER events_period_{trigger}"))
+        connection.execute(text("DROP TABLE events_period"))
+    assert calendar(datetime(2100, 3, 1), datetime(2100, 3, 2)) == [afternoon.id]
+    with pytest.raises(ValueError, match=f"événement {afternoon.id}"):
+        UpdateService.update_event(token, morning.id, {'date_fin': datetime(2100, 3, 1, 15, 0)}, session=session)
+    session.rollback()
+    ensure_calendar_index(engine)
+
+
+def test_auto_assign_supports(setup_test_data, session, monkeypatch):
+    """Supports répartis par charge puis disponibilité, appliqués en une requête ; simulation sans écriture"""
+    from crud.assignment import plan_assignments
+    from crud.calendar import ensure_calendar_index
+    from crud.update import UpdateService
+
+    def at(hour, minute=0):
+        return datetime(2100, 5, 1, hour, minute)
+
+    # Le support 2, moins chargé, est pris de 9 h à 12 h ; deux événements simultanés se répartissent
+    plan = plan_assignments(
+        [(10, at(10), at(11)), (11, at(13), at(14)), (12, at(13, 30), at(15)), (13, at(16), at(17))],
+        {1: "un", 2: "deux"}, loads={1: 3}, busy={2: [(at(9), at(12))]}
+    )
+    assert plan.assignments == [(10, 1), (11, 2), (12, 1), (13, 2)]
+    assert plan.unassigned == []
+    assert [(load.support, load.before, load.after) for load in plan.loads] == [("un", 3, 5), ("deux", 0, 2)]
+    assert plan_assignments([(10, at(10), at(11))], {2: "deux"}, busy={2: [(at(9), at(12))]}).unassigned == [10]
+    # Durée nulle : n'occupe ni ne chevauche aucun créneau
+    assert plan_assignments([(10, at(10), at(10)), (11, at(9), at(11))], {2: "deux"},
+                            busy={2: [(at(9, 30), at(9, 30))]}).assignments == [(11, 2), (10, 2)]
+
+    ensure_calendar_index(engine)
+    token = setup_test_data['tokens']['gestion']
+    support = setup_test_data['employees']['support']
+    events = []
+    for hour in (9, 10, 11):
+        contract = Contract(client_id=setup_test_data['client'].id, montant_total=100.00, montant_restant=0.00,
+                            est_signe=True)
+        session.add(contract)
+        session.flush()
+        events.append(Event(nom=f"Atelier {hour}", contrat_id=contract.id, lieu="Nantes",
+                            date_debut=at(hour), date_fin=at(hour + 2)))
+    session.add_all(events)
+    session.commit()
+
+    plan = UpdateService.auto_assign_supports(token, dry_run=True, session=session)
+    session.commit()
+    # Créneaux contigus (9 h - 11 h, 11 h - 13 h) : même support ; 10 h - 12 h reste sans support
+    assert plan.assignments == [(events[0].id, support.id), (events[2].id, support.id)]
+    assert plan.unassigned == [events[1].id]
+    assert session.scalar(text("SELECT count(*) FROM events WHERE contact_support_id IS NOT NULL "
+                               "AND nom LIKE 'Atelier%'")) == 0
+
+    # Second support : les événements qui se chevauchent alternent entre les deux
+    other = Employee(username=generate_unique_username(), email=generate_unique_email(), nom="Petit",
+                     prenom="Luc", departement="SUPPORT", password="test123")
+    session.add(other)
+    session.commit()
+    plan = UpdateService.auto_assign_supports(token, session=session)
+    session.commit()
+    assert plan.assignments == [(events[0].id, support.id), (events[1].id, other.id), (events[2].id, support.id)]
+    assert plan.unassigned == []
+    session.expire_all()
+    assert [session.get(Event, event.id).contact_support_id for event in events] == [support.id, other.id, support.id]
+
+    # Événement affecté par quelqu'un d'autre entre le calcul du plan et son application : retiré du plan
+    import crud.update
+    late = []
+    for hour in (14, 15):
+        contract = Contract(client_id=setup_test_data['client'].id, montant_total=100.00, montant_restant=0.00,
+                            est_signe=True)
+        session.add(contract)
+        session.flush()
+        late.append(Event(nom=f"Atelier {hour}", contrat_id=contract.id, lieu="Nantes",
+                          date_debut=at(hour), date_fin=at(hour, 30)))
+    session.add_all(late)
+    session.commit()
+
+    taken_by = []
+
+    def plan_then_assign(*args):
+        plan = plan_assignments(*args)
+        # L'autre support que celui du plan
+        taken_by.append(other.id if dict(plan.assignments)[late[0].id] == support.id else support.id)
+        session.execute(text("UPDATE events SET contact_support_id = :support WHERE id = :id"),
+                        {"support": taken_by[0], "id": late[0].id})
+        return plan
+
+    monkeypatch.setattr(crud.update, "plan_assignments", plan_then_assign)
+    plan = UpdateService.auto_assign_supports(token, session=session)
+    session.commit()
+    assert plan.taken == [late[0].id]
+    assert [event_id for event_id, _ in plan.assignments] == [late[1].id]
+    assert sum(load.after - load.before for load in plan.loads) == 1
+    session.expire_all()
+    assert session.get(Event, late[0].id).contact_support_id == taken_by[0]
+
+    with pytest.raises(PermissionError):
+        UpdateService.auto_assign_supports(setup_test_data['tokens']['support'], session=session)
+
+def test_synthetic_data_is_deterministic():
+    """Même graine, mêmes lignes ; les répartitions respectent les règles métier"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session as OrmSession
+    from config.db import Base
+    from crud.synthetic import load_synthetic_data
+    from crud.cache import MODIFIED_TABLES
+
+    def generate(seed):
+        memory_engine = create_engine("sqlite://")
+        Base.metadata.create_all(memory_engine)
+        with OrmSession(memory_engine) as memory_session:
+            counts = load_synthetic_data(memory_session, 600, seed=seed)
+            # Cache des listes invalidé au commit seulement (écouteur after_commit)
+            assert "events" in memory_session.info[MODIFIED_TABLES]
+            memory_session.commit()
+            # Le hachage du mot de passe est salé : seul le reste des collaborateurs est comparé
+            rows = [memory_session.execute(text(f"SELECT {columns} FROM {table} ORDER BY id")).all()
+                    for table, columns in (("employees", "id, username, email, nom, prenom, departement"),
+                                           ("clients", "*"), ("contracts", "*"), ("events", "*"))]
+        memory_engine.dispose()
+        return counts, rows
+
+    counts, rows = generate(7)
+    assert generate(7) == (counts, rows)
+    assert generate(8)[1] != rows
+
+    employees, clients, contracts, events = rows
+    assert counts['contracts'] == 600 and counts['clients'] == 200
+    assert {employee.departement for employee in employees} == {
+        Employee.GESTION, Employee.COMMERCIAL, Employee.SUPPORT
+    }
+    signed = {contract.id for contract in contracts if contract.est_signe}
+    assert all(event.contrat_id in signed for event in events)
+    assert all(event.date_fin > event.date_debut for event in events)
+    # Aucun support n'est affecté à deux événements qui se chevauchent
+    booked = sorted((event.contact_support_id, event.date_debut, event.date_fin)
+                    for event in events if event.contact_support_id is not None)
+    assert booked and all(previous[0] != current[0] or previous[2] <= current[1]
+                          for previous, current in zip(booked, booked[1:]))
+    assert all(Decimal(contract.montant_restant) <= Decimal(contract.montant_total) for contract in contracts)
@@ -14,4 +14,44 @@ def test_exception_logging():
    with patch('logger.capture_exception') as mock_capture:
        error = Exception("Test error")  # Crée une erreur de test
        log_exception(error)  # Tente de logger l'erreur
-       mock_capture.assert_called_once_with(error)  # Vérifie que l'erreur a été capturée une seule fois
\ No newline at end of file
+       mock_capture.assert_called_once_with(error)  # Vérifie que l'erreur a été capturée une seule fois
+
+
+def test_spooling_transport_keeps_unsent_events(tmp_path, monkeypatch):
+   # Réseau injoignable : l'événement est écrit dans le spool, puis renvoyé au démarrage suivant
+   import sentry_sdk
+   import logger
+   from logger import SpoolingTransport
+
+   monkeypatch.setattr(logger, "SENTRY_SPOOL_DIR", str(tmp_path))
+   options = {**sentry_sdk.get_client().options, "dsn": "http://key@127.0.0.1:9/1",
+              "transport_queue_size": 10}
+
+   transport = SpoolingTransport(options)
+   with sentry_sdk.new_scope():
+       envelope = sentry_sdk.envelope.Envelope()
+       envelope.add_event({"message": "spool"})
+   transport.capture_envelope(envelope)
+   transport.flush(2)
+   spooled = list(tmp_path.glob("*.envelope"))
+   assert len(spooled) == 1
+   assert b'"spool"' in spooled[0].read_bytes()
+   # Mise au spool, l'enveloppe n'est pas comptée comme perdue
+   assert not transport._discarded_events
+   transport.kill()
+   assert len(list(tmp_path.glob("*.envelope"))) == 1
+
+   # Le transport suivant reprend le fichier (et, toujours sans réseau, le remet au spool)
+   replay = SpoolingTransport(options)
+   replay.flush(2)
+   replayed = list(tmp_path.glob("*.envelope"))
+   assert len(replayed) == 1 and replayed[0].name != spooled[0].name
+   replay.kill()
+
+   # File et spool pleins : l'événement est perdu, et compté comme tel dans le rapport du SDK
+   monkeypatch.setattr(logger, "SENTRY_SPOOL_MAX_FILES", 0)
+   full = SpoolingTransport(options)
+   monkeypatch.setattr(full._worker, "submit", lambda callback: False)
+   full.capture_envelope(envelope)
+   assert full._discarded_events[("error", "queue_overflow")] == 1
+   full.kill()
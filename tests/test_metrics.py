@@ -0,0 +1,47 @@
+import os
+import subprocess
+import sys
+import metrics
+
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WRITER = """
+import metrics
+for _ in range({runs}):
+    metrics.start_command("clients list")
+    metrics.increment("db_statements")
+    metrics.finish_command()
+"""
+
+
+def test_concurrent_writers_lose_nothing(tmp_path):
+    """Des commandes simultanées cumulent toutes leurs relevés (verrou sur l'état)"""
+    env = {**os.environ, "PYTHONPATH": PROJECT_ROOT, "METRICS_DIR": str(tmp_path), "METRICS_ENABLED": "true"}
+    writers = [
+        subprocess.Popen([sys.executable, "-c", WRITER.format(runs=25)], env=env)
+        for _ in range(4)
+    ]
+    assert all(writer.wait() == 0 for writer in writers)
+
+    entry = metrics.read_state(str(tmp_path))["commands"]["clients list"]
+    assert entry["count"] == 100
+    assert entry["counters"]["db_statements"] == 100
+    assert entry["buckets"][-1] == 100
+
+    textfile = (tmp_path / "epic_events.prom").read_text(encoding="utf-8")
+    assert 'epic_events_command_invocations_total{command="clients list",status="ok"} 100' in textfile
+    assert 'epic_events_command_duration_seconds_count{command="clients list"} 100' in textfile
+    assert textfile.endswith("# EOF\n")
+
+
+def test_summary_percentiles():
+    """Percentiles par rang le plus proche sur les dernières durées"""
+    state = {"commands": {"contracts list": {
+        "status": {"ok": 99, "error": 1}, "count": 100, "sum": 0.0, "buckets": [],
+        "recent": [index / 1000 for index in range(1, 101)], "counters": {"db_seconds": 0.5},
+    }}}
+    [(command, count, errors, p50, p95, p99, db_mean)] = metrics.summary(state)
+    assert (command, count, errors) == ("contracts list", 100, 1)
+    assert (p50, p95, p99) == (0.05, 0.095, 0.099)
+    assert db_mean == 0.005
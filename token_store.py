@@ -0,0 +1,69 @@
+import hashlib
+import json
+import os
+import time
+
+
+# Fichiers locaux de la session CLI (bibliothèque standard uniquement : importé par logout et --help)
+TOKEN_FILE = ".token"  # Token JWT de l'utilisateur connecté
+IDENTITY_CACHE_FILE = ".token.cache"  # Cache des identités vérifiées, à côté du fichier .token
+
+
+def read_token():
+    """Récupère le token stocké dans le fichier .token"""
+    try:
+        with open(TOKEN_FILE, "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+
+def write_token(token):
+    """Enregistre le token (chaîne vide pour se déconnecter)"""
+    with open(TOKEN_FILE, "w", encoding="utf-8") as f:
+        f.write(token)
+
+
+def token_key(token: str):
+    """Clé de cache : empreinte du token (le token lui-même n'est jamais recopié)"""
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+def load_identity_cache():
+    try:
+        with open(IDENTITY_CACHE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_identity_cache(cache):
+    """Écriture atomique pour ne jamais laisser un cache tronqué entre deux commandes"""
+    now = time.time()
+    cache = {key: entry for key, entry in cache.items() if entry.get("expires_at", 0) > now}
+    tmp_file = f"{IDENTITY_CACHE_FILE}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+        os.replace(tmp_file, IDENTITY_CACHE_FILE)
+    except OSError:
+        # Le cache est une optimisation : un échec d'écriture ne doit pas bloquer la commande
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+
+def invalidate_identity_cache(employee_id=None):
+    """
+    Supprime du cache les identités d'un collaborateur (ou tout le cache si employee_id est None).
+    Appelé lorsqu'un collaborateur est modifié ou supprimé.
+    """
+    if employee_id is None:
+        if os.path.exists(IDENTITY_CACHE_FILE):
+            os.remove(IDENTITY_CACHE_FILE)
+        return
+
+    cache = load_identity_cache()
+    remaining = {key: entry for key, entry in cache.items()
+                 if entry.get("identity", {}).get("id") != employee_id}
+    if len(remaining) != len(cache):
+        save_identity_cache(remaining)